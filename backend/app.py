@@ -1,40 +1,69 @@
 # app.py — Point d'entrée de l'application Flask.
 #
 # Ce fichier contient :
-#   - la config de l'app (logging, CORS, en-têtes sécurité)
+#   - la config de l'app (logging, CORS, en-têtes sécurité, métriques)
 #   - les gestionnaires d'erreurs globaux (retournent toujours du JSON)
 #   - les routes API pour les livres et les commandes
 #   - le service des fichiers statiques du frontend
 
+import base64
+import functools
+import hashlib
+import io
+import json
 import logging
 import pathlib
 import re
+from datetime import datetime, timedelta, timezone
 
-from flask import Flask, request, jsonify, send_from_directory, redirect
+from flask import Flask, request, jsonify, redirect, stream_with_context
 from flask_cors import CORS
-from peewee import DoesNotExist
+from peewee import DoesNotExist, IntegrityError, CharField, TextField, DateTimeField, IntegerField, Tuple, Case
+from playhouse.migrate import SchemaMigrator, migrate
 
-from .config import TAXE_TOTALE, LIVRAISON_CENTS, DEBUG, MAX_ITEMS_PER_ORDER
-from .database import db
-from .models import Livre, Client, Commande, CommandeLivre
+from .config import (
+    DEBUG, MAX_ITEMS_PER_ORDER,
+    LOG_FORMAT, LOG_QUEUE_MAX, LOG_4XX_PAR_MINUTE, COMPRESSION_MIN_BYTES,
+)
+from .database import db, est_sqlite
+from .models import Livre, Client, Commande, CommandeLivre, VersionCatalogue, maintenant_utc
+from .search import init_recherche, filtrer_livres, recherche_fts
+from .cache import catalogue_cache, init_cache
+from .bulk import lire_csv, lire_ndjson, importer
+from .serializers import FournisseurJSON, Conversion, compiler
+from .compression import CorpsPrecompresse, reponse_precompressee
+from .assets import RessourcesStatiques, CACHE_IMMUABLE, CACHE_REVALIDE
+from . import compression, logs, metrics, pricing
 
 
 # --- Logging ---
-# Je configure le logging ici pour avoir des traces lisibles pendant le dev.
-logging.basicConfig(
-    level=logging.DEBUG if DEBUG else logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s — %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
+# Les logs passent par une file bornée vidée par un thread dédié (voir logs.py) :
+# écrire un log ne bloque jamais une requête sur les E/S de stderr.
+logs.configurer(
+    niveau             = logging.DEBUG if DEBUG else logging.INFO,
+    format_json        = LOG_FORMAT == "json",
+    taille_file        = LOG_QUEUE_MAX,
+    max_4xx_par_minute = LOG_4XX_PAR_MINUTE,
 )
 logger = logging.getLogger("bookshop")
 
 
 # --- App Flask ---
 app = Flask(__name__)
-CORS(app)
+app.json = FournisseurJSON(app)   # orjson si installé (voir serializers.py)
+CORS(app, expose_headers=["X-Next-Cursor"])
+
+# Durée, nombre de requêtes SQL et temps BD par requête (voir metrics.py)
+metrics.installer(app, db, server_timing=DEBUG)
+
+# gzip / brotli selon Accept-Encoding, au-delà de COMPRESSION_MIN_BYTES (voir compression.py)
+compression.installer(app, seuil=COMPRESSION_MIN_BYTES)
 
 FRONTEND_DIR = pathlib.Path(__file__).resolve().parents[1] / "frontend"
 
+# Fichiers du frontend en mémoire, relus depuis le disque seulement en développement (voir assets.py)
+ressources = RessourcesStatiques(FRONTEND_DIR, recharger=DEBUG)
+
 # Regex pour la validation d'email (format de base suffisant pour ce projet)
 _EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
@@ -81,30 +110,163 @@ def internal_error(e):
 def root():
     return redirect("/app", code=302)
 
+# Servis depuis la mémoire (assets.py) : ETag = empreinte du contenu, URL
+# versionnées (styles.<empreinte>.css) mises en cache un an, variantes
+# compressées calculées une seule fois.
+
 @app.get("/app")
 def serve_app():
-    return send_from_directory(FRONTEND_DIR, "app.html")
+    return _fichier_frontend("app.html")
 
 @app.get("/frontend/<path:path>")
 def serve_frontend_files(path):
-    return send_from_directory(FRONTEND_DIR, path)
+    return _fichier_frontend(path)
+
+def _fichier_frontend(path: str):
+    ressource, immuable = ressources.trouver(path)
+    if ressource is None:
+        return error("Fichier introuvable", 404)
+
+    cache = CACHE_IMMUABLE if immuable else CACHE_REVALIDE
+    if _pas_modifie(ressource.empreinte):
+        return reponse_validee(None, ressource.empreinte, cache)
+    resp = reponse_precompressee(app, ressource.corps, ressource.mimetype, COMPRESSION_MIN_BYTES)
+    return reponse_validee(resp, ressource.empreinte, cache)
 
 
 # --- Initialisation de la base de données ---
 
+TABLES = [Livre, Client, Commande, CommandeLivre, VersionCatalogue]
+
+
+def _migrer_colonne(table: str, colonne: str, champ, remplir_avec: str | None = None):
+    """
+    Ajoute une colonne absente d'une base existante, puis la remplit avec la
+    valeur par défaut du champ (ou avec l'expression SQL remplir_avec). Le
+    champ doit être null=True : une contrainte NOT NULL obligerait SQLite à
+    reconstruire toute la table.
+    Passe par playhouse.migrate pour générer le bon DDL (SQLite ou PostgreSQL).
+    """
+    if colonne in {c.name for c in db.get_columns(table)}:
+        return
+    migrator = SchemaMigrator.from_database(db)
+    migrate(migrator.add_column(table, colonne, champ))
+    if remplir_avec:
+        db.execute_sql(f'UPDATE "{table}" SET "{colonne}" = {remplir_avec}')
+    else:
+        migrate(migrator.apply_default(table, colonne, champ))
+    logger.info("Migration : colonne %s.%s ajoutée.", table, colonne)
+
+
+def _dedoublonner_clients():
+    """
+    Les anciennes versions créaient un client par commande. Avant de rendre
+    client.email unique : emails normalisés, commandes rattachées au plus
+    ancien client de chaque email, doublons supprimés.
+    """
+    index = {i.name: i for i in db.get_indexes("client")}.get("client_email")
+    if index is not None and index.unique:
+        return
+    with db.atomic():
+        db.execute_sql('UPDATE "client" SET "email" = LOWER(TRIM("email"))')
+        db.execute_sql(
+            'UPDATE "commande" SET "client_id" = ('
+            ' SELECT MIN("c2"."id") FROM "client" AS "c2"'
+            ' WHERE "c2"."email" = (SELECT "c1"."email" FROM "client" AS "c1"'
+            '                       WHERE "c1"."id" = "commande"."client_id"))')
+        db.execute_sql('DELETE FROM "client" WHERE "id" NOT IN '
+                       '(SELECT MIN("id") FROM "client" GROUP BY "email")')
+        if index is not None:
+            db.execute_sql('DROP INDEX "client_email"')
+        db.execute_sql('CREATE UNIQUE INDEX "client_email" ON "client" ("email")')
+    logger.info("Migration : clients dédoublonnés, index unique client_email.")
+
+
+# UPDATE ... RETURNING (réservation du stock) et INSERT ... ON CONFLICT ...
+# RETURNING (client retrouvé par son email) : SQLite 3.35 ou plus
+SQLITE_MIN = (3, 35, 0)
+
+
+def _verifier_sqlite():
+    """Refuse de démarrer sur un SQLite trop ancien, plutôt que d'échouer à la première commande."""
+    if est_sqlite() and db.server_version < SQLITE_MIN:
+        raise RuntimeError(
+            "SQLite %s trouvé, %s ou plus requis (UPDATE ... RETURNING) : mettre à jour "
+            "la bibliothèque SQLite de Python ou installer pysqlite3-binary"
+            % (".".join(map(str, db.server_version)), ".".join(map(str, SQLITE_MIN))))
+
+
 def init_db():
     """Crée les tables si elles n'existent pas et applique les migrations légères."""
+    _verifier_sqlite()
     with db:
-        db.create_tables([Livre, Client, Commande, CommandeLivre])
+        # Seules les tables absentes sont créées (avec leurs index) ; les tables
+        # existantes passent par les migrations ci-dessous.
+        db.create_tables([m for m in TABLES if not m.table_exists()])
 
         # Vérification des colonnes ajoutées après la première version du schéma
-        cols = [row[1] for row in db.execute_sql('PRAGMA table_info("livre")').fetchall()]
-        if "image_url" not in cols:
-            db.execute_sql('ALTER TABLE "livre" ADD COLUMN "image_url" TEXT DEFAULT ""')
-            logger.info("Migration : colonne image_url ajoutée.")
-        if "description" not in cols:
-            db.execute_sql('ALTER TABLE "livre" ADD COLUMN "description" TEXT DEFAULT ""')
-            logger.info("Migration : colonne description ajoutée.")
+        _migrer_colonne("livre",    "image_url",   CharField(null=True, default=""))
+        _migrer_colonne("livre",    "description", TextField(null=True, default=""))
+        _migrer_colonne("livre",    "updated_at",  DateTimeField(null=True, default=maintenant_utc))
+        _migrer_colonne("commande", "updated_at",  DateTimeField(null=True, default=maintenant_utc))
+        _migrer_colonne("livre",    "isbn",        CharField(null=True))
+        # Faute de mieux, les anciennes commandes datent de leur dernière modification
+        _migrer_colonne("commande", "created_at",  DateTimeField(null=True), remplir_avec='"updated_at"')
+        # Instantané des lignes : faute de mieux, les anciennes lignes prennent
+        # le titre et le prix actuels du livre
+        _migrer_colonne("commandelivre", "titre", CharField(null=True),
+                        remplir_avec='(SELECT "titre" FROM "livre" WHERE "livre"."id" = "commandelivre"."livre_id")')
+        _migrer_colonne("commandelivre", "prix_unitaire_cents", IntegerField(null=True),
+                        remplir_avec='(SELECT "prix_cents" FROM "livre" WHERE "livre"."id" = "commandelivre"."livre_id")')
+        # Moteur de tarification : catégorie de taxe, remise et version des règles
+        _migrer_colonne("livre",    "categorie_taxe", CharField(null=True),
+                        remplir_avec=f"'{pricing.CATEGORIE_DEFAUT}'")
+        _migrer_colonne("commande", "remise_cents",   IntegerField(null=True), remplir_avec="0")
+        _migrer_colonne("commande", "version_tarifs", CharField(null=True))
+        # Stock : les livres existants restent sans suivi (NULL)
+        _migrer_colonne("livre",    "stock",          IntegerField(null=True))
+        # Instantané du client : les anciennes commandes prennent le nom et
+        # l'adresse actuels de leur client (avant la fusion des doublons)
+        _migrer_colonne("commande", "nom_client", CharField(null=True),
+                        remplir_avec='(SELECT "nom" FROM "client" WHERE "client"."id" = "commande"."client_id")')
+        _migrer_colonne("commande", "adresse_livraison", TextField(null=True),
+                        remplir_avec='(SELECT "adresse" FROM "client" WHERE "client"."id" = "commande"."client_id")')
+
+        # Un seul client par email (index unique, remplace l'ancien index simple)
+        _dedoublonner_clients()
+
+        # Index déclarés dans models.py mais absents d'une base plus ancienne
+        for model in TABLES:
+            existing = {i.name for i in db.get_indexes(model._meta.table_name)}
+            for index in model._meta.fields_to_index():
+                if index._name not in existing:
+                    db.execute(index.safe(True))
+                    logger.info("Migration : index %s ajouté.", index._name)
+
+        # Index plein texte du catalogue (SQLite avec FTS5 seulement)
+        init_recherche()
+
+        # Version partagée du catalogue (invalidation du cache mémoire)
+        init_cache()
+
+
+def prechauffer_cache():
+    """
+    Remplit le cache du catalogue : premières pages de GET /books et jusqu'à max_livres
+    livres. Appelé par le lanceur de production (serve.py) avant le fork, les
+    workers démarrent ainsi avec un cache chaud.
+    """
+    with db:
+        catalogue_cache.synchroniser()
+        for dispo_only in (False, True):
+            corps, _ = catalogue_cache.liste(_cle_liste(dispo_only, "id"), lambda: _page_en_cache(_page_livres(
+                dispo_only, "id", False, CHAMPS_LISTE_DEFAUT, LIMITE_LIVRES)))
+            corps.precalculer()
+        vers_dict = serialiseur_livre(CHAMPS_LIVRE)
+        qs = (Livre.select(*[getattr(Livre, c) for c in CHAMPS_LIVRE], Livre.updated_at)
+              .order_by(Livre.id).limit(catalogue_cache.max_livres).tuples())
+        for ligne in qs:
+            catalogue_cache.livre(ligne[0], lambda: (vers_dict(ligne), _en_utc(ligne[-1])))
 
 
 @app.before_request
@@ -123,88 +285,437 @@ def _close_db(exc):
 def livre_to_dict(livre: Livre) -> dict:
     return {
         "id":          livre.id,
+        "isbn":        livre.isbn,
         "titre":       livre.titre,
         "auteur":      livre.auteur,
         "description": livre.description,
         "prix_cents":  livre.prix_cents,
         "disponible":  bool(livre.disponible),
         "image_url":   livre.image_url,
+        "categorie_taxe": _categorie_taxe(livre.categorie_taxe),
     }
 
 
-def commande_to_dict(cmd: Commande, with_lines: bool = True) -> dict:
+# Colonnes ajoutées par migration (null=True) : NULL vaut la valeur par défaut
+def _categorie_taxe(valeur) -> str:
+    return valeur or pricing.CATEGORIE_DEFAUT
+
+
+def _montant(valeur) -> int:
+    return valeur or 0
+
+
+def commande_to_dict(cmd: Commande, lignes: list | None = None) -> dict:
+    """
+    Sérialise une commande. Le client doit déjà être chargé par une jointure
+    (sinon Peewee ferait une requête de plus par commande). Le nom et
+    l'adresse sont ceux de la commande, figés à sa création. Les lignes ne
+    sont incluses que si on les fournit ; elles portent leur propre titre et
+    prix, figés eux aussi.
+    """
     data = {
         "id":               cmd.id,
         "statut":           cmd.statut,
         "client": {
             "id":      cmd.client.id,
-            "nom":     cmd.client.nom,
+            "nom":     cmd.nom_client,
             "email":   cmd.client.email,
-            "adresse": cmd.client.adresse,
+            "adresse": cmd.adresse_livraison,
         },
         "sous_total_cents": cmd.sous_total_cents,
+        "remise_cents":     _montant(cmd.remise_cents),
         "taxes_cents":      cmd.taxes_cents,
         "livraison_cents":  cmd.livraison_cents,
         "total_cents":      cmd.total_cents,
     }
 
-    if with_lines:
+    if lignes is not None:
         data["items"] = [
             {
-                "book_id":             ligne.livre.id,
-                "titre":               ligne.livre.titre,
+                "book_id":             ligne.livre_id,
+                "titre":               ligne.titre,
                 "quantite":            ligne.quantite,
-                "prix_unitaire_cents": ligne.livre.prix_cents,
-                "ligne_total_cents":   ligne.livre.prix_cents * ligne.quantite,
+                "prix_unitaire_cents": ligne.prix_unitaire_cents,
+                "ligne_total_cents":   ligne.prix_unitaire_cents * ligne.quantite,
             }
-            for ligne in cmd.lignes
+            for ligne in lignes
         ]
 
     return data
 
 
+# Sérialiseurs compilés (serializers.py) : lignes .tuples() -> dicts, sans
+# instance de modèle. Mêmes formes que livre_to_dict et commande_to_dict.
+
+@functools.lru_cache(maxsize=256)
+def serialiseur_livre(champs: tuple):
+    """Sérialiseur des lignes Livre.select(<colonnes champs>).tuples()."""
+    conversions = {"disponible": bool, "categorie_taxe": _categorie_taxe}
+    return compiler({c: Conversion(conversions[c], i) if c in conversions else i
+                     for i, c in enumerate(champs)})
+
+
+COLONNES_COMMANDE = (
+    Commande.id, Commande.statut, Client.id, Commande.nom_client, Client.email, Commande.adresse_livraison,
+    Commande.sous_total_cents, Commande.remise_cents, Commande.taxes_cents,
+    Commande.livraison_cents, Commande.total_cents,
+)
+commande_depuis_ligne = compiler({
+    "id": 0, "statut": 1,
+    "client": {"id": 2, "nom": 3, "email": 4, "adresse": 5},
+    "sous_total_cents": 6, "remise_cents": Conversion(_montant, 7), "taxes_cents": 8,
+    "livraison_cents": 9, "total_cents": 10,
+})
+
+# Export des commandes : colonnes de COLONNES_COMMANDE, created_at, puis celles de la ligne
+COLONNES_LIGNE = (CommandeLivre.livre, CommandeLivre.titre, CommandeLivre.quantite,
+                  CommandeLivre.prix_unitaire_cents)
+_DEBUT_LIGNE   = len(COLONNES_COMMANDE) + 1
+_ligne_export  = compiler({"book_id": _DEBUT_LIGNE, "titre": _DEBUT_LIGNE + 1,
+                           "quantite": _DEBUT_LIGNE + 2, "prix_unitaire_cents": _DEBUT_LIGNE + 3})
+
+
+def commandes_avec_client():
+    """Requête de base sur les commandes, jointe au client (évite le N+1)."""
+    return Commande.select(Commande, Client).join(Client)
+
+
+def lignes_commande(cmd: Commande):
+    """Lignes d'une commande, sans jointure (titre et prix sont dans la ligne)."""
+    return (CommandeLivre
+            .select()
+            .where(CommandeLivre.commande == cmd)
+            .order_by(CommandeLivre.id))
+
+
 def error(msg: str, code: int = 400):
     """Retourne une réponse d'erreur JSON standardisée."""
-    logger.warning("Erreur %d : %s", code, msg)
+    logger.warning("Erreur %d : %s", code, msg, extra={"code": code, "path": request.path})
     resp = jsonify({"message": msg, "code": code})
     resp.status_code = code
     return resp
 
 
+# --- Requêtes conditionnelles (ETag / Last-Modified) ---
+# Le client renvoie l'ETag reçu dans If-None-Match : si rien n'a changé, on
+# répond 304 sans corps, avant toute requête lourde ou sérialisation.
+
+CACHE_CATALOGUE = "public, no-cache"   # réutilisable, mais toujours revalidé
+CACHE_COMMANDE  = "private, no-cache"  # contient les données du client
+
+
+def _pas_modifie(etag: str, last_modified=None) -> bool:
+    """Vrai si la version que le client possède déjà est toujours valide."""
+    if request.if_none_match:
+        # Comparaison faible : les variantes compressées portent un ETag faible (compression.py)
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def reponse_validee(resp, etag: str, cache_control: str, last_modified=None):
+    """Ajoute les en-têtes de validation ; resp=None produit une 304 Not Modified."""
+    if resp is None:
+        resp = app.response_class(status=304)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = cache_control
+    if last_modified is not None:
+        resp.last_modified = last_modified
+    return resp
+
+
+def _en_utc(dt):
+    return dt.replace(tzinfo=timezone.utc) if dt else None
+
+
+def etag_commande(cmd: Commande) -> str:
+    """ETag d'une commande : change dès que son statut (donc updated_at) change."""
+    cle = f"{cmd.id}:{cmd.statut}:{cmd.updated_at.isoformat() if cmd.updated_at else ''}"
+    return "commande-" + hashlib.sha1(cle.encode()).hexdigest()[:16]
+
+
+# --- Export en flux ---
+# Les exports parcourent la requête avec .iterator() (aucune liste en mémoire)
+# et envoient les lignes au fur et à mesure : la mémoire reste constante,
+# quelle que soit la taille de la table.
+
+TAILLE_MORCEAU = 64 * 1024  # on regroupe les lignes en morceaux d'environ 64 Ko
+
+
+def reponse_flux(lignes, fmt: str):
+    """
+    Réponse HTTP en flux à partir d'un itérable de dicts.
+    fmt = "ndjson" (un objet JSON par ligne) ou "json" (un tableau, envoyé par morceaux).
+    """
+    def generer():
+        morceau   = [] if fmt == "ndjson" else [b"["]
+        taille    = 0
+        premiere  = True
+        for ligne in lignes:
+            texte = app.json.dumps_bytes(ligne)
+            if fmt == "ndjson":
+                texte += b"\n"
+            elif not premiere:
+                texte = b"," + texte
+            premiere = False
+            morceau.append(texte)
+            taille += len(texte)
+            if taille >= TAILLE_MORCEAU:
+                yield b"".join(morceau)
+                morceau, taille = [], 0
+        if fmt == "json":
+            morceau.append(b"]")
+        if morceau:
+            yield b"".join(morceau)
+
+    mimetype = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return app.response_class(stream_with_context(generer()), mimetype=mimetype)
+
+
+def _format_export():
+    fmt = request.args.get("format", "ndjson").lower()
+    return fmt if fmt in ("ndjson", "json") else None
+
+
 def validate_email(email: str) -> bool:
     """Validation basique du format d'email avec une regex."""
     return bool(_EMAIL_RE.match(email.strip()))
 
 
+def normaliser_email(email: str) -> str:
+    """Forme canonique d'un email, clé du client en BD."""
+    return email.strip().lower()
+
+
 # --- Routes API : Livres ---
 
+# GET /books : colonnes exposées (?fields=), clés de tri (?sort=) et taille des pages.
+# La description (texte long) n'est envoyée que si on la demande.
+CHAMPS_LIVRE        = ("id", "isbn", "titre", "auteur", "description", "prix_cents",
+                       "disponible", "image_url", "categorie_taxe")
+CHAMPS_LISTE_DEFAUT = tuple(c for c in CHAMPS_LIVRE if c != "description")
+TRIS_LIVRES         = {"id": Livre.id, "titre": Livre.titre, "prix_cents": Livre.prix_cents}
+TYPES_CURSEUR       = {"id": int, "titre": str, "prix_cents": int}   # type de la valeur du curseur
+LIMITE_LIVRES       = 50
+LIMITE_LIVRES_MAX   = 200
+
+
 @app.get("/books")
 def list_books():
     """
-    Liste les livres du catalogue.
-    Paramètres optionnels : ?search= (titre ou auteur), ?disponible=true
+    Liste les livres du catalogue, par pages de ?limit= livres (50 par défaut, 200 au plus).
+    Paramètres optionnels : ?search= (titre, auteur ou description), ?disponible=true,
+    ?sort=id|titre|prix_cents (préfixe "-" : ordre décroissant), ?fields=titre,auteur,...
+
+    Le corps reste une liste JSON ; l'en-tête X-Next-Cursor donne le curseur
+    de la page suivante, à repasser en ?after=. Le curseur porte la dernière
+    valeur de la clé de tri et l'id (départage) : la page suivante est lue
+    directement dans l'index (titre, id) ou (prix_cents, id), sans OFFSET.
+    Avec FTS5 et sans ?sort=, la recherche est triée par pertinence : une seule
+    page, sans curseur (?after= est refusé). Sans FTS5 (filtre LIKE), elle se
+    pagine comme la liste.
+    Les premières pages sans recherche viennent du cache du catalogue (cache.py).
     """
     q          = request.args.get("search", "").strip().lower()
     dispo_only = request.args.get("disponible", "").lower() == "true"
+    after      = request.args.get("after") or None
 
-    qs = Livre.select()
+    try:
+        limit = min(LIMITE_LIVRES_MAX, max(1, int(request.args.get("limit", LIMITE_LIVRES))))
+    except ValueError:
+        return error("limit doit être un entier", 400)
+
+    sort = request.args.get("sort", "").strip()
+    tri  = sort.lstrip("-") or "id"
+    desc = sort.startswith("-")
+    if tri not in TRIS_LIVRES:
+        return error("sort doit valoir " + ", ".join(TRIS_LIVRES) + " (préfixe - : décroissant)", 400)
+
+    champs = CHAMPS_LISTE_DEFAUT
+    if "fields" in request.args:
+        demandes = [c.strip() for c in request.args["fields"].split(",") if c.strip()]
+        inconnus = [c for c in demandes if c not in CHAMPS_LIVRE]
+        if inconnus:
+            return error("Champs inconnus : " + ", ".join(inconnus), 400)
+        # L'id est toujours renvoyé (lien vers /books/<id>, panier)
+        champs = tuple(c for c in CHAMPS_LIVRE if c == "id" or c in demandes)
+
+    par_pertinence = bool(q and not sort and recherche_fts(q))
+
+    curseur = None
+    if after is not None:
+        if par_pertinence:
+            return error("after n'est pas disponible pour une recherche triée par pertinence (utiliser ?sort=)", 400)
+        curseur = _lire_curseur_livres(after, tri)
+        if curseur is None:
+            return error("Curseur after invalide pour ce tri", 400)
+
+    # L'ETag ne dépend que de la version du catalogue et des paramètres
+    version = catalogue_cache.synchroniser()
+    cle     = f"{q}|{dispo_only}|{sort}|{','.join(champs)}|{limit}|{after}"
+    etag    = f"catalogue-v{version}-" + hashlib.sha1(cle.encode()).hexdigest()[:12]
+    if _pas_modifie(etag):
+        return reponse_validee(None, etag, CACHE_CATALOGUE)
+
+    def charger():
+        return _page_livres(dispo_only, tri, desc, champs, limit, curseur, q, par_pertinence)
+
+    # Premières pages courantes (sans recherche, champs et taille par défaut) :
+    # JSON pré-sérialisé depuis le cache
+    if not q and curseur is None and champs == CHAMPS_LISTE_DEFAUT and limit == LIMITE_LIVRES:
+        corps, suivant = catalogue_cache.liste(_cle_liste(dispo_only, sort or "id"),
+                                               lambda: _page_en_cache(charger()))
+        resp = reponse_precompressee(app, corps, "application/json", COMPRESSION_MIN_BYTES)
+    else:
+        payload, suivant = charger()
+        resp = app.response_class(payload, mimetype="application/json")
+
+    if suivant:
+        resp.headers["X-Next-Cursor"] = suivant
+    return reponse_validee(resp, etag, CACHE_CATALOGUE)
+
+
+def _page_en_cache(page: tuple) -> tuple:
+    """Page gardée dans le cache du catalogue : ses variantes compressées y sont gardées aussi."""
+    payload, suivant = page
+    return CorpsPrecompresse(payload), suivant
+
+
+def _cle_liste(dispo_only: bool, sort: str) -> str:
+    return ("disponibles" if dispo_only else "tous") + ":" + sort
+
+
+def _entier_sql(valeur) -> bool:
+    """Entier JSON utilisable dans une requête : ni booléen, ni hors des 64 bits de SQLite."""
+    return isinstance(valeur, int) and not isinstance(valeur, bool) and -2**63 <= valeur < 2**63
+
+
+def _lire_curseur_livres(after: str, tri: str):
+    """Décode un curseur ?after= ; None s'il est invalide ou s'il vient d'un autre tri."""
+    try:
+        curseur = json.loads(base64.urlsafe_b64decode(after.encode()))
+    except ValueError:   # base64, UTF-8 ou JSON invalide
+        return None
+    if not isinstance(curseur, list) or len(curseur) != 3:
+        return None
+
+    # La valeur va telle quelle dans la comparaison (clé de tri, id) : son type est vérifié
+    tri_curseur, valeur, dernier_id = curseur
+    valeur_ok = _entier_sql(valeur) if TYPES_CURSEUR[tri] is int else isinstance(valeur, str)
+    if tri_curseur != tri or not valeur_ok or not _entier_sql(dernier_id):
+        return None
+    return valeur, dernier_id
+
+
+def _page_livres(dispo_only: bool, tri: str, desc: bool, champs: tuple, limit: int,
+                 curseur=None, q: str = "", par_pertinence: bool = False) -> tuple:
+    """
+    Une page de livres : (JSON en bytes, curseur de la page suivante ou None).
+    Seules les colonnes de champs (et la clé de tri) sont lues.
+    """
+    cle        = TRIS_LIVRES[tri]
+    colonnes   = [getattr(Livre, c) for c in champs]
+    avec_cle   = tri not in champs
+    qs         = Livre.select(*colonnes, *([cle] if avec_cle else []))
 
     if q:
-        qs = qs.where((Livre.titre.contains(q)) | (Livre.auteur.contains(q)))
-
+        qs = filtrer_livres(qs, q)
     if dispo_only:
         qs = qs.where(Livre.disponible == True)
 
-    return jsonify([livre_to_dict(l) for l in qs])
+    if not par_pertinence:
+        if curseur is not None:
+            valeur, dernier_id = curseur
+            if tri == "id":
+                qs = qs.where(Livre.id < dernier_id if desc else Livre.id > dernier_id)
+            else:
+                pos = Tuple(cle, Livre.id)
+                qs  = qs.where(pos < Tuple(valeur, dernier_id) if desc else pos > Tuple(valeur, dernier_id))
+        ordre = [cle.desc(), Livre.id.desc()] if desc else [cle, Livre.id]
+        qs    = qs.order_by(*(ordre if tri != "id" else ordre[:1]))
+
+    # Une ligne de plus que demandé : indique s'il existe une page suivante
+    lignes  = list(qs.limit(limit + 1).tuples())
+    suivant = None
+    if len(lignes) > limit and not par_pertinence:
+        derniere = dict(zip(champs, lignes[limit - 1]))
+        valeur   = lignes[limit - 1][-1] if avec_cle else derniere[tri]
+        suivant  = base64.urlsafe_b64encode(
+            json.dumps([tri, valeur, derniere["id"]]).encode()).decode()
+
+    vers_dict = serialiseur_livre(champs)
+    return app.json.dumps_bytes([vers_dict(l) for l in lignes[:limit]]) + b"\n", suivant
+
+
+@app.get("/books/export")
+def export_books():
+    """
+    Export complet du catalogue en flux, trié par id.
+    Paramètres optionnels : ?format=ndjson (défaut) ou json, ?disponible=true
+    """
+    fmt = _format_export()
+    if fmt is None:
+        return error("format doit valoir ndjson ou json", 400)
+
+    qs = Livre.select(*[getattr(Livre, c) for c in CHAMPS_LIVRE]).order_by(Livre.id)
+    if request.args.get("disponible", "").lower() == "true":
+        qs = qs.where(Livre.disponible == True)
+
+    vers_dict = serialiseur_livre(CHAMPS_LIVRE)
+    return reponse_flux((vers_dict(l) for l in qs.tuples().iterator()), fmt)
 
 
 @app.get("/books/<int:book_id>")
 def get_book(book_id: int):
-    try:
-        livre = Livre.get_by_id(book_id)
-        return jsonify(livre_to_dict(livre))
-    except DoesNotExist:
+    version = catalogue_cache.synchroniser()
+    entree  = catalogue_cache.livre(book_id, lambda: _charger_livre(book_id))
+    if entree is None:
+        return error("Livre introuvable", 404)
+
+    data, updated_at = entree
+    etag = f"livre-{book_id}-v{version}"
+    if _pas_modifie(etag, updated_at):
+        return reponse_validee(None, etag, CACHE_CATALOGUE, last_modified=updated_at)
+
+    return reponse_validee(jsonify(data), etag, CACHE_CATALOGUE, last_modified=updated_at)
+
+
+@app.get("/books/<int:book_id>/stock")
+def get_book_stock(book_id: int):
+    """Stock d'un livre, lu en BD à chaque appel (il ne fait pas partie du cache du catalogue)."""
+    ligne = (Livre.select(Livre.id, Livre.stock, Livre.disponible)
+             .where(Livre.id == book_id).tuples().first())
+    if ligne is None:
         return error("Livre introuvable", 404)
+    return jsonify({"id": ligne[0], "stock": ligne[1], "disponible": bool(ligne[2])})
+
+
+def _charger_livre(book_id: int):
+    """Entrée de cache d'un livre : (dict sérialisable, date de modification UTC)."""
+    livre = Livre.get_or_none(Livre.id == book_id)
+    return (livre_to_dict(livre), _en_utc(livre.updated_at)) if livre else None
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Métriques au format texte Prometheus (requêtes, latences, SQL, cache)."""
+    cache   = catalogue_cache.stats()
+    journal = logs.stats()
+    texte = metrics.metriques.prometheus(extra=[
+        ("bookshop_catalogue_cache_hits_total",   "counter", "Lectures servies par le cache du catalogue.", cache["hits"]),
+        ("bookshop_catalogue_cache_misses_total", "counter", "Lectures du catalogue allées en BD.",         cache["misses"]),
+        ("bookshop_log_dropped_total",            "counter", "Logs abandonnés (file pleine).",             journal["perdus"]),
+        ("bookshop_log_sampled_total",            "counter", "Avertissements supprimés par échantillonnage.", journal["supprimes"]),
+        ("bookshop_log_queue_size",               "gauge",   "Logs en attente d'écriture.",                journal["en_file"]),
+    ])
+    return app.response_class(texte, mimetype="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Compteurs du cache du catalogue (hits, misses, taille)."""
+    return jsonify(catalogue_cache.stats())
 
 
 @app.post("/books")
@@ -224,19 +735,81 @@ def create_book():
     except Exception:
         return error("prix_cents doit être un entier >= 0", 400)
 
-    livre = Livre.create(
-        titre       = data["titre"],
-        auteur      = data["auteur"],
-        description = data.get("description", ""),
-        prix_cents  = prix,
-        disponible  = bool(data.get("disponible", True)),
-        image_url   = data.get("image_url", ""),
-    )
+    categorie, erreur = _lire_categorie(data.get("categorie_taxe", pricing.CATEGORIE_DEFAUT))
+    if erreur:
+        return erreur
+
+    stock, erreur = _lire_stock(data.get("stock"))
+    if erreur:
+        return erreur
 
+    try:
+        livre = Livre.create(
+            titre       = data["titre"],
+            auteur      = data["auteur"],
+            isbn        = data.get("isbn") or None,
+            description = data.get("description", ""),
+            prix_cents  = prix,
+            disponible  = bool(data.get("disponible", stock != 0)),
+            image_url   = data.get("image_url", ""),
+            categorie_taxe = categorie,
+            stock       = stock,
+        )
+    except IntegrityError:
+        return error("Un livre avec cet ISBN existe déjà", 409)
+
+    catalogue_cache.invalider()
     logger.info("Livre créé : id=%d, titre=%r", livre.id, livre.titre)
     return jsonify(livre_to_dict(livre)), 201
 
 
+def _lire_categorie(valeur) -> tuple:
+    """categorie_taxe d'un corps JSON : (catégorie connue des règles, None) ou (None, réponse d'erreur)."""
+    if not isinstance(valeur, str):
+        return None, error("categorie_taxe doit être une chaîne", 400)
+    if valeur not in pricing.regles().taux:
+        return None, error("categorie_taxe inconnue : " + valeur, 400)
+    return valeur, None
+
+
+def _lire_stock(valeur) -> tuple:
+    """stock d'un corps JSON : (entier >= 0 ou None si non suivi, None) ou (None, réponse d'erreur)."""
+    if valeur is None:
+        return None, None
+    # Un vrai entier JSON : ni booléen, ni flottant (2.9 serait tronqué), ni chaîne
+    if not _entier_sql(valeur) or valeur < 0:
+        return None, error("stock doit être un entier >= 0 (ou null : non suivi)", 400)
+    return valeur, None
+
+
+@app.post("/books/bulk")
+def bulk_import_books():
+    """
+    Import en masse (upsert par ISBN). Corps : NDJSON (un livre par ligne) ou
+    CSV avec en-têtes (isbn, titre, auteur, prix_cents, disponible, ...).
+    Le format vient de ?format= ou du Content-Type (text/csv -> CSV).
+    Les lignes invalides sont rapportées sans interrompre l'import.
+    """
+    fmt = request.args.get("format") or ("csv" if request.mimetype == "text/csv" else "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return error("format doit valoir ndjson ou csv", 400)
+
+    # Lecture en flux du corps de la requête, ligne par ligne
+    flux    = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+    lecteur = lire_csv(flux) if fmt == "csv" else lire_ndjson(flux)
+    try:
+        rapport = importer(lecteur)
+    except UnicodeDecodeError:
+        return error("Le corps doit être encodé en UTF-8", 400)
+    finally:
+        catalogue_cache.invalider()
+
+    logger.info("Import en masse : %d lignes, %d créés, %d mis à jour, %d erreurs",
+                rapport["lignes"], rapport["crees"], rapport["mis_a_jour"], rapport["erreurs"],
+                extra={k: v for k, v in rapport.items() if k != "details"})
+    return jsonify(rapport)
+
+
 @app.put("/books/<int:book_id>")
 def update_book(book_id: int):
     """Met à jour un livre (modification partielle — seuls les champs fournis sont modifiés)."""
@@ -252,6 +825,7 @@ def update_book(book_id: int):
     if "description" in data: livre.description = data["description"]
     if "disponible"  in data: livre.disponible  = bool(data["disponible"])
     if "image_url"   in data: livre.image_url   = data["image_url"]
+    if "isbn"        in data: livre.isbn        = data["isbn"] or None
 
     if "prix_cents" in data:
         try:
@@ -261,7 +835,29 @@ def update_book(book_id: int):
         except Exception:
             return error("prix_cents doit être un entier >= 0", 400)
 
-    livre.save()
+    if "categorie_taxe" in data:
+        categorie, erreur = _lire_categorie(data["categorie_taxe"])
+        if erreur:
+            return erreur
+        livre.categorie_taxe = categorie
+
+    if "stock" in data:
+        stock, erreur = _lire_stock(data["stock"])
+        if erreur:
+            return erreur
+        livre.stock = stock
+        # Réassort ou rupture : disponible suit le stock, sauf valeur explicite
+        if "disponible" not in data:
+            livre.disponible = stock != 0
+
+    livre.updated_at = maintenant_utc()
+    try:
+        # Seuls les champs fournis sont écrits : sans "stock" dans le corps, les
+        # réservations faites depuis la lecture du livre ne sont pas écrasées.
+        livre.save(only=livre.dirty_fields)
+    except IntegrityError:
+        return error("Un livre avec cet ISBN existe déjà", 409)
+    catalogue_cache.invalider()
     return jsonify(livre_to_dict(livre))
 
 
@@ -272,7 +868,17 @@ def delete_book(book_id: int):
     except DoesNotExist:
         return error("Livre introuvable", 404)
 
-    livre.delete_instance(recursive=True)
+    # Les lignes de commande gardent leur livre (historique immuable) : un
+    # livre déjà commandé se retire du catalogue avec disponible=false.
+    # La clé étrangère (RESTRICT) couvre une commande passée entre-temps.
+    message = "Livre déjà commandé : le rendre indisponible plutôt que le supprimer"
+    if CommandeLivre.select().where(CommandeLivre.livre == livre).exists():
+        return error(message, 409)
+    try:
+        livre.delete_instance()
+    except IntegrityError:
+        return error(message, 409)
+    catalogue_cache.invalider()
     return jsonify({"message": "Livre supprimé"})
 
 
@@ -280,132 +886,408 @@ def delete_book(book_id: int):
 
 VALID_STATUTS = {"en_attente", "payee", "livree"}
 
+# Transitions autorisées : en_attente -> payee -> livree
+TRANSITIONS = {
+    "en_attente": {"payee"},
+    "payee":      {"livree"},
+    "livree":     set(),
+}
+PREDECESSEURS = {new: current for current, suivants in TRANSITIONS.items() for new in suivants}
+
+# Nombre d'ids par UPDATE ... WHERE id IN (...) (limite de variables SQLite)
+TAILLE_LOT_STATUTS = 1000
+
 
 @app.get("/orders")
 def list_orders():
     """
-    Liste les commandes avec pagination.
-    Paramètres optionnels : ?page=1, ?limit=10, ?statut=en_attente
+    Liste les commandes, de la plus récente à la plus ancienne.
+    Paramètres optionnels : ?page=1, ?limit=10, ?statut=en_attente,
+    ?email= (commandes d'un client, via l'index unique client.email)
+
+    Pagination par curseur : ?after_id=<next_cursor de la page précédente>.
+    Au lieu d'un OFFSET (de plus en plus lent sur les pages profondes), on
+    cherche directement "id < after_id" dans l'index (statut, id).
+    ?with_total=false évite le COUNT(*) sur toute la table.
     """
+    email = request.args.get("email", "").strip()
+    if email:
+        client_id = Client.select(Client.id).where(Client.email == normaliser_email(email))
+        return _page_commandes(Commande.client == client_id)
+    return _page_commandes()
+
+
+@app.get("/clients/<int:client_id>/orders")
+def list_client_orders(client_id: int):
+    """Historique des commandes d'un client (mêmes paramètres que GET /orders)."""
+    if not Client.select().where(Client.id == client_id).exists():
+        return error("Client introuvable", 404)
+    return _page_commandes(Commande.client == client_id)
+
+
+def _page_commandes(*filtres):
+    """Une page de commandes, restreinte par les conditions filtres."""
     try:
         page  = max(1, int(request.args.get("page",  1)))
         limit = min(100, max(1, int(request.args.get("limit", 10))))
+        after_id = request.args.get("after_id")
+        after_id = int(after_id) if after_id else None
     except ValueError:
-        return error("page et limit doivent être des entiers", 400)
+        return error("page, limit et after_id doivent être des entiers", 400)
+    # Curseur ou OFFSET hors des 64 bits : la requête échouerait (OverflowError)
+    if (after_id is not None and not _entier_sql(after_id)) or not _entier_sql((page - 1) * limit):
+        return error("page ou after_id hors limites", 400)
+
+    with_total = request.args.get("with_total", "true").lower() != "false"
 
     statut_filter = request.args.get("statut", "").strip()
     if statut_filter and statut_filter not in VALID_STATUTS:
         return error("Statut invalide. Valeurs acceptées : " + ", ".join(sorted(VALID_STATUTS)), 400)
 
-    qs = Commande.select().order_by(Commande.id.desc())
+    qs       = Commande.select(*COLONNES_COMMANDE).join(Client).order_by(Commande.id.desc())
+    count_qs = Commande.select()
+
+    if filtres:
+        qs       = qs.where(*filtres)
+        count_qs = count_qs.where(*filtres)
 
     if statut_filter:
         qs = qs.where(Commande.statut == statut_filter)
 
-    total  = qs.count()
-    offset = (page - 1) * limit
-    items  = list(qs.offset(offset).limit(limit))
+    if after_id is not None:
+        qs = qs.where(Commande.id < after_id)
+    else:
+        qs = qs.offset((page - 1) * limit)
 
-    return jsonify({
-        "total":  total,
-        "page":   page,
-        "limit":  limit,
-        "pages":  (total + limit - 1) // limit,
-        "orders": [commande_to_dict(c, with_lines=False) for c in items],
-    })
+    # Une ligne de plus que demandé : indique s'il existe une page suivante
+    items       = list(qs.limit(limit + 1).tuples())
+    next_cursor = items[limit - 1][0] if len(items) > limit else None
+    items       = items[:limit]
+
+    data = {
+        "limit":       limit,
+        "next_cursor": next_cursor,
+        "orders":      [commande_depuis_ligne(c) for c in items],
+    }
 
+    if after_id is None:
+        data["page"] = page
 
-@app.post("/orders")
-def create_order():
+    if with_total:
+        if statut_filter:
+            count_qs = count_qs.where(Commande.statut == statut_filter)
+        total = count_qs.count()
+        data["total"] = total
+        data["pages"] = (total + limit - 1) // limit
+
+    return jsonify(data)
+
+
+@app.get("/orders/export")
+def export_orders():
     """
-    Crée une commande.
-    Le corps JSON doit contenir un objet client (nom, email, adresse)
-    et une liste d'items (book_id, quantite).
+    Export des commandes avec leurs lignes, en flux, triées par id.
+    Paramètres optionnels : ?format=ndjson (défaut) ou json, ?statut=,
+    ?depuis=AAAA-MM-JJ et ?jusqu_au=AAAA-MM-JJ (inclus, sur la date de création).
+
+    Une seule requête parcourt les lignes jointes à leur commande et leur
+    client (titre et prix sont figés dans la ligne) ; les lignes consécutives
+    d'une même commande sont regroupées à la volée.
     """
-    data   = request.get_json(force=True, silent=True) or {}
-    client = data.get("client", {})
-    items  = data.get("items", [])
+    fmt = _format_export()
+    if fmt is None:
+        return error("format doit valoir ndjson ou json", 400)
 
-    for f in ["nom", "email", "adresse"]:
-        if not client.get(f):
-            return error("Client." + f + " est requis", 400)
+    statut_filter = request.args.get("statut", "").strip()
+    if statut_filter and statut_filter not in VALID_STATUTS:
+        return error("Statut invalide. Valeurs acceptées : " + ", ".join(sorted(VALID_STATUTS)), 400)
+
+    try:
+        depuis   = request.args.get("depuis")
+        jusqu_au = request.args.get("jusqu_au")
+        depuis   = datetime.strptime(depuis,   "%Y-%m-%d") if depuis   else None
+        jusqu_au = datetime.strptime(jusqu_au, "%Y-%m-%d") if jusqu_au else None
+    except ValueError:
+        return error("depuis et jusqu_au doivent être au format AAAA-MM-JJ", 400)
+
+    qs = (CommandeLivre
+          .select(*COLONNES_COMMANDE, Commande.created_at, *COLONNES_LIGNE)
+          .join(Commande)
+          .join(Client)
+          .order_by(Commande.id, CommandeLivre.id))
+
+    if statut_filter:
+        qs = qs.where(Commande.statut == statut_filter)
+    if depuis:
+        qs = qs.where(Commande.created_at >= depuis)
+    if jusqu_au:
+        qs = qs.where(Commande.created_at < jusqu_au + timedelta(days=1))
+
+    def commandes():
+        courante = None
+        for ligne in qs.tuples().iterator():
+            if courante is None or ligne[0] != courante["id"]:
+                if courante is not None:
+                    yield courante
+                courante = _commande_export(ligne)
+            item = _ligne_export(ligne)
+            item["ligne_total_cents"] = item["prix_unitaire_cents"] * item["quantite"]
+            courante["items"].append(item)
+        if courante is not None:
+            yield courante
+
+    return reponse_flux(commandes(), fmt)
+
+
+def _commande_export(ligne: tuple) -> dict:
+    data       = commande_depuis_ligne(ligne)
+    created_at = ligne[len(COLONNES_COMMANDE)]
+    data["created_at"] = created_at.isoformat() if created_at else None
+    data["items"]      = []
+    return data
 
-    if not validate_email(client["email"]):
-        return error("Format d'email invalide", 400)
 
+def _lignes_panier(items) -> tuple:
+    """
+    Valide les items d'un panier (book_id, quantite) et charge leurs livres en
+    une seule requête. Retourne ([(livre, quantite)], None) ou (None, réponse d'erreur).
+    """
     if not items:
-        return error("La commande doit contenir au moins un article", 400)
+        return None, error("La commande doit contenir au moins un article", 400)
 
     if len(items) > MAX_ITEMS_PER_ORDER:
-        return error(f"Maximum {MAX_ITEMS_PER_ORDER} articles différents par commande", 400)
-
-    lignes     = []
-    sous_total = 0
+        return None, error(f"Maximum {MAX_ITEMS_PER_ORDER} articles différents par commande", 400)
 
+    # 1) Validation des items, sans toucher à la BD
+    demandes = []
     for it in items:
         try:
             bid = int(it["book_id"])
             qty = int(it.get("quantite", 1))
         except Exception:
-            return error("book_id et quantite doivent être des entiers", 400)
+            return None, error("book_id et quantite doivent être des entiers", 400)
 
         if qty <= 0:
-            return error("quantite doit être > 0", 400)
+            return None, error("quantite doit être > 0", 400)
 
-        try:
-            livre = Livre.get_by_id(bid)
-        except DoesNotExist:
-            return error(f"Livre {bid} introuvable", 404)
+        demandes.append((bid, qty))
+
+    # 2) Tous les livres référencés en une seule requête (WHERE id IN (...))
+    ids    = {bid for bid, _ in demandes}
+    livres = {l.id: l for l in Livre.select().where(Livre.id.in_(ids))}
+
+    lignes = []
+    for bid, qty in demandes:
+        livre = livres.get(bid)
+        if livre is None:
+            return None, error(f"Livre {bid} introuvable", 404)
 
         if not livre.disponible:
-            return error(f"Le livre '{livre.titre}' n'est pas disponible", 400)
+            return None, error(f"Le livre '{livre.titre}' n'est pas disponible", 400)
+
+        # Simple lecture, pour refuser tôt : la vraie vérification est la
+        # réservation de create_order
+        if livre.stock is not None and livre.stock < qty:
+            return None, error(f"Stock insuffisant pour le livre '{livre.titre}'", 409)
 
         lignes.append((livre, qty))
-        sous_total += livre.prix_cents * qty
 
-    taxes     = round(sous_total * TAXE_TOTALE)
-    livraison = LIVRAISON_CENTS if sous_total > 0 else 0
-    total     = sous_total + taxes + livraison
+    return lignes, None
 
-    c = Client.create(
-        nom     = client["nom"],
-        email   = client["email"],
-        adresse = client["adresse"],
-    )
 
-    cmd = Commande.create(
-        client           = c,
-        sous_total_cents = sous_total,
-        taxes_cents      = taxes,
-        livraison_cents  = livraison,
-        total_cents      = total,
-        statut           = "en_attente",
-    )
+class StockInsuffisant(Exception):
+    """Réservation refusée : un livre n'a plus assez d'exemplaires (annule la transaction)."""
 
+    def __init__(self, livre: Livre):
+        super().__init__(livre.titre)
+        self.livre = livre
+
+
+def _reserver_stock(lignes: list) -> list:
+    """
+    Décrémente le stock des livres suivis (stock non NULL) en un seul UPDATE
+    conditionnel, quel que soit le nombre de lignes :
+        UPDATE livre SET stock = stock - CASE id WHEN ? THEN ? ... END
+        WHERE id IN (...) AND disponible AND stock >= CASE id WHEN ? THEN ? ... END
+    Pas de lecture-modification-écriture : la base vérifie et décrémente
+    chaque ligne sous son propre verrou, deux commandes simultanées ne peuvent
+    pas vendre le même exemplaire. Si un livre n'est pas réservé, lève
+    StockInsuffisant (la transaction de la commande est annulée).
+    Retourne les ids des livres épuisés, passés indisponibles.
+    """
+    quantites, livres = {}, {}
     for livre, qty in lignes:
-        CommandeLivre.create(commande=cmd, livre=livre, quantite=qty)
+        if livre.stock is not None:
+            quantites[livre.id] = quantites.get(livre.id, 0) + qty
+            livres[livre.id]    = livre
+    if not quantites:
+        return []
+
+    demande  = Case(Livre.id, list(quantites.items()))
+    restants = {l.id: l.stock for l in (Livre
+                .update(stock=Livre.stock - demande)
+                .where(Livre.id.in_(list(quantites)), Livre.disponible == True, Livre.stock >= demande)
+                .returning(Livre.id, Livre.stock)
+                .execute())}
+
+    for bid in quantites:
+        if bid not in restants:
+            raise StockInsuffisant(livres[bid])
+
+    # Rare : seul cas où une commande modifie le catalogue (et sa version)
+    epuises = [bid for bid, stock in restants.items() if stock == 0]
+    if epuises:
+        (Livre.update(disponible=False, updated_at=maintenant_utc())
+         .where(Livre.id.in_(epuises), Livre.stock == 0)
+         .execute())
+    return epuises
+
+
+@app.post("/orders/quote")
+def quote_order():
+    """
+    Calcule les montants d'un panier sans créer de commande (panier du frontend).
+    Corps : {"items": [{"book_id", "quantite"}], "code_promo": facultatif}.
+    Mêmes validations et même calcul que POST /orders.
+    """
+    data = request.get_json(force=True, silent=True) or {}
 
-    logger.info("Commande créée : id=%d, client=%r, total=%d¢", cmd.id, client["nom"], total)
+    code_promo = data.get("code_promo")
+    if code_promo is not None and not isinstance(code_promo, str):
+        return error("code_promo doit être une chaîne", 400)
+
+    lignes, erreur = _lignes_panier(data.get("items", []))
+    if erreur:
+        return erreur
+
+    montants = pricing.regles().calculer(
+        ((livre.prix_cents, qty, livre.categorie_taxe) for livre, qty in lignes),
+        code_promo,
+    )
+    montants["items"] = [{
+        "book_id":             livre.id,
+        "titre":               livre.titre,
+        "quantite":            qty,
+        "prix_unitaire_cents": livre.prix_cents,
+        "categorie_taxe":      _categorie_taxe(livre.categorie_taxe),
+        "ligne_total_cents":   livre.prix_cents * qty,
+    } for livre, qty in lignes]
+    return jsonify(montants)
+
+
+@app.post("/orders")
+def create_order():
+    """
+    Crée une commande.
+    Le corps JSON doit contenir un objet client (nom, email, adresse)
+    et une liste d'items (book_id, quantite) ; code_promo est facultatif.
+    Les montants viennent du moteur de tarification (pricing.py).
+    """
+    data   = request.get_json(force=True, silent=True) or {}
+    client = data.get("client", {})
+    items  = data.get("items", [])
+
+    for f in ["nom", "email", "adresse"]:
+        if not client.get(f):
+            return error("Client." + f + " est requis", 400)
+
+    if not validate_email(client["email"]):
+        return error("Format d'email invalide", 400)
+
+    code_promo = data.get("code_promo")
+    if code_promo is not None and not isinstance(code_promo, str):
+        return error("code_promo doit être une chaîne", 400)
+
+    lignes, erreur = _lignes_panier(items)
+    if erreur:
+        return erreur
+
+    montants = pricing.regles().calculer(
+        ((livre.prix_cents, qty, livre.categorie_taxe) for livre, qty in lignes),
+        code_promo,
+    )
+    total = montants["total_cents"]
+
+    # 3) Client + commande + lignes + réservation du stock dans une seule
+    #    transaction : soit tout est écrit, soit rien (pas de commande à
+    #    moitié créée, pas d'exemplaire réservé pour une commande annulée).
+    try:
+        with db.atomic():
+            # Un client qui revient est retrouvé par son email (index unique) ;
+            # son nom et son adresse sont remplacés par ceux de la commande,
+            # qui en garde sa propre copie (les anciennes commandes ne bougent pas).
+            client_id = (Client
+                         .insert(nom=client["nom"], email=normaliser_email(client["email"]),
+                                 adresse=client["adresse"])
+                         .on_conflict(conflict_target=[Client.email],
+                                      preserve=[Client.nom, Client.adresse])
+                         .returning(Client.id)
+                         .execute())[0].id
+
+            cmd = Commande.create(
+                client            = client_id,
+                nom_client        = client["nom"],
+                adresse_livraison = client["adresse"],
+                sous_total_cents  = montants["sous_total_cents"],
+                remise_cents      = montants["remise_cents"],
+                taxes_cents       = montants["taxes_cents"],
+                livraison_cents   = montants["livraison_cents"],
+                total_cents       = total,
+                version_tarifs    = montants["version_tarifs"],
+                statut            = "en_attente",
+            )
+
+            CommandeLivre.insert_many(
+                [{"commande": cmd, "livre": livre, "quantite": qty,
+                  "titre": livre.titre, "prix_unitaire_cents": livre.prix_cents}
+                 for livre, qty in lignes]
+            ).execute()
+
+            # Réservation en dernier : sous PostgreSQL, les lignes des livres
+            # (les plus disputées) ne restent verrouillées que jusqu'au commit.
+            epuises = _reserver_stock(lignes)
+    except StockInsuffisant as e:
+        return error(f"Stock insuffisant pour le livre '{e.livre.titre}'", 409)
+
+    if epuises:
+        catalogue_cache.invalider()
+
+    logger.info("Commande créée : id=%d, client=%r, total=%d¢", cmd.id, client["nom"], total,
+                extra={"commande_id": cmd.id, "total_cents": total, "lignes": len(lignes)})
 
     return jsonify({
         "id":               cmd.id,
         "statut":           cmd.statut,
-        "sous_total_cents": sous_total,
-        "taxes_cents":      taxes,
-        "livraison_cents":  livraison,
+        "sous_total_cents": montants["sous_total_cents"],
+        "remise_cents":     montants["remise_cents"],
+        "taxes_cents":      montants["taxes_cents"],
+        "livraison_cents":  montants["livraison_cents"],
         "total_cents":      total,
+        "promotion":        montants["promotion"],
+        "version_tarifs":   montants["version_tarifs"],
     }), 201
 
 
 @app.get("/orders/<int:order_id>")
 def get_order(order_id: int):
+    """
+    Détail d'une commande. L'écran de suivi interroge cette route en boucle :
+    si la commande n'a pas changé (If-None-Match), on répond 304 sans charger
+    ses lignes.
+    """
     try:
-        cmd = Commande.get_by_id(order_id)
-        _   = list(cmd.lignes)
-        return jsonify(commande_to_dict(cmd))
+        cmd = commandes_avec_client().where(Commande.id == order_id).get()
     except DoesNotExist:
         return error("Commande introuvable", 404)
 
+    etag          = etag_commande(cmd)
+    last_modified = _en_utc(cmd.updated_at)
+    if _pas_modifie(etag, last_modified):
+        return reponse_validee(None, etag, CACHE_COMMANDE, last_modified)
+
+    resp = jsonify(commande_to_dict(cmd, list(lignes_commande(cmd))))
+    return reponse_validee(resp, etag, CACHE_COMMANDE, last_modified)
+
 
 @app.put("/orders/<int:order_id>/status")
 def update_order_status(order_id: int):
@@ -429,22 +1311,111 @@ def update_order_status(order_id: int):
     if new == current:
         return jsonify({"id": cmd.id, "statut": cmd.statut})
 
-    allowed = {
-        "en_attente": {"payee"},
-        "payee":      {"livree"},
-        "livree":     set(),
-    }
-
-    if new not in allowed[current]:
+    if new not in TRANSITIONS[current]:
         return error(f"Transition non autorisée : '{current}' -> '{new}'", 400)
 
-    cmd.statut = new
+    cmd.statut     = new
+    cmd.updated_at = maintenant_utc()
     cmd.save()
 
-    logger.info("Commande #%d : %r -> %r", order_id, current, new)
+    logger.info("Commande #%d : %r -> %r", order_id, current, new,
+                extra={"commande_id": order_id, "statut": new})
     return jsonify({"id": cmd.id, "statut": cmd.statut})
 
 
+@app.put("/orders/status")
+def update_orders_status():
+    """
+    Change le statut de plusieurs commandes en une fois.
+    Corps : {"statut": "livree", "ids": [1, 2, ...]}
+         ou {"statut": "livree", "filtre": {"depuis": "AAAA-MM-JJ", "jusqu_au": "AAAA-MM-JJ"}}
+
+    Mêmes règles que PUT /orders/<id>/status, appliquées en SQL : un seul
+    UPDATE ... WHERE statut = <prédécesseur> RETURNING id par lot d'ids (ou un
+    seul pour un filtre), le tout dans une transaction. Résultat par id :
+    modifiee, inchangee (déjà au statut demandé), non_autorisee ou introuvable.
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    new  = data.get("statut", "")
+
+    if new not in VALID_STATUTS:
+        return error("Statut invalide. Valeurs acceptées : " + ", ".join(sorted(VALID_STATUTS)), 400)
+
+    ids    = data.get("ids")
+    filtre = data.get("filtre")
+    if (ids is None) == (filtre is None):
+        return error("Fournir soit 'ids' (liste d'identifiants), soit 'filtre'", 400)
+
+    if ids is not None:
+        if not isinstance(ids, list) or not all(type(i) is int for i in ids):
+            return error("'ids' doit être une liste d'entiers", 400)
+        ids = list(dict.fromkeys(ids))
+    else:
+        if not isinstance(filtre, dict):
+            return error("'filtre' doit être un objet", 400)
+        statut_filter = filtre.get("statut")
+        if statut_filter is not None and (not isinstance(statut_filter, str)
+                                          or statut_filter not in VALID_STATUTS):
+            return error("Statut invalide. Valeurs acceptées : " + ", ".join(sorted(VALID_STATUTS)), 400)
+        try:
+            depuis   = filtre.get("depuis")
+            jusqu_au = filtre.get("jusqu_au")
+            depuis   = datetime.strptime(depuis,   "%Y-%m-%d") if depuis   else None
+            jusqu_au = datetime.strptime(jusqu_au, "%Y-%m-%d") if jusqu_au else None
+        except (TypeError, ValueError):
+            return error("depuis et jusqu_au doivent être au format AAAA-MM-JJ", 400)
+        # Un filtre vide passerait toutes les commandes du statut prédécesseur
+        if statut_filter is None and depuis is None and jusqu_au is None:
+            return error("'filtre' doit contenir au moins un critère (statut, depuis, jusqu_au)", 400)
+
+    predecesseur = PREDECESSEURS.get(new)
+
+    def passer(*conditions):
+        """UPDATE des commandes au statut prédécesseur ; renvoie les ids modifiés."""
+        if predecesseur is None:
+            return []
+        query = (Commande
+                 .update(statut=new, updated_at=maintenant_utc())
+                 .where(Commande.statut == predecesseur, *conditions)
+                 .returning(Commande.id))
+        return [cmd.id for cmd in query.execute()]
+
+    resultats = []
+    with db.atomic():
+        if ids is not None:
+            for debut in range(0, len(ids), TAILLE_LOT_STATUTS):
+                lot       = ids[debut:debut + TAILLE_LOT_STATUTS]
+                modifiees = set(passer(Commande.id.in_(lot)))
+                restantes = [i for i in lot if i not in modifiees]
+                statuts   = {}
+                if restantes:
+                    statuts = dict(Commande
+                                   .select(Commande.id, Commande.statut)
+                                   .where(Commande.id.in_(restantes))
+                                   .tuples())
+                for i in lot:
+                    if i in modifiees:
+                        resultats.append({"id": i, "resultat": "modifiee"})
+                    elif i not in statuts:
+                        resultats.append({"id": i, "resultat": "introuvable"})
+                    elif statuts[i] == new:
+                        resultats.append({"id": i, "resultat": "inchangee"})
+                    else:
+                        resultats.append({"id": i, "resultat": "non_autorisee",
+                                          "statut": statuts[i]})
+        elif statut_filter is None or statut_filter == predecesseur:
+            conditions = []
+            if depuis:
+                conditions.append(Commande.created_at >= depuis)
+            if jusqu_au:
+                conditions.append(Commande.created_at < jusqu_au + timedelta(days=1))
+            resultats = [{"id": i, "resultat": "modifiee"} for i in sorted(passer(*conditions))]
+
+    nb = sum(1 for r in resultats if r["resultat"] == "modifiee")
+    logger.info("%d commande(s) -> %r", nb, new, extra={"statut": new, "modifiees": nb})
+    return jsonify({"statut": new, "modifiees": nb, "resultats": resultats})
+
+
 # --- Lancement ---
 
 if __name__ == "__main__":
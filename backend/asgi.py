@@ -0,0 +1,211 @@
+# asgi.py — Point d'entrée ASGI de l'API.
+#
+# Les vues Flask restent synchrones : cet adaptateur les exécute dans un pool
+# de threads borné (ASGI_THREADS) pendant que la boucle asyncio du serveur
+# (uvicorn, hypercorn...) gère les connexions. Le corps de la requête est
+# reçu en entier sur la boucle (en mémoire jusqu'à 1 Mo, puis dans un fichier
+# temporaire ; au plus ASGI_MAX_CORPS octets) avant que la vue ne prenne un
+# thread : une connexion keep-alive inactive ou un client lent à envoyer son
+# corps ne coûtent rien au pool. Seules les requêtes en cours de traitement
+# (et leurs attentes de verrou SQLite) occupent un thread ; un client lent à
+# lire une réponse en flux (export) garde le sien jusqu'à la fin.
+#
+#   uvicorn backend.asgi:app --host 0.0.0.0 --port 5000
+#   python -m backend.asgi             (même chose, uvicorn doit être installé)
+#
+# Les réponses en flux (exports) sont envoyées morceau par morceau. Au
+# démarrage (lifespan), init_db() s'exécute une fois avant d'accepter du trafic.
+
+import asyncio
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from .app import app as flask_app, init_db, logger
+from .config import ASGI_THREADS, ASGI_MAX_CORPS
+
+# Au-delà, le corps reçu passe de la mémoire à un fichier temporaire
+CORPS_EN_MEMOIRE = 1024 * 1024
+
+_TROP_GROS = (413, [(b"content-type", b"text/plain")], b"Corps de requete trop volumineux")
+
+
+def _environ(scope, corps) -> dict:
+    """Environnement WSGI (PEP 3333) équivalent à une requête ASGI."""
+    serveur = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD":    scope["method"],
+        "SCRIPT_NAME":       scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO":         scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING":      scope["query_string"].decode("latin-1"),
+        "SERVER_NAME":       serveur[0],
+        "SERVER_PORT":       str(serveur[1]),
+        "SERVER_PROTOCOL":   "HTTP/" + scope.get("http_version", "1.1"),
+        "wsgi.version":      (1, 0),
+        "wsgi.url_scheme":   scope.get("scheme", "http"),
+        "wsgi.input":        corps,
+        "wsgi.input_terminated": True,
+        "wsgi.errors":       sys.stderr,
+        "wsgi.multithread":  True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once":     False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+        environ["REMOTE_PORT"] = str(scope["client"][1])
+
+    for nom, valeur in scope["headers"]:
+        nom    = nom.decode("latin-1").upper().replace("-", "_")
+        valeur = valeur.decode("latin-1")
+        if nom not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            nom = "HTTP_" + nom
+        environ[nom] = environ[nom] + "," + valeur if nom in environ else valeur
+    return environ
+
+
+class AsgiWsgi:
+    """Application ASGI 3 qui sert une application WSGI depuis un pool de threads."""
+
+    def __init__(self, wsgi_app, threads: int, au_demarrage=None, max_corps: int = ASGI_MAX_CORPS):
+        self.wsgi_app     = wsgi_app
+        self.threads      = threads
+        self.au_demarrage = au_demarrage
+        self.max_corps    = max_corps
+        self._pool        = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="asgi")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    if self.au_demarrage:
+                        await asyncio.get_running_loop().run_in_executor(self._pool, self.au_demarrage)
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._pool.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _lire_corps(self, scope, receive):
+        """
+        Reçoit tout le corps de la requête sur la boucle, sans thread du pool.
+        Retourne (fichier relu depuis le début, None), (None, réponse 413) ou
+        (None, None) si le client s'est déconnecté.
+        """
+        longueur = dict(scope["headers"]).get(b"content-length", b"")
+        if longueur.isdigit() and int(longueur) > self.max_corps:
+            return None, _TROP_GROS
+
+        corps  = tempfile.SpooledTemporaryFile(max_size=CORPS_EN_MEMOIRE)
+        taille = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                corps.close()
+                return None, None
+            morceau = message.get("body", b"")
+            taille += len(morceau)
+            if taille > self.max_corps:
+                corps.close()
+                return None, _TROP_GROS
+            corps.write(morceau)
+            if not message.get("more_body", False):
+                break
+        corps.seek(0)
+        return corps, None
+
+    async def _http(self, scope, receive, send):
+        corps, refus = await self._lire_corps(scope, receive)
+        if corps is None:
+            if refus is not None:
+                statut, entetes, contenu = refus
+                await send({"type": "http.response.start", "status": statut, "headers": entetes})
+                await send({"type": "http.response.body", "body": contenu})
+            return
+        try:
+            await self._servir(scope, corps, send)
+        finally:
+            corps.close()
+
+    async def _servir(self, scope, corps, send):
+        loop    = asyncio.get_running_loop()
+        environ = _environ(scope, corps)
+        etat    = {"demarree": False}
+
+        def envoyer(message):
+            etat["demarree"] = True
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        try:
+            resultat = await loop.run_in_executor(self._pool, self._executer, environ, envoyer)
+        except Exception:
+            logger.exception("Erreur ASGI sur %s", scope["path"])
+            if etat["demarree"]:
+                return  # réponse en flux interrompue : le serveur ferme la connexion
+            resultat = (500, [(b"content-type", b"text/plain")], b"Erreur interne du serveur")
+
+        # Réponse déjà complète (cas courant, ex. jsonify) : envoyée depuis la
+        # boucle, sans aller-retour supplémentaire entre threads.
+        if resultat is not None:
+            statut, entetes, contenu = resultat
+            await send({"type": "http.response.start", "status": statut, "headers": entetes})
+            await send({"type": "http.response.body", "body": contenu})
+
+    def _executer(self, environ, envoyer):
+        """
+        Exécute la vue dans un thread du pool. Retourne (statut, en-têtes, corps)
+        si la réponse tient en mémoire ; sinon l'envoie en flux et retourne None.
+        """
+        reponse = {"envoyee": False}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and reponse["envoyee"]:
+                raise exc_info[1].with_traceback(exc_info[2])
+            reponse["statut"]  = int(status.split(" ", 1)[0])
+            reponse["entetes"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+        corps = self.wsgi_app(environ, start_response)
+        try:
+            # Le premier morceau est gardé : s'il est le seul (cas courant, ex.
+            # jsonify), la réponse entière repart vers la boucle en une fois.
+            en_attente = None
+            for morceau in corps:
+                if not morceau:
+                    continue
+                if en_attente is None and not reponse["envoyee"]:
+                    en_attente = morceau
+                    continue
+                if not reponse["envoyee"]:
+                    envoyer({"type": "http.response.start", "status": reponse["statut"],
+                             "headers": reponse["entetes"]})
+                    envoyer({"type": "http.response.body", "body": en_attente, "more_body": True})
+                    reponse["envoyee"] = True
+                envoyer({"type": "http.response.body", "body": morceau, "more_body": True})
+
+            if not reponse["envoyee"]:
+                return reponse["statut"], reponse["entetes"], en_attente or b""
+            envoyer({"type": "http.response.body", "body": b""})
+            return None
+        finally:
+            if hasattr(corps, "close"):
+                corps.close()
+
+
+app = AsgiWsgi(flask_app, threads=ASGI_THREADS, au_demarrage=init_db)
+
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("uvicorn est requis : pip install uvicorn")
+    uvicorn.run(app, host="127.0.0.1", port=5000, log_level="warning")
@@ -0,0 +1,124 @@
+# assets.py — Fichiers du frontend servis depuis la mémoire.
+#
+# Au premier accès (ou dans serve.preparer, avant le fork), tout le dossier
+# frontend/ est lu en mémoire. Chaque fichier reçoit une empreinte (hash de
+# son contenu) qui sert d'ETag et d'URL versionnée :
+#     /frontend/css/styles.css  ->  /frontend/css/styles.1a2b3c4d5e6f.css
+# Les pages HTML sont réécrites pour pointer vers ces URL versionnées ; comme
+# l'URL change avec le contenu, le navigateur peut les garder un an sans
+# revalider (Cache-Control: immutable). La page elle-même (/app) et les URL
+# sans empreinte restent en no-cache, validées par ETag.
+#
+# En production, les requêtes statiques ne touchent plus le disque. En
+# développement (recharger=True), chaque requête compare dates et tailles des
+# fichiers et relit le dossier si quelque chose a changé.
+
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+from .compression import CorpsPrecompresse
+
+CACHE_IMMUABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDE = "public, no-cache"
+
+
+class Ressource:
+    """Un fichier du frontend en mémoire."""
+
+    def __init__(self, chemin: str, contenu: bytes):
+        self.chemin    = chemin                 # relatif au dossier, ex. "css/styles.css"
+        self.corps     = CorpsPrecompresse(contenu)
+        self.mimetype  = mimetypes.guess_type(chemin)[0] or "application/octet-stream"
+        self.empreinte = hashlib.sha256(contenu).hexdigest()[:12]
+
+    @property
+    def chemin_versionne(self) -> str:
+        racine, ext = os.path.splitext(self.chemin)
+        return f"{racine}.{self.empreinte}{ext}"
+
+
+class RessourcesStatiques:
+    """Table des fichiers du frontend, chargée une fois (ou à chaque changement en dev)."""
+
+    def __init__(self, dossier, prefixe: str = "/frontend/", recharger: bool = False):
+        self.dossier        = str(dossier)
+        self.prefixe        = prefixe
+        self.recharger      = recharger
+        self._lock          = threading.Lock()
+        self._signature     = None
+        self._par_chemin    = {}   # chemin -> Ressource
+        self._par_empreinte = {}   # chemin versionné -> Ressource
+
+    # --- Chargement ---
+
+    def _fichiers(self) -> list:
+        fichiers = []
+        for racine, _, noms in os.walk(self.dossier):
+            for nom in noms:
+                complet = os.path.join(racine, nom)
+                fichiers.append(os.path.relpath(complet, self.dossier).replace(os.sep, "/"))
+        return sorted(fichiers)
+
+    def _signature_disque(self, fichiers: list) -> tuple:
+        etats = []
+        for chemin in fichiers:
+            st = os.stat(os.path.join(self.dossier, chemin))
+            etats.append((chemin, st.st_mtime_ns, st.st_size))
+        return tuple(etats)
+
+    def charger(self, precalculer: bool = False):
+        """Lit le dossier ; precalculer=True compresse aussi chaque fichier (serve.py)."""
+        fichiers  = self._fichiers()
+        signature = self._signature_disque(fichiers)
+
+        contenus = {}
+        for chemin in fichiers:
+            with open(os.path.join(self.dossier, chemin), "rb") as f:
+                contenus[chemin] = f.read()
+
+        # Empreintes des fichiers référencés d'abord, puis réécriture des pages HTML
+        ressources = {c: Ressource(c, d) for c, d in contenus.items() if not c.endswith(".html")}
+        for chemin, contenu in contenus.items():
+            if chemin.endswith(".html"):
+                ressources[chemin] = Ressource(chemin, self._reecrire(contenu, ressources))
+
+        if precalculer:
+            for ressource in ressources.values():
+                ressource.corps.precalculer()
+
+        with self._lock:
+            self._par_chemin    = ressources
+            self._par_empreinte = {r.chemin_versionne: r for r in ressources.values()}
+            self._signature     = signature
+
+    def _reecrire(self, html: bytes, ressources: dict) -> bytes:
+        """Remplace les liens /frontend/<chemin> par leur URL versionnée."""
+        motif = re.compile(re.escape(self.prefixe.encode()) + rb'([\w./-]+)')
+
+        def remplacer(m):
+            ressource = ressources.get(m.group(1).decode())
+            return self.url(ressource).encode() if ressource else m.group(0)
+
+        return motif.sub(remplacer, html)
+
+    def _a_jour(self):
+        if self._signature is None:
+            self.charger()
+        elif self.recharger and self._signature_disque(self._fichiers()) != self._signature:
+            self.charger()
+
+    # --- Accès ---
+
+    def url(self, ressource: Ressource) -> str:
+        return self.prefixe + ressource.chemin_versionne
+
+    def trouver(self, chemin: str):
+        """Retourne (ressource, immuable) pour un chemin demandé, ou (None, False)."""
+        self._a_jour()
+        ressource = self._par_empreinte.get(chemin)
+        if ressource is not None:
+            return ressource, True
+        return self._par_chemin.get(chemin), False
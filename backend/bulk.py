@@ -0,0 +1,193 @@
+# bulk.py — Import en masse du catalogue (POST /books/bulk et scripts/import.py).
+#
+# Les lignes (NDJSON ou CSV) sont lues et validées au fil de l'eau, puis
+# insérées par lots avec insert_many().on_conflict() : un livre dont l'ISBN
+# existe déjà est mis à jour (upsert). Une ligne invalide est rapportée avec
+# son numéro sans interrompre l'import ; si un lot est refusé par la BD, il
+# est rejoué ligne par ligne pour isoler les fautives.
+
+import csv
+import json
+
+from peewee import DataError, IntegrityError
+
+from .config import IMPORT_BATCH_SIZE
+from .database import db
+from .models import Livre, maintenant_utc
+
+# Colonnes reconnues (ordre des en-têtes CSV conseillé)
+COLONNES = ["isbn", "titre", "auteur", "prix_cents", "disponible", "description", "image_url"]
+
+# Nombre maximum d'erreurs détaillées dans le rapport (les autres sont comptées)
+MAX_ERREURS_DETAILLEES = 1000
+
+_VRAI = {"1", "true", "vrai", "oui", "yes"}
+_FAUX = {"0", "false", "faux", "non", "no"}
+
+# Erreurs de la base qui visent une ligne précise (contrainte, valeur hors
+# limites) : la ligne est rapportée au lieu d'interrompre l'import
+_REFUS_BD = (IntegrityError, DataError, OverflowError)
+
+# Plus grand entier stocké par SQLite (64 bits signés)
+_ENTIER_MAX = 2**63 - 1
+
+
+def lire_ndjson(flux):
+    """Un objet JSON par ligne ; les lignes vides sont ignorées. Produit (numéro, dict|str)."""
+    for num, ligne in enumerate(flux, start=1):
+        ligne = ligne.strip()
+        if not ligne:
+            continue
+        try:
+            data = json.loads(ligne)
+        except ValueError:
+            yield num, "JSON invalide"
+            continue
+        yield num, data if isinstance(data, dict) else "un objet JSON est attendu"
+
+
+def lire_csv(flux):
+    """CSV avec ligne d'en-têtes. Produit (numéro de ligne, dict)."""
+    lecteur = csv.DictReader(flux)
+    for data in lecteur:
+        yield lecteur.line_num, data
+
+
+def valider(data: dict):
+    """Retourne (ligne prête pour insert_many, None) ou (None, message d'erreur)."""
+    isbn = str(data.get("isbn") or "").strip()
+    if not isbn:
+        return None, "isbn manquant"
+
+    for f in ("titre", "auteur"):
+        if not str(data.get(f) or "").strip():
+            return None, f"{f} manquant"
+
+    prix = data.get("prix_cents")
+    if isinstance(prix, str):  # CSV : tout est texte
+        try:
+            prix = int(prix.strip())
+        except ValueError:
+            pass
+    if not isinstance(prix, int) or isinstance(prix, bool) or not 0 <= prix <= _ENTIER_MAX:
+        return None, "prix_cents doit être un entier >= 0"
+
+    dispo = data.get("disponible", True)
+    if dispo is None or (isinstance(dispo, str) and not dispo.strip()):
+        dispo = True  # champ absent ou colonne CSV vide -> disponible par défaut
+    elif not isinstance(dispo, bool):
+        texte = str(dispo).strip().lower() if isinstance(dispo, (str, int)) else None
+        if texte in _VRAI:
+            dispo = True
+        elif texte in _FAUX:
+            dispo = False
+        else:
+            return None, "disponible doit être un booléen"
+
+    return {
+        "isbn":        isbn,
+        "titre":       str(data["titre"]).strip(),
+        "auteur":      str(data["auteur"]).strip(),
+        "prix_cents":  prix,
+        "disponible":  dispo,
+        "description": data.get("description") or "",
+        "image_url":   data.get("image_url") or "",
+    }, None
+
+
+class Rapport:
+    def __init__(self):
+        self.lignes      = 0
+        self.crees       = 0
+        self.mis_a_jour  = 0
+        self.nb_erreurs  = 0
+        self.erreurs     = []
+        self.lots        = 0
+
+    def erreur(self, num: int, message: str):
+        self.nb_erreurs += 1
+        if len(self.erreurs) < MAX_ERREURS_DETAILLEES:
+            self.erreurs.append({"ligne": num, "erreur": message})
+
+    def to_dict(self) -> dict:
+        return {
+            "lignes":     self.lignes,
+            "crees":      self.crees,
+            "mis_a_jour": self.mis_a_jour,
+            "erreurs":    self.nb_erreurs,
+            "lots":       self.lots,
+            "details":    self.erreurs,
+        }
+
+
+def _upsert(lignes: list):
+    now = maintenant_utc()
+    (Livre
+     .insert_many([{**l, "updated_at": now} for l in lignes])
+     .on_conflict(
+         conflict_target=[Livre.isbn],
+         preserve=[Livre.titre, Livre.auteur, Livre.prix_cents, Livre.disponible,
+                   Livre.description, Livre.image_url, Livre.updated_at],
+     )
+     .execute())
+
+
+def _ecrire_lot(lot: dict, rapport: Rapport):
+    """lot : isbn -> (numéro de ligne, ligne). Une seule occurrence par ISBN."""
+    rapport.lots += 1
+    existants = {l.isbn for l in Livre.select(Livre.isbn).where(Livre.isbn.in_(list(lot)))}
+    lignes    = [ligne for _, ligne in lot.values()]
+
+    try:
+        with db.atomic():
+            _upsert(lignes)
+    except _REFUS_BD:
+        # Lot refusé : on rejoue ligne par ligne pour isoler les fautives
+        for isbn, (num, ligne) in lot.items():
+            try:
+                with db.atomic():
+                    _upsert([ligne])
+            except _REFUS_BD as e:
+                rapport.erreur(num, f"refusé par la base : {e}")
+                existants.discard(isbn)
+                lot[isbn] = (num, None)
+
+    for isbn, (_, ligne) in lot.items():
+        if ligne is None:
+            continue
+        if isbn in existants:
+            rapport.mis_a_jour += 1
+        else:
+            rapport.crees += 1
+
+
+def importer(entrees, taille_lot: int = IMPORT_BATCH_SIZE) -> dict:
+    """
+    Importe un itérable de (numéro de ligne, dict|message d'erreur).
+    Retourne le rapport : lignes lues, créées, mises à jour, erreurs détaillées.
+    """
+    rapport = Rapport()
+    lot     = {}
+
+    for num, data in entrees:
+        rapport.lignes += 1
+        if isinstance(data, str):
+            rapport.erreur(num, data)
+            continue
+
+        ligne, message = valider(data)
+        if message:
+            rapport.erreur(num, message)
+            continue
+
+        # Même ISBN deux fois dans un lot : la dernière occurrence l'emporte
+        lot.pop(ligne["isbn"], None)
+        lot[ligne["isbn"]] = (num, ligne)
+        if len(lot) >= taille_lot:
+            _ecrire_lot(lot, rapport)
+            lot = {}
+
+    if lot:
+        _ecrire_lot(lot, rapport)
+
+    return rapport.to_dict()
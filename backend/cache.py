@@ -0,0 +1,168 @@
+# cache.py — Cache mémoire du catalogue.
+#
+# Le catalogue change rarement (create_book, update_book, delete_book) mais il
+# est lu à chaque affichage. On garde donc en mémoire :
+#   - les livres individuels (LRU borné) pour GET /books/<id>
+#   - le JSON déjà sérialisé des listes courantes (GET /books, ?disponible=true)
+#
+# Invalidation : chaque écriture sur la table livre incrémente un numéro de
+# version stocké en BD (trigger SQLite). Avant de servir le cache, on relit ce
+# numéro : une seule lecture par clé primaire, partagée par tous les workers,
+# donc aucun processus ne sert un catalogue périmé.
+#
+# Le stock ne fait pas partie du catalogue mis en cache : une réservation
+# (UPDATE livre SET stock = ...) ne change pas la version, sinon chaque
+# commande viderait le cache de tous les workers.
+
+import logging
+import threading
+from collections import OrderedDict
+
+from .config import CACHE_LIVRES_MAX
+from .database import db, est_sqlite
+from .models import Livre, VersionCatalogue
+
+logger = logging.getLogger("bookshop.cache")
+
+# Colonnes de livre dont la modification change la version (toutes sauf le stock)
+_COLONNES_CATALOGUE = ", ".join(
+    f.column_name for f in Livre._meta.sorted_fields if f.name not in ("id", "stock"))
+
+_TRIGGERS = [
+    # Les anciennes bases ont un trigger sur tout UPDATE : il est recréé
+    "DROP TRIGGER IF EXISTS catalogue_version_au",
+] + [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS catalogue_version_{nom} AFTER {evenement} ON livre BEGIN
+        UPDATE catalogue_version SET version = version + 1 WHERE id = 1;
+    END
+    """
+    for nom, evenement in [("ai", "INSERT"), ("au", f"UPDATE OF {_COLONNES_CATALOGUE}"), ("ad", "DELETE")]
+]
+
+# Équivalent PostgreSQL : un seul trigger par instruction (et non par ligne).
+_TRIGGERS_PG = [
+    """
+    CREATE OR REPLACE FUNCTION catalogue_version_incr() RETURNS trigger AS $$
+    BEGIN
+        UPDATE catalogue_version SET version = version + 1 WHERE id = 1;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS catalogue_version_maj ON livre",
+    f"""
+    CREATE TRIGGER catalogue_version_maj AFTER INSERT OR DELETE OR UPDATE OF {_COLONNES_CATALOGUE} ON livre
+    FOR EACH STATEMENT EXECUTE FUNCTION catalogue_version_incr()
+    """,
+]
+
+
+class CatalogueCache:
+    """Cache versionné du catalogue, partagé par les threads d'un processus."""
+
+    def __init__(self, max_livres: int = CACHE_LIVRES_MAX):
+        self.max_livres = max_livres
+        self._lock      = threading.Lock()
+        self._version   = None
+        self._livres    = OrderedDict()   # id -> dict sérialisable
+        self._listes    = {}              # clé -> bytes JSON
+        # Incrémentée à chaque vidage : un chargement commencé avant n'est pas gardé
+        self._generation = 0
+        self.hits       = 0
+        self.misses     = 0
+
+    # --- Version ---
+
+    def synchroniser(self) -> int:
+        """Relit la version partagée et vide le cache si elle a changé."""
+        version = lire_version()
+        with self._lock:
+            if version != self._version:
+                self._vider()
+                self._version = version
+        return version
+
+    def invalider(self):
+        """Vide le cache local (appelé après chaque écriture sur le catalogue)."""
+        with self._lock:
+            self._vider()
+            self._version = None
+
+    def _vider(self):
+        """À appeler sous le verrou."""
+        self._livres.clear()
+        self._listes.clear()
+        self._generation += 1
+
+    # --- Livres individuels (LRU) ---
+
+    def livre(self, book_id: int, charger):
+        """
+        Retourne le livre en cache, ou appelle charger() et garde le résultat.
+        charger() retourne un dict, ou None si le livre n'existe pas (non mis en cache).
+        Le résultat n'est pas gardé si le cache a été vidé pendant charger() :
+        il peut dater d'avant l'écriture qui l'a vidé.
+        """
+        with self._lock:
+            if book_id in self._livres:
+                self._livres.move_to_end(book_id)
+                self.hits += 1
+                return self._livres[book_id]
+            self.misses += 1
+            generation = self._generation
+
+        data = charger()
+        if data is not None:
+            with self._lock:
+                if generation != self._generation:
+                    return data
+                self._livres[book_id] = data
+                self._livres.move_to_end(book_id)
+                while len(self._livres) > self.max_livres:
+                    self._livres.popitem(last=False)
+        return data
+
+    # --- Listes pré-sérialisées ---
+
+    def liste(self, cle: str, charger) -> bytes:
+        """Retourne le JSON (bytes) d'une liste, en le construisant au besoin (même règle que livre())."""
+        with self._lock:
+            if cle in self._listes:
+                self.hits += 1
+                return self._listes[cle]
+            self.misses += 1
+            generation = self._generation
+
+        payload = charger()
+        with self._lock:
+            if generation == self._generation:
+                self._listes[cle] = payload
+        return payload
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self._version,
+                "hits":    self.hits,
+                "misses":  self.misses,
+                "livres":  len(self._livres),
+                "listes":  len(self._listes),
+            }
+
+
+catalogue_cache = CatalogueCache()
+
+
+def lire_version() -> int:
+    """Version courante du catalogue (incrémentée par trigger à chaque écriture)."""
+    row = db.execute_sql('SELECT "version" FROM "catalogue_version" WHERE "id" = 1').fetchone()
+    return row[0] if row else 0
+
+
+def init_cache():
+    """Crée la ligne de version et ses triggers (appelé par init_db)."""
+    VersionCatalogue.insert(id=1, version=0).on_conflict_ignore().execute()
+    for sql in (_TRIGGERS if est_sqlite() else _TRIGGERS_PG):
+        db.execute_sql(sql)
+    catalogue_cache.invalider()
@@ -0,0 +1,126 @@
+# compression.py — Compression des réponses (gzip, et brotli s'il est installé).
+#
+# Le navigateur annonce ce qu'il accepte (Accept-Encoding) ; on choisit brotli
+# s'il est disponible et accepté, sinon gzip. Seules les réponses textuelles
+# (JSON, HTML, CSS, JS) d'au moins COMPRESSION_MIN_BYTES octets sont
+# compressées : en dessous, le gain ne compense pas le coût.
+#
+# Deux cas :
+#   - réponses ordinaires : compressées à la volée (niveau rapide) par le hook
+#     after_request installé par installer() ;
+#   - corps réutilisés (pages du catalogue en cache, fichiers du frontend en
+#     mémoire) : CorpsPrecompresse garde chaque variante compressée, calculée
+#     une seule fois (niveau maximal).
+# Les exports en flux ne sont pas compressés.
+#
+# Une réponse compressée porte Content-Encoding, Vary: Accept-Encoding et un
+# ETag faible : la validation (If-None-Match) reste la même pour toutes les
+# variantes d'une ressource.
+
+import gzip
+import threading
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optionnel : pip install brotli
+    brotli = None
+
+TYPES_COMPRESSIBLES = {
+    "application/json", "application/x-ndjson", "application/javascript",
+    "text/html", "text/css", "text/javascript", "text/plain",
+}
+
+# Niveaux : rapides pour les réponses compressées à chaque requête, maximaux
+# pour les variantes calculées une seule fois
+_NIVEAUX = {
+    False: {"gzip": 6, "br": 4},
+    True:  {"gzip": 9, "br": 11},
+}
+
+
+def encodages_disponibles() -> list:
+    """Encodages proposés, par ordre de préférence."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def encodage_accepte() -> str | None:
+    """Meilleur encodage accepté par le client (selon Accept-Encoding et ses q=)."""
+    return request.accept_encodings.best_match(encodages_disponibles())
+
+
+def compresser(donnees: bytes, encodage: str, maximal: bool = False) -> bytes:
+    niveau = _NIVEAUX[maximal][encodage]
+    if encodage == "br":
+        return brotli.compress(donnees, quality=niveau)
+    # mtime=0 : la même entrée donne toujours les mêmes octets
+    return gzip.compress(donnees, compresslevel=niveau, mtime=0)
+
+
+class CorpsPrecompresse:
+    """Corps de réponse réutilisé ; ses variantes compressées sont calculées une fois."""
+
+    def __init__(self, brut: bytes):
+        self.brut       = brut
+        self._variantes = {}
+        self._lock      = threading.Lock()
+
+    def variante(self, encodage: str) -> bytes:
+        with self._lock:
+            if encodage not in self._variantes:
+                self._variantes[encodage] = compresser(self.brut, encodage, maximal=True)
+            return self._variantes[encodage]
+
+    def precalculer(self):
+        for encodage in encodages_disponibles():
+            self.variante(encodage)
+
+
+def _compressible(response, seuil: int) -> bool:
+    return (response.mimetype in TYPES_COMPRESSIBLES
+            and response.status_code == 200
+            and "Content-Encoding" not in response.headers
+            and (response.content_length or 0) >= seuil)
+
+
+def _marquer(response, encodage: str):
+    """En-têtes d'une réponse dont le corps vient d'être remplacé par sa variante compressée."""
+    response.headers["Content-Encoding"] = encodage
+    etag, faible = response.get_etag()
+    if etag and not faible:
+        response.set_etag(etag, weak=True)
+
+
+def reponse_precompressee(app, corps: CorpsPrecompresse, mimetype: str, seuil: int):
+    """Réponse avec la variante de corps adaptée au client (calculée une seule fois)."""
+    encodage = encodage_accepte() if len(corps.brut) >= seuil else None
+    resp     = app.response_class(corps.variante(encodage) if encodage else corps.brut, mimetype=mimetype)
+    resp.vary.add("Accept-Encoding")
+    if encodage:
+        resp.headers["Content-Encoding"] = encodage
+    return resp
+
+
+def installer(app, seuil: int):
+    """Compresse à la volée les réponses textuelles d'au moins seuil octets."""
+
+    @app.after_request
+    def _compresser(response):
+        if response.is_streamed or response.direct_passthrough:
+            return response
+        if response.headers.get("Content-Encoding") in ("gzip", "br"):
+            # Variante précompressée : l'ETag posé par la route devient faible
+            _marquer(response, response.headers["Content-Encoding"])
+            return response
+        if response.mimetype not in TYPES_COMPRESSIBLES:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if not _compressible(response, seuil):
+            return response
+        encodage = encodage_accepte()
+        if encodage:
+            response.set_data(compresser(response.get_data(), encodage))
+            _marquer(response, encodage)
+        return response
@@ -0,0 +1,180 @@
+# logs.py — Logging asynchrone : les handlers ne bloquent jamais une requête.
+#
+# Les routes écrivent dans une file bornée (QueueHandler) ; un thread dédié
+# (QueueListener) vide la file et fait l'écriture sur stderr. Si la file est
+# pleine (rafale de requêtes, stderr lent), l'enregistrement est abandonné et
+# compté plutôt que d'attendre. Les avertissements répétitifs (4xx) sont
+# échantillonnés : au plus N par minute et par message (gabarit, code HTTP et
+# chemin), le reste est compté.
+# En production, chaque ligne est un objet JSON (un enregistrement par ligne).
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributs standards d'un LogRecord : tout le reste vient de extra={...}
+_ATTRIBUTS_STANDARDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement, avec les champs passés dans extra=."""
+
+    def format(self, record):
+        data = {
+            "ts":      datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "niveau":  record.levelname,
+            "logger":  record.name,
+            "message": record.getMessage(),
+        }
+        for cle, valeur in vars(record).items():
+            if cle not in _ATTRIBUTS_STANDARDS and not cle.startswith("_"):
+                data[cle] = valeur
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class Echantillonnage(logging.Filter):
+    """
+    Laisse passer au plus `max_par_fenetre` avertissements par message et par
+    fenêtre de `fenetre` secondes. Un message est identifié par le logger, le
+    gabarit (ex. "Erreur %d : %s") et les champs `code` et `path` passés dans
+    extra= : une rafale de 404 ne masque pas les 400 ou 409 d'une autre route.
+    Au plus `max_cles` messages sont suivis ; au-delà, le chemin est ignoré.
+    Les niveaux ERROR et plus ne sont jamais échantillonnés.
+    """
+
+    def __init__(self, max_par_fenetre: int = 20, fenetre: float = 60.0, max_cles: int = 1000):
+        super().__init__()
+        self.max_par_fenetre = max_par_fenetre
+        self.fenetre         = fenetre
+        self.max_cles        = max_cles
+        self.supprimes       = 0
+        self._lock           = threading.Lock()
+        self._compteurs      = {}   # (logger, gabarit, code, chemin) -> (début de fenêtre, nombre)
+
+    def _cle(self, record, maintenant):
+        """Clé de comptage ; appelée verrou pris."""
+        cle = (record.name, str(record.msg), getattr(record, "code", None), getattr(record, "path", None))
+        if cle in self._compteurs or len(self._compteurs) < self.max_cles:
+            return cle
+        # Table pleine : on oublie les fenêtres expirées, sinon on regroupe
+        # les chemins (ex. un balayage de /books/<id> inexistants)
+        self._compteurs = {c: v for c, v in self._compteurs.items() if maintenant - v[0] < self.fenetre}
+        if len(self._compteurs) < self.max_cles:
+            return cle
+        return cle[:3] + (None,)
+
+    def filter(self, record):
+        if record.levelno != logging.WARNING:
+            return True
+
+        maintenant = time.monotonic()
+        with self._lock:
+            cle      = self._cle(record, maintenant)
+            debut, n = self._compteurs.get(cle, (maintenant, 0))
+            if maintenant - debut >= self.fenetre:
+                debut, n = maintenant, 0
+            if n >= self.max_par_fenetre:
+                self.supprimes += 1
+                return False
+            self._compteurs[cle] = (debut, n + 1)
+        return True
+
+
+class QueueHandlerBorne(QueueHandler):
+    """QueueHandler qui abandonne (et compte) au lieu de bloquer quand la file est pleine."""
+
+    def __init__(self, file: queue.Queue):
+        super().__init__(file)
+        self.perdus = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.perdus += 1
+
+    def prepare(self, record):
+        # Le message est formaté ici (les arguments peuvent changer ensuite),
+        # mais la mise en forme finale (JSON ou texte) se fait dans le thread
+        # du listener.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg     = record.message
+        record.args    = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_handler      = None
+_echantillons = None
+_listener     = None
+
+
+def configurer(niveau: int, format_json: bool, taille_file: int, max_4xx_par_minute: int):
+    """Remplace les handlers du logger racine par la file asynchrone (une seule fois)."""
+    global _handler, _echantillons, _listener
+    if _listener is not None:
+        return
+
+    sortie = logging.StreamHandler()
+    if format_json:
+        sortie.setFormatter(JsonFormatter())
+    else:
+        sortie.setFormatter(logging.Formatter(
+            "%(asctime)s [%(levelname)s] %(name)s — %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
+
+    _echantillons = Echantillonnage(max_par_fenetre=max_4xx_par_minute)
+    _handler      = QueueHandlerBorne(queue.Queue(maxsize=taille_file))
+    _handler.addFilter(_echantillons)
+
+    racine = logging.getLogger()
+    for h in list(racine.handlers):
+        racine.removeHandler(h)
+    racine.addHandler(_handler)
+    racine.setLevel(niveau)
+
+    _listener = QueueListener(_handler.queue, sortie, respect_handler_level=True)
+    _listener.start()
+    atexit.register(arreter)
+
+
+def arreter():
+    """Vide la file et arrête le thread d'écriture (appelé à la sortie)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def apres_fork():
+    """
+    À appeler dans un processus forké : le thread d'écriture du parent n'y
+    existe pas. On repart d'une file vide (et de verrous neufs) avec un
+    nouveau thread.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _handler.queue      = queue.Queue(maxsize=_handler.queue.maxsize)
+    _echantillons._lock = threading.Lock()
+    _listener = QueueListener(_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stats() -> dict:
+    """Compteurs exposés dans /metrics."""
+    return {
+        "perdus":    _handler.perdus if _handler else 0,
+        "supprimes": _echantillons.supprimes if _echantillons else 0,
+        "en_file":   _handler.queue.qsize() if _handler else 0,
+    }
@@ -0,0 +1,155 @@
+# metrics.py — Instrumentation des requêtes HTTP et SQL.
+#
+# Pour chaque requête on mesure la durée totale, le nombre de requêtes SQL et
+# le temps passé dans la BD (en enveloppant db.execute_sql). Les mesures sont
+# agrégées par endpoint (règle Flask, ex. "/books/<int:book_id>") :
+#   - compteur de requêtes par statut HTTP ;
+#   - histogramme des durées (seaux fixes, format Prometheus) ;
+#   - totaux de requêtes SQL et de temps BD.
+# GET /metrics les expose au format texte Prometheus. En mode debug, chaque
+# réponse porte aussi un en-tête Server-Timing (visible dans le navigateur).
+#
+# Coût : deux appels à perf_counter() par requête SQL et une mise à jour de
+# dictionnaires sous verrou par requête HTTP — négligeable en production.
+# Le temps BD couvre l'exécution de la requête, pas la lecture paresseuse des
+# lignes par le curseur.
+
+import threading
+import time
+from collections import defaultdict
+
+from flask import g, request
+
+# Bornes des seaux de l'histogramme de durée, en secondes
+SEAUX = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Metriques:
+    """Registre des mesures, partagé par les threads d'un processus."""
+
+    def __init__(self):
+        self._lock     = threading.Lock()
+        self.requetes  = defaultdict(int)                         # (endpoint, méthode, statut) -> n
+        self.seaux     = defaultdict(lambda: [0] * (len(SEAUX) + 1))  # (endpoint, méthode) -> compteurs
+        self.durees    = defaultdict(float)                       # (endpoint, méthode) -> somme (s)
+        self.sql       = defaultdict(int)                         # (endpoint, méthode) -> nb requêtes SQL
+        self.temps_bd  = defaultdict(float)                       # (endpoint, méthode) -> somme (s)
+
+    def enregistrer(self, endpoint, methode, statut, duree, nb_sql, temps_bd):
+        cle = (endpoint, methode)
+        with self._lock:
+            self.requetes[(endpoint, methode, statut)] += 1
+            self.durees[cle]   += duree
+            self.sql[cle]      += nb_sql
+            self.temps_bd[cle] += temps_bd
+            seaux = self.seaux[cle]
+            for i, borne in enumerate(SEAUX):
+                if duree <= borne:
+                    seaux[i] += 1
+                    break
+            else:
+                seaux[-1] += 1
+
+    def reinitialiser(self):
+        with self._lock:
+            for d in (self.requetes, self.seaux, self.durees, self.sql, self.temps_bd):
+                d.clear()
+
+    def prometheus(self, extra=None) -> str:
+        """Rend les métriques au format texte Prometheus (version 0.0.4)."""
+        lignes = []
+
+        def entete(nom, type_, aide):
+            lignes.append(f"# HELP {nom} {aide}")
+            lignes.append(f"# TYPE {nom} {type_}")
+
+        with self._lock:
+            entete("bookshop_http_requests_total", "counter", "Requêtes HTTP par endpoint, méthode et statut.")
+            for (endpoint, methode, statut), n in sorted(self.requetes.items()):
+                lignes.append(f'bookshop_http_requests_total{{endpoint="{endpoint}",method="{methode}",'
+                              f'status="{statut}"}} {n}')
+
+            entete("bookshop_http_request_duration_seconds", "histogram", "Durée des requêtes HTTP.")
+            for (endpoint, methode), seaux in sorted(self.seaux.items()):
+                labels = f'endpoint="{endpoint}",method="{methode}"'
+                cumul  = 0
+                for borne, n in zip(SEAUX, seaux):
+                    cumul += n
+                    lignes.append(f'bookshop_http_request_duration_seconds_bucket{{{labels},le="{borne}"}} {cumul}')
+                cumul += seaux[-1]
+                lignes.append(f'bookshop_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumul}')
+                lignes.append(f"bookshop_http_request_duration_seconds_sum{{{labels}}} "
+                              f"{self.durees[(endpoint, methode)]:.6f}")
+                lignes.append(f"bookshop_http_request_duration_seconds_count{{{labels}}} {cumul}")
+
+            entete("bookshop_db_queries_total", "counter", "Requêtes SQL émises, par endpoint.")
+            for (endpoint, methode), n in sorted(self.sql.items()):
+                lignes.append(f'bookshop_db_queries_total{{endpoint="{endpoint}",method="{methode}"}} {n}')
+
+            entete("bookshop_db_time_seconds_total", "counter", "Temps cumulé passé dans la BD, par endpoint.")
+            for (endpoint, methode), s in sorted(self.temps_bd.items()):
+                lignes.append(f'bookshop_db_time_seconds_total{{endpoint="{endpoint}",method="{methode}"}} {s:.6f}')
+
+        for nom, type_, aide, valeur in (extra or []):
+            entete(nom, type_, aide)
+            lignes.append(f"{nom} {valeur}")
+
+        return "\n".join(lignes) + "\n"
+
+
+metriques = Metriques()
+
+# Compteurs SQL de la requête en cours, propres à chaque thread
+_courant = threading.local()
+
+
+def _reinitialiser_courant():
+    _courant.nb_sql   = 0
+    _courant.temps_bd = 0.0
+
+
+def instrumenter_db(database):
+    """Enveloppe database.execute_sql pour compter les requêtes et leur durée."""
+    original = database.execute_sql
+
+    def execute_sql(sql, params=None, *args, **kwargs):
+        debut = time.perf_counter()
+        try:
+            return original(sql, params, *args, **kwargs)
+        finally:
+            _courant.nb_sql   = getattr(_courant, "nb_sql", 0) + 1
+            _courant.temps_bd = getattr(_courant, "temps_bd", 0.0) + time.perf_counter() - debut
+
+    database.execute_sql = execute_sql
+
+
+def installer(app, database, server_timing: bool = False):
+    """
+    Branche l'instrumentation sur l'application. À appeler avant les autres
+    before_request (ouverture de connexion comprise dans la mesure).
+    """
+    instrumenter_db(database)
+
+    @app.before_request
+    def _debut_mesure():
+        _reinitialiser_courant()
+        g._debut_requete = time.perf_counter()
+
+    @app.after_request
+    def _fin_mesure(response):
+        debut = g.pop("_debut_requete", None)
+        if debut is None:
+            return response
+
+        duree    = time.perf_counter() - debut
+        nb_sql   = getattr(_courant, "nb_sql", 0)
+        temps_bd = getattr(_courant, "temps_bd", 0.0)
+        endpoint = request.url_rule.rule if request.url_rule else "inconnu"
+
+        metriques.enregistrer(endpoint, request.method, response.status_code, duree, nb_sql, temps_bd)
+
+        if server_timing:
+            response.headers["Server-Timing"] = (
+                f'db;dur={temps_bd * 1000:.2f};desc="{nb_sql} SQL", app;dur={duree * 1000:.2f}'
+            )
+        return response
@@ -3,11 +3,18 @@
 
 from peewee import (
     Model, CharField, IntegerField, BooleanField, ForeignKeyField,
-    Check, TextField
+    Check, TextField, DateTimeField, SQL
 )
+from datetime import datetime, timezone
+from playhouse.sqlite_ext import FTS5Model, RowIDField, SearchField
 from .database import db
 
 
+def maintenant_utc() -> datetime:
+    """Date/heure UTC courante, sans fuseau (comme CURRENT_TIMESTAMP de SQLite)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 # Toutes les tables vont hériter de BaseModel,
 # ce qui permet d'éviter de répéter database = db partout.
 class BaseModel(Model):
@@ -20,6 +27,9 @@ class Livre(BaseModel):
     # Titre du livre (ex: "Python pour les nuls")
     titre = CharField()
 
+    # ISBN / référence fournisseur : clé de l'import en masse (facultatif, unique)
+    isbn = CharField(null=True, unique=True)
+
     # Description courte du livre (facultatif)
     description = TextField(default='')
 
@@ -35,12 +45,31 @@ class Livre(BaseModel):
     # Indique si le livre est en stock ou non
     disponible = BooleanField(default=True)
 
+    # Exemplaires en stock ; NULL = stock non suivi (seul "disponible" compte).
+    # Décrémenté à la commande par un UPDATE conditionnel (voir create_order),
+    # disponible passe à faux quand il tombe à 0.
+    stock = IntegerField(null=True, constraints=[Check('stock >= 0')])
+
+    # Catégorie de taxe (taux définis dans les règles tarifaires, voir pricing.py)
+    categorie_taxe = CharField(default='standard')
+
+    # Date de dernière modification (UTC) — sert au Last-Modified HTTP
+    updated_at = DateTimeField(default=maintenant_utc)
+
+    class Meta:
+        # Tris de GET /books (?sort=titre, ?sort=prix_cents) : l'id départage
+        # les égalités, la pagination par curseur reprend dans l'index.
+        indexes = (
+            (('titre', 'id'), False),
+            (('prix_cents', 'id'), False),
+        )
+
 
 # ---------------------- Table Client ---------------------- #
 class Client(BaseModel):
     # Informations de base du client
     nom = CharField()
-    email = CharField()
+    email = CharField(unique=True)  # normalisé (minuscules) : un client par email
     adresse = TextField()  # TextField utile si l'adresse est longue
 
 
@@ -53,11 +82,20 @@ class Commande(BaseModel):
         on_delete='CASCADE'   # Si un client est supprimé -> ses commandes aussi
     )
 
+    # Nom et adresse de livraison copiés au moment de la commande : le client
+    # peut en changer à l'achat suivant sans réécrire ses anciennes commandes.
+    nom_client        = CharField(null=True)
+    adresse_livraison = TextField(null=True)
+
     # Montants (toujours en centimes)
     sous_total_cents = IntegerField(
         constraints=[Check('sous_total_cents >= 0')],
         default=0
     )
+    remise_cents = IntegerField(
+        constraints=[Check('remise_cents >= 0')],
+        default=0
+    )
     taxes_cents = IntegerField(
         constraints=[Check('taxes_cents >= 0')],
         default=0
@@ -71,6 +109,9 @@ class Commande(BaseModel):
         default=0
     )
 
+    # Version des règles tarifaires qui ont servi au calcul des montants
+    version_tarifs = CharField(null=True)
+
     # Statut de la commande : en_attente, payee, livree
     # Ajoute d'une contrainte pour garantir que seules ces valeurs sont autorisées
     statut = CharField(
@@ -78,6 +119,12 @@ class Commande(BaseModel):
         constraints=[Check("statut IN ('en_attente', 'payee', 'livree')")]
     )
 
+    # Date de création (UTC) — filtre de l'export /orders/export
+    created_at = DateTimeField(default=maintenant_utc, index=True)
+
+    # Date de dernière modification (UTC) — change avec le statut, sert à l'ETag
+    updated_at = DateTimeField(default=maintenant_utc)
+
 
 # ---------------------- Table CommandeLivre ---------------------- #
 class CommandeLivre(BaseModel):
@@ -98,3 +145,61 @@ class CommandeLivre(BaseModel):
 
     # Quantité commandée pour ce livre
     quantite = IntegerField(constraints=[Check('quantite > 0')])
+
+    # Titre et prix copiés au moment de la commande : l'historique ne bouge
+    # plus quand le catalogue change, et la lecture se passe de jointure.
+    titre               = CharField(null=True)
+    prix_unitaire_cents = IntegerField(null=True, constraints=[Check('prix_unitaire_cents >= 0')])
+
+    class Meta:
+        # Index composite : lignes d'une commande (GET /orders/<id>) et
+        # recherche "ce livre est-il dans cette commande ?"
+        indexes = (
+            (('commande', 'livre'), False),
+        )
+
+
+# ---------------------- Table VersionCatalogue ---------------------- #
+class VersionCatalogue(BaseModel):
+    # Une seule ligne (id = 1) : numéro incrémenté par trigger à chaque
+    # écriture sur livre. Sert à invalider les caches du catalogue (cache.py).
+    version = IntegerField(default=0)
+
+    class Meta:
+        table_name = 'catalogue_version'
+
+
+# ---------------------- Index secondaires ---------------------- #
+# Ces deux index ne s'expriment pas en tuple dans Meta.indexes (ordre DESC,
+# clause WHERE), on les déclare donc après coup avec add_index().
+
+# GET /orders?statut=... trie par id décroissant : (statut, id DESC) permet
+# de filtrer, trier et paginer par curseur directement dans l'index.
+Commande.add_index(Commande.index(
+    Commande.statut, Commande.id.desc(), name='commande_statut_id'))
+
+# Index partiel : seuls les livres disponibles y figurent (GET /books?disponible=true).
+# "= TRUE" plutôt que "= 1" : valide à la fois sous SQLite et PostgreSQL.
+Livre.add_index(Livre.index(
+    Livre.id, where=SQL('disponible = TRUE'), name='livre_disponibles'))
+
+
+# ---------------------- Index plein texte LivreRecherche ---------------------- #
+class LivreRecherche(FTS5Model):
+    # Table virtuelle FTS5 "à contenu externe" : elle n'indexe que les colonnes
+    # textuelles de livre, sans les dupliquer. rowid == livre.id.
+    # La synchronisation est faite par des triggers (voir search.py).
+    rowid = RowIDField()
+    titre = SearchField()
+    auteur = SearchField()
+    description = SearchField()
+
+    class Meta:
+        database = db
+        table_name = 'livre_fts'
+        options = {
+            'content': 'livre',
+            'content_rowid': 'id',
+            # remove_diacritics : "debutant" trouve "débutant"
+            'tokenize': 'unicode61 remove_diacritics 2',
+        }
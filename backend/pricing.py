@@ -0,0 +1,158 @@
+# pricing.py — Calcul des montants d'un panier : sous-total, remise, taxes, livraison.
+#
+# Les règles (taux de taxe par catégorie, paliers de livraison, promotions)
+# sont chargées une seule fois en mémoire, depuis le fichier JSON
+# PRICING_RULES_FILE ou, à défaut, depuis TAXE_TOTALE et LIVRAISON_CENTS.
+# Chaque jeu de règles porte une version, enregistrée avec la commande.
+#
+# Tout est en centimes entiers : les taux sont en millionièmes (14,975 % =
+# 149 750) et l'arrondi (au plus proche, demi vers le haut) se fait une fois
+# par catégorie de taxe, pas par ligne. Un panier est parcouru une seule fois,
+# sans accès à la BD : prix et catégories viennent des livres déjà chargés.
+#
+# Exemple de fichier de règles :
+#   {
+#     "version":    "2024-09",
+#     "taxes":      {"standard": 0.14975, "livre": 0.05},
+#     "livraison":  [{"a_partir_de_cents": 0,    "frais_cents": 500},
+#                    {"a_partir_de_cents": 7500, "frais_cents": 0}],
+#     "promotions": [{"nom": "Rentrée", "code": "RENTREE10", "pourcentage": 10, "minimum_cents": 3000}]
+#   }
+
+import hashlib
+import json
+import threading
+
+from .config import TAXE_TOTALE, LIVRAISON_CENTS, PRICING_RULES_FILE
+
+# Catégorie de taxe des livres qui n'en précisent pas (taux TAXE_TOTALE par défaut)
+CATEGORIE_DEFAUT = "standard"
+
+_MILLION = 1_000_000
+
+
+def _arrondi(numerateur: int, denominateur: int) -> int:
+    """Division entière arrondie au plus proche, demi vers le haut (valeurs >= 0)."""
+    return (2 * numerateur + denominateur) // (2 * denominateur)
+
+
+class ReglesTarifaires:
+    """Jeu de règles, identifié par sa version. Jamais modifié après chargement."""
+
+    def __init__(self, version: str, taxes: dict, livraison: list, promotions: list = ()):
+        if CATEGORIE_DEFAUT not in taxes:
+            raise ValueError(f"taux de taxe '{CATEGORIE_DEFAUT}' manquant")
+        if not livraison or min(seuil for seuil, _ in livraison) != 0:
+            raise ValueError("le premier palier de livraison doit commencer à 0")
+        for promo in promotions:
+            if not 0 <= promo["pourcentage"] <= 100:
+                raise ValueError(f"pourcentage invalide pour la promotion {promo['nom']!r}")
+
+        self.version    = version
+        self.taux       = {cat: round(t * _MILLION) for cat, t in taxes.items()}
+        self.paliers    = sorted(livraison)          # [(seuil_cents, frais_cents)]
+        self.promotions = list(promotions)
+
+    def frais_livraison(self, montant: int) -> int:
+        frais = 0
+        for seuil, f in self.paliers:
+            if montant < seuil:
+                break
+            frais = f
+        return frais
+
+    def promotion(self, sous_total: int, code: str | None):
+        """Meilleure promotion applicable : sans code, ou dont le code est fourni."""
+        code = (code or "").strip().upper() or None
+        meilleure = None
+        for promo in self.promotions:
+            if promo["code"] and promo["code"] != code:
+                continue
+            if sous_total < promo["minimum_cents"]:
+                continue
+            if meilleure is None or promo["pourcentage"] > meilleure["pourcentage"]:
+                meilleure = promo
+        return meilleure
+
+    def calculer(self, lignes, code_promo: str | None = None) -> dict:
+        """
+        Montants d'un panier. lignes : itérable de (prix_unitaire_cents,
+        quantite, categorie_taxe). La remise s'applique avant les taxes, et
+        les paliers de livraison portent sur le montant après remise.
+        """
+        sous_total    = 0
+        par_categorie = {}
+        for prix, quantite, categorie in lignes:
+            montant = prix * quantite
+            sous_total += montant
+            cat = categorie if categorie in self.taux else CATEGORIE_DEFAUT
+            par_categorie[cat] = par_categorie.get(cat, 0) + montant
+
+        promo       = self.promotion(sous_total, code_promo)
+        pourcentage = promo["pourcentage"] if promo else 0
+
+        remise = taxes = 0
+        for cat, base in par_categorie.items():
+            r       = _arrondi(base * pourcentage, 100)
+            remise += r
+            taxes  += _arrondi((base - r) * self.taux[cat], _MILLION)
+
+        net       = sous_total - remise
+        livraison = self.frais_livraison(net) if sous_total > 0 else 0
+        return {
+            "sous_total_cents": sous_total,
+            "remise_cents":     remise,
+            "taxes_cents":      taxes,
+            "livraison_cents":  livraison,
+            "total_cents":      net + taxes + livraison,
+            "promotion":        promo["nom"] if promo else None,
+            "version_tarifs":   self.version,
+        }
+
+
+def charger_regles(chemin: str = PRICING_RULES_FILE) -> ReglesTarifaires:
+    """Lit les règles depuis un fichier JSON, ou les construit depuis config.py."""
+    if not chemin:
+        return ReglesTarifaires("defaut", {CATEGORIE_DEFAUT: TAXE_TOTALE}, [(0, LIVRAISON_CENTS)])
+
+    with open(chemin, "rb") as f:
+        brut = f.read()
+    data = json.loads(brut)
+    try:
+        return ReglesTarifaires(
+            version   = str(data.get("version") or hashlib.sha1(brut).hexdigest()[:12]),
+            taxes     = {cat: float(t) for cat, t in data["taxes"].items()},
+            livraison = [(int(p["a_partir_de_cents"]), int(p["frais_cents"]))
+                         for p in data.get("livraison", [{"a_partir_de_cents": 0, "frais_cents": LIVRAISON_CENTS}])],
+            promotions = [{
+                "nom":           p["nom"],
+                "code":          (p.get("code") or "").strip().upper() or None,
+                "pourcentage":   int(p["pourcentage"]),
+                "minimum_cents": int(p.get("minimum_cents", 0)),
+            } for p in data.get("promotions", [])],
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"règles tarifaires invalides ({chemin}) : {e}") from e
+
+
+_regles = None
+_lock   = threading.Lock()
+
+
+def regles() -> ReglesTarifaires:
+    """Règles en vigueur, chargées au premier appel."""
+    global _regles
+    if _regles is None:
+        with _lock:
+            if _regles is None:
+                _regles = charger_regles()
+    return _regles
+
+
+def recharger(chemin: str | None = None) -> ReglesTarifaires:
+    """Charge une nouvelle version des règles ; les calculs en cours gardent l'ancienne."""
+    global _regles
+    nouvelles = charger_regles(PRICING_RULES_FILE if chemin is None else chemin)
+    with _lock:
+        _regles = nouvelles
+    return nouvelles
@@ -0,0 +1,45 @@
+# Script d'import en masse du catalogue depuis un fichier NDJSON ou CSV.
+# Les livres sont identifiés par leur ISBN : un ISBN existant est mis à jour.
+#
+#   python -m backend.scripts.import fournisseur.csv
+#   python -m backend.scripts.import flux.ndjson --batch 5000
+
+import argparse
+import time
+
+from backend.app import init_db
+from backend.bulk import lire_csv, lire_ndjson, importer
+from backend.cache import catalogue_cache
+from backend.config import IMPORT_BATCH_SIZE
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Import en masse du catalogue (NDJSON ou CSV).")
+    parser.add_argument("fichier")
+    parser.add_argument("--format", choices=["ndjson", "csv"],
+                        help="déduit de l'extension si absent")
+    parser.add_argument("--batch", type=int, default=IMPORT_BATCH_SIZE, help="taille des lots")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.fichier.lower().endswith(".csv") else "ndjson")
+
+    init_db()
+
+    debut = time.perf_counter()
+    with open(args.fichier, encoding="utf-8", newline="") as flux:
+        lecteur = lire_csv(flux) if fmt == "csv" else lire_ndjson(flux)
+        rapport = importer(lecteur, taille_lot=args.batch)
+    duree = time.perf_counter() - debut
+    catalogue_cache.invalider()
+
+    print(f"Import OK : {rapport['lignes']} lignes en {duree:.1f} s "
+          f"({rapport['crees']} créés, {rapport['mis_a_jour']} mis à jour, {rapport['erreurs']} erreurs)")
+    for e in rapport["details"][:20]:
+        print(f"  ligne {e['ligne']} : {e['erreur']}")
+    if rapport["erreurs"] > 20:
+        print(f"  ... et {rapport['erreurs'] - 20} autres erreurs")
+
+
+# En exécutant directement ce fichier -> on lance l'import.
+if __name__ == "__main__":
+    run()
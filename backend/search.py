@@ -0,0 +1,109 @@
+# search.py — Recherche plein texte dans le catalogue.
+#
+# Quand SQLite est compilé avec FTS5, la recherche de GET /books passe par
+# l'index livre_fts (classement bm25, préfixes, insensible aux accents) au
+# lieu d'un LIKE '%q%' qui parcourt toute la table livre.
+# Sans FTS5 (ou sous PostgreSQL), on retombe sur l'ancien filtre LIKE.
+
+import logging
+import re
+
+from .database import db, est_sqlite
+from .models import Livre, LivreRecherche
+
+logger = logging.getLogger("bookshop.search")
+
+# Poids bm25 des colonnes (titre, auteur, description) : le titre compte le plus.
+POIDS_BM25 = (10.0, 5.0, 1.0)
+
+# Triggers qui gardent livre_fts synchronisé avec livre, quelle que soit la
+# façon dont la table est modifiée (routes, insert_many, script de seed...).
+_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS livre_fts_ai AFTER INSERT ON livre BEGIN
+        INSERT INTO livre_fts(rowid, titre, auteur, description)
+        VALUES (new.id, new.titre, new.auteur, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS livre_fts_ad AFTER DELETE ON livre BEGIN
+        INSERT INTO livre_fts(livre_fts, rowid, titre, auteur, description)
+        VALUES ('delete', old.id, old.titre, old.auteur, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS livre_fts_au AFTER UPDATE OF titre, auteur, description ON livre BEGIN
+        INSERT INTO livre_fts(livre_fts, rowid, titre, auteur, description)
+        VALUES ('delete', old.id, old.titre, old.auteur, old.description);
+        INSERT INTO livre_fts(rowid, titre, auteur, description)
+        VALUES (new.id, new.titre, new.auteur, new.description);
+    END
+    """,
+]
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# None = pas encore vérifié dans ce processus
+_fts_actif = None
+
+
+def init_recherche():
+    """
+    Crée l'index FTS5 et ses triggers s'ils n'existent pas (appelé par init_db).
+    Si l'index vient d'être créé sur une base existante, il est reconstruit à
+    partir des livres déjà présents.
+    """
+    global _fts_actif
+
+    if not est_sqlite():
+        _fts_actif = False
+        return
+
+    if not LivreRecherche.fts5_installed():
+        logger.warning("FTS5 indisponible : la recherche utilisera LIKE.")
+        _fts_actif = False
+        return
+
+    if not LivreRecherche.table_exists():
+        LivreRecherche.create_table()
+        LivreRecherche.rebuild()
+        logger.info("Migration : index plein texte livre_fts créé.")
+
+    for sql in _TRIGGERS:
+        db.execute_sql(sql)
+
+    _fts_actif = True
+
+
+def fts_actif() -> bool:
+    global _fts_actif
+    if _fts_actif is None:
+        _fts_actif = (est_sqlite() and LivreRecherche.fts5_installed()
+                      and LivreRecherche.table_exists())
+    return _fts_actif
+
+
+def expression_fts(q: str) -> str:
+    """
+    Transforme la saisie de l'utilisateur en requête FTS5 sûre : chaque mot est
+    cité (pas d'opérateurs injectés) et suivi de * pour la recherche par préfixe.
+    Ex : 'pyth avan' -> '"pyth"* "avan"*' (tous les mots doivent correspondre).
+    """
+    return " ".join(f'"{mot}"*' for mot in _WORD_RE.findall(q))
+
+
+def recherche_fts(q: str) -> bool:
+    """Vrai si filtrer_livres(qs, q) passe par FTS5 (et trie donc par pertinence)."""
+    return bool(fts_actif() and expression_fts(q))
+
+
+def filtrer_livres(qs, q: str):
+    """Applique la recherche ?search= (titre, auteur ou description) à une requête sur Livre."""
+    if not recherche_fts(q):
+        # Mêmes colonnes que l'index FTS5 : le résultat ne dépend pas du moteur
+        return qs.where(Livre.titre.contains(q) | Livre.auteur.contains(q) | Livre.description.contains(q))
+
+    return (qs
+            .join(LivreRecherche, on=(LivreRecherche.rowid == Livre.id))
+            .where(LivreRecherche.match(expression_fts(q)))
+            .order_by(LivreRecherche.bm25(*POIDS_BM25)))
@@ -0,0 +1,118 @@
+# serializers.py — Encodage JSON des réponses.
+#
+# Deux optimisations pour les routes de liste :
+#   - FournisseurJSON remplace le fournisseur JSON de Flask : orjson s'il est
+#     installé (encodage en C, directement en bytes), sinon le module json de
+#     la bibliothèque standard, comme avant. Le résultat est le même (clés
+#     triées, dates au format HTTP) ; seul l'échappement diffère (orjson écrit
+#     l'UTF-8 tel quel au lieu de \u00e9).
+#   - compiler() fabrique, une fois pour toutes, une fonction qui transforme
+#     une ligne .tuples() de Peewee en dict : pas d'instance de modèle, et les
+#     lecteurs de colonnes (index, conversions) sont préparés d'avance.
+
+import dataclasses
+import decimal
+import operator
+import uuid
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # optionnel : pip install orjson
+    orjson = None
+
+
+def _defaut(o):
+    """Types que ni json ni orjson ne savent encoder seuls (mêmes règles que Flask)."""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FournisseurJSON(DefaultJSONProvider):
+    """Fournisseur JSON de l'app (app.json) : orjson si disponible, sinon stdlib."""
+
+    def _options(self, indent: bool = False) -> int:
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, indent: bool = False) -> bytes:
+        """Encode obj en JSON (bytes UTF-8), sans passer par str."""
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=_defaut, option=self._options(indent))
+            except orjson.JSONEncodeError:
+                pass  # ex. entier de plus de 64 bits : le module json sait faire
+        return super().dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs or orjson is None:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs or orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Comme jsonify() : le corps est encodé directement en bytes."""
+        obj    = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
+
+
+class Conversion:
+    """Dans un gabarit : colonne index passée à fonction (ex. bool pour un booléen SQLite)."""
+
+    def __init__(self, fonction, index: int):
+        self.fonction = fonction
+        self.index    = index
+
+
+def _lecteur(valeur):
+    """Fonction ligne -> valeur pour une Conversion ou un gabarit imbriqué."""
+    if isinstance(valeur, dict):
+        return compiler(valeur)
+    fonction, index = valeur.fonction, valeur.index
+    return lambda r: fonction(r[index])
+
+
+def compiler(gabarit: dict):
+    """
+    Compile un gabarit en fonction ligne -> dict. Le gabarit associe chaque
+    clé du dict produit à l'index d'une colonne de la ligne, à une Conversion,
+    ou à un gabarit imbriqué. Ex. :
+        compiler({"id": 0, "client": {"nom": 1}, "actif": Conversion(bool, 2)})
+    produit une fonction r -> {"id": r[0], "client": {"nom": r[1]}, "actif": bool(r[2])}.
+    Les colonnes simples sont lues d'un seul appel à itemgetter puis zippées
+    avec leurs clés ; seules les conversions et les gabarits imbriqués coûtent
+    un appel par clé.
+    """
+    simples = [(cle, v) for cle, v in gabarit.items() if not isinstance(v, (dict, Conversion))]
+    autres  = tuple((cle, _lecteur(v)) for cle, v in gabarit.items() if isinstance(v, (dict, Conversion)))
+    cles    = tuple(cle for cle, _ in simples)
+    # itemgetter à un seul index renvoie la valeur, pas un 1-uplet
+    lire    = operator.itemgetter(*(index for _, index in simples)) if len(simples) > 1 else \
+              (lambda r, i=simples[0][1]: (r[i],)) if simples else (lambda r: ())
+
+    def vers_dict(r):
+        d = dict(zip(cles, lire(r)))
+        for cle, fonction in autres:
+            d[cle] = fonction(r)
+        return d
+
+    return vers_dict
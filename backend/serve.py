@@ -0,0 +1,78 @@
+# serve.py — Lancement en production : gunicorn, workers pré-forkés.
+#
+#   python -m backend.serve
+#
+# Le master fait une seule fois ce que chaque worker n'a pas à refaire :
+# vérification du schéma et migrations (init_db, dont la reconstruction de
+# l'index FTS), chargement des règles tarifaires et des fichiers du frontend
+# (compressés d'avance), puis préchauffage du cache du catalogue. Il ferme
+# ensuite ses connexions : une connexion SQLite ne doit jamais traverser un
+# fork. Les workers (WEB_WORKERS processus de WEB_THREADS threads, keep-alive
+# de WEB_KEEPALIVE secondes) héritent du cache chaud et ouvrent leurs propres
+# connexions à la première requête.
+#
+# Nécessite gunicorn (Linux/macOS). Les métriques (/metrics) et le cache sont
+# propres à chaque worker ; la version du catalogue en BD garde les caches
+# cohérents entre eux.
+
+import sys
+
+from .app import app, init_db, prechauffer_cache, ressources, logger
+from .config import WEB_BIND, WEB_WORKERS, WEB_THREADS, WEB_KEEPALIVE
+from .database import db
+from . import database, logs, metrics, pricing
+
+
+def preparer():
+    """Master, avant le fork : schéma, migrations, règles, frontend, cache chaud, connexions fermées."""
+    init_db()
+    pricing.regles()
+    ressources.charger(precalculer=True)
+    prechauffer_cache()
+    metrics.metriques.reinitialiser()
+    db.close()
+    if hasattr(db, "close_all"):   # pool : ferme aussi les connexions inactives
+        db.close_all()
+
+
+def apres_fork(server, worker):
+    """Hook gunicorn post_fork : état propre au worker (BD, thread de logs)."""
+    database.apres_fork(db)
+    logs.apres_fork()
+
+
+def options() -> dict:
+    """Configuration gunicorn, tirée de config.py."""
+    return {
+        "bind":         WEB_BIND,
+        "workers":      WEB_WORKERS,
+        "worker_class": "gthread",
+        "threads":      WEB_THREADS,
+        "keepalive":    WEB_KEEPALIVE,
+        "preload_app":  True,   # l'app (et son cache) est chargée une fois, dans le master
+        "post_fork":    apres_fork,
+        "accesslog":    None,   # l'app journalise déjà ses requêtes utiles
+    }
+
+
+def main():
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("gunicorn est requis : pip install gunicorn")
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for cle, valeur in options().items():
+                self.cfg.set(cle, valeur)
+
+        def load(self):
+            return app
+
+    preparer()
+    logger.info("Démarrage de %d workers x %d threads sur %s", WEB_WORKERS, WEB_THREADS, WEB_BIND)
+    Application().run()
+
+
+if __name__ == "__main__":
+    main()
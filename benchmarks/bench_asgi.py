@@ -0,0 +1,179 @@
+# bench_asgi.py — Débit à connexions simultanées : serveur WSGI actuel vs ASGI.
+#
+# Les deux modes servent la même base (générée une fois) depuis un
+# sous-processus, en production (pool SQLite actif) :
+#   - wsgi : serveur threadé de Werkzeug, comme app.run() (un thread par
+#     connexion ; Werkzeug ferme la connexion après chaque réponse) ;
+#   - asgi : uvicorn + backend.asgi (boucle asyncio, ASGI_THREADS threads pour les vues).
+# Le client simule N utilisateurs simultanés (asyncio) qui enchaînent des
+# lectures GET /books, /books/<id> et /orders/<id> pendant une durée fixe, en
+# gardant leur connexion ouverte tant que le serveur le permet.
+#
+#   python -m benchmarks.bench_asgi [--connexions 10,100,500] [--duree 5]
+#
+# Nécessite uvicorn (pip install uvicorn).
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.run import percentile
+
+NB_LIVRES    = 2_000
+NB_COMMANDES = 2_000
+
+
+def _port_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _servir(mode: str, port: int):
+    """Exécuté dans le sous-processus : lance le serveur jusqu'à ce qu'on le tue."""
+    if mode == "wsgi":
+        from werkzeug.serving import make_server
+        from backend.app import app
+        make_server("127.0.0.1", port, app, threaded=True).serve_forever()
+    else:
+        import uvicorn
+        uvicorn.run("backend.asgi:app", host="127.0.0.1", port=port,
+                    log_level="warning", access_log=False)
+
+
+def _preparer():
+    """Sous-processus : crée et remplit la base partagée par les deux modes."""
+    from backend.app import init_db
+    from benchmarks.dataset import generer
+    init_db()
+    generer(NB_LIVRES, NB_COMMANDES)
+
+
+def _chemins(rng: random.Random):
+    while True:
+        tirage = rng.random()
+        if tirage < 0.1:
+            yield "/books?disponible=true"
+        elif tirage < 0.6:
+            yield f"/books/{rng.randint(1, NB_LIVRES)}"
+        else:
+            yield f"/orders/{rng.randint(1, NB_COMMANDES)}"
+
+
+async def _connexion(port: int, fin: float, graine: int, latences: list, erreurs: list):
+    """Un utilisateur qui enchaîne les requêtes jusqu'à l'échéance."""
+    chemins  = _chemins(random.Random(graine))
+    ecrivain = None
+    try:
+        while time.perf_counter() < fin:
+            debut = time.perf_counter()
+            if ecrivain is None:
+                lecteur, ecrivain = await asyncio.open_connection("127.0.0.1", port)
+            ecrivain.write(f"GET {next(chemins)} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+            entetes = (await lecteur.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+            taille, fermer = 0, False
+            for ligne in entetes[1:]:
+                nom, _, valeur = ligne.partition(":")
+                if nom.lower() == "content-length":
+                    taille = int(valeur)
+                elif nom.lower() == "connection":
+                    fermer = valeur.strip().lower() == "close"
+            await lecteur.readexactly(taille)
+            latences.append(time.perf_counter() - debut)
+            if entetes[0].split(" ")[1] != "200":
+                erreurs.append(entetes[0])
+            if fermer:
+                ecrivain.close()
+                ecrivain = None
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        erreurs.append("connexion interrompue")
+    finally:
+        if ecrivain is not None:
+            ecrivain.close()
+
+
+async def _charge(port: int, connexions: int, duree: float) -> dict:
+    latences, erreurs = [], []
+    fin   = time.perf_counter() + duree
+    debut = time.perf_counter()
+    await asyncio.gather(*(_connexion(port, fin, i, latences, erreurs) for i in range(connexions)))
+    ecoule = time.perf_counter() - debut
+    latences.sort()
+    return {
+        "req_par_s": round(len(latences) / ecoule, 1),
+        "p50_ms":    round(percentile(latences, 50) * 1000, 1) if latences else None,
+        "p99_ms":    round(percentile(latences, 99) * 1000, 1) if latences else None,
+        "erreurs":   len(erreurs),
+    }
+
+
+def _attendre(port: int, delai: float = 30):
+    limite = time.monotonic() + delai
+    while time.monotonic() < limite:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"le serveur n'écoute pas sur le port {port}")
+
+
+def _mesurer(mode: str, env: dict, connexions: int, duree: float) -> dict:
+    port = _port_libre()
+    if mode == "wsgi":
+        # Un thread (donc une connexion au pool) par connexion HTTP
+        env = {**env, "DB_MAX_CONNECTIONS": str(connexions + 8)}
+    serveur = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_asgi", "--serveur", mode, "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _attendre(port)
+        asyncio.run(_charge(port, min(connexions, 4), 0.5))  # échauffement
+        return asyncio.run(_charge(port, connexions, duree))
+    finally:
+        serveur.terminate()
+        serveur.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connexions", default="10,100,500")
+    parser.add_argument("--duree",      type=float, default=5)
+    parser.add_argument("--modes",      default="wsgi,asgi")
+    parser.add_argument("--serveur",    choices=["wsgi", "asgi"], help=argparse.SUPPRESS)
+    parser.add_argument("--port",       type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--preparer",   action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serveur:
+        _servir(args.serveur, args.port)
+        return
+    if args.preparer:
+        _preparer()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ,
+               "DATABASE_URL": "sqlite:///" + os.path.join(tmp, "bench.db"),
+               "FLASK_ENV":    "production"}
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_asgi", "--preparer"],
+                       env=env, check=True, stderr=subprocess.DEVNULL)
+
+        print(f"{NB_LIVRES} livres, {NB_COMMANDES} commandes, {args.duree:g} s par mesure")
+        print(f"{'mode':<6} {'connexions':>10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'erreurs':>8}")
+        for connexions in (int(n) for n in args.connexions.split(",")):
+            for mode in args.modes.split(","):
+                r = _mesurer(mode, env, connexions, args.duree)
+                print(f"{mode:<6} {connexions:>10} {r['req_par_s']:>9} {r['p50_ms']:>8} "
+                      f"{r['p99_ms']:>8} {r['erreurs']:>8}")
+
+
+if __name__ == "__main__":
+    main()
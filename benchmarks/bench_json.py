@@ -0,0 +1,97 @@
+# bench_json.py — Coût de la sérialisation des listes /books et /orders.
+#
+# Pour 1k et 10k lignes, on mesure lecture + encodage JSON de trois façons :
+#   - instances : instances de modèle, livre_to_dict / commande_to_dict, module json
+#     (la méthode d'avant serializers.py) ;
+#   - tuples    : lignes .tuples() et sérialiseurs compilés, module json ;
+#   - orjson    : lignes .tuples() et sérialiseurs compilés, orjson (app.json).
+#
+#   python -m benchmarks.bench_json [--lignes 1000,10000] [--repetitions 5]
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def _meilleur(fonction, repetitions: int) -> float:
+    """Meilleur temps (ms) sur plusieurs exécutions."""
+    temps = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        temps.append(time.perf_counter() - debut)
+    return min(temps) * 1000
+
+
+def _mesurer(nb: int, repetitions: int) -> list:
+    from flask.json.provider import DefaultJSONProvider
+
+    from backend import serializers
+    from backend.app import (app, livre_to_dict, commande_to_dict, commandes_avec_client,
+                             serialiseur_livre, commande_depuis_ligne, COLONNES_COMMANDE,
+                             CHAMPS_LISTE_DEFAUT)
+    from backend.models import Livre, Client, Commande
+
+    stdlib = DefaultJSONProvider(app)
+    champs = [getattr(Livre, c) for c in CHAMPS_LISTE_DEFAUT]
+
+    def livres_instances():
+        return stdlib.dumps([livre_to_dict(l) for l in Livre.select(*champs).limit(nb)])
+
+    def livres_tuples(dumps):
+        vers_dict = serialiseur_livre(CHAMPS_LISTE_DEFAUT)
+        return dumps([vers_dict(l) for l in Livre.select(*champs).limit(nb).tuples()])
+
+    def commandes_instances():
+        return stdlib.dumps([commande_to_dict(c) for c in commandes_avec_client().limit(nb)])
+
+    def commandes_tuples(dumps):
+        qs = Commande.select(*COLONNES_COMMANDE).join(Client).limit(nb).tuples()
+        return dumps([commande_depuis_ligne(c) for c in qs])
+
+    orjson = app.json.dumps_bytes if serializers.orjson is not None else None
+    resultats = []
+    for route, instances, tuples in (("/books", livres_instances, livres_tuples),
+                                     ("/orders", commandes_instances, commandes_tuples)):
+        resultats.append({
+            "route":     route,
+            "lignes":    nb,
+            "instances": _meilleur(instances, repetitions),
+            "tuples":    _meilleur(lambda: tuples(stdlib.dumps), repetitions),
+            "orjson":    _meilleur(lambda: tuples(orjson), repetitions) if orjson else None,
+        })
+    return resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lignes",      default="1000,10000")
+    parser.add_argument("--repetitions", type=int, default=5)
+    args  = parser.parse_args()
+    tailles = [int(n) for n in args.lignes.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # La base est choisie à l'import de backend.database
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmp, "bench.db")
+        os.environ["FLASK_ENV"]    = "production"
+
+        from backend.app import init_db
+        from backend.database import db
+        from benchmarks.dataset import generer
+
+        init_db()
+        generer(max(tailles), max(tailles))
+
+        print(f"{'route':<8} {'lignes':>7} {'instances':>10} {'tuples':>8} {'orjson':>8} {'gain':>6}   (ms)")
+        with db:
+            for nb in tailles:
+                for r in _mesurer(nb, args.repetitions):
+                    meilleur = r["orjson"] or r["tuples"]
+                    orjson   = f"{r['orjson']:>8.1f}" if r["orjson"] else f"{'-':>8}"
+                    print(f"{r['route']:<8} {r['lignes']:>7} {r['instances']:>10.1f} {r['tuples']:>8.1f} "
+                          f"{orjson} {r['instances'] / meilleur:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
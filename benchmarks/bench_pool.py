@@ -0,0 +1,83 @@
+# bench_pool.py — Requêtes/s sur GET /books/<id>, avec et sans pool de connexions.
+#
+# Chaque mode tourne dans un sous-processus (la config est lue à l'import de
+# backend.database) sur sa propre base SQLite temporaire.
+#
+#   python -m benchmarks.bench_pool [--requests 5000] [--books 1000]
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _mesurer(nb_requetes: int, nb_livres: int) -> dict:
+    """Exécuté dans le sous-processus : seed + boucle de requêtes."""
+    from backend.app import app, init_db
+    from backend.database import db
+    from backend.models import Livre
+
+    init_db()
+    with db.atomic():
+        Livre.insert_many([
+            {"titre": f"Livre {i}", "auteur": f"Auteur {i % 50}", "prix_cents": 1000 + i}
+            for i in range(nb_livres)
+        ]).execute()
+    db.close()
+
+    rng = random.Random(42)
+    ids = [rng.randint(1, nb_livres) for _ in range(nb_requetes)]
+
+    with app.test_client() as client:
+        for book_id in ids[:200]:  # échauffement
+            client.get(f"/books/{book_id}")
+
+        debut = time.perf_counter()
+        for book_id in ids:
+            assert client.get(f"/books/{book_id}").status_code == 200
+        duree = time.perf_counter() - debut
+
+    return {"requetes": nb_requetes, "secondes": round(duree, 3),
+            "req_par_s": round(nb_requetes / duree, 1)}
+
+
+def _lancer(pool: bool, nb_requetes: int, nb_livres: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ,
+               "DATABASE_URL": "sqlite:///" + os.path.join(tmp, "bench.db"),
+               "DB_POOL":      "true" if pool else "false",
+               "FLASK_ENV":    "production"}
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_pool", "--worker",
+             "--requests", str(nb_requetes), "--books", str(nb_livres)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--books",    type=int, default=1000)
+    parser.add_argument("--worker",   action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_mesurer(args.requests, args.books)))
+        return
+
+    sans = _lancer(False, args.requests, args.books)
+    avec = _lancer(True,  args.requests, args.books)
+
+    print(f"GET /books/<id> — {args.requests} requêtes, {args.books} livres")
+    print(f"  connexion par requête : {sans['req_par_s']:>8} req/s")
+    print(f"  pool de connexions    : {avec['req_par_s']:>8} req/s")
+    print(f"  gain                  : x{avec['req_par_s'] / sans['req_par_s']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
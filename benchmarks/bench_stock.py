@@ -0,0 +1,108 @@
+# bench_stock.py — Commandes simultanées sur un seul titre (réservation du stock).
+#
+# Pour chaque nombre de threads, un best-seller est créé avec --stock
+# exemplaires, puis les threads passent --commandes commandes d'un exemplaire
+# (POST /orders) aussi vite que possible. À la fin on vérifie qu'aucun
+# exemplaire n'a été survendu : commandes acceptées == exemplaires vendus ==
+# stock initial - stock final, et le stock n'est jamais négatif.
+#
+#   python -m benchmarks.bench_stock [--threads 1,8,32] [--stock 500] [--commandes 2000]
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+
+def _mesurer(nb_threads: int, stock: int, nb_commandes: int) -> dict:
+    from backend.app import app
+    from backend.database import db
+    from backend.models import Livre, CommandeLivre
+
+    with db:
+        livre = Livre.create(titre="Best-seller", auteur="Auteur", prix_cents=2000, stock=stock)
+
+    restantes = iter(range(nb_commandes))
+    verrou    = threading.Lock()
+    statuts   = {}
+    latences  = []
+
+    def acheteur(num: int):
+        payload = {
+            "client": {"nom": f"Client {num}", "email": f"client{num}@exemple.com", "adresse": "1 rue X"},
+            "items":  [{"book_id": livre.id, "quantite": 1}],
+        }
+        with app.test_client() as client:
+            while True:
+                with verrou:
+                    if next(restantes, None) is None:
+                        return
+                debut  = time.perf_counter()
+                statut = client.post("/orders", json=payload).status_code
+                duree  = time.perf_counter() - debut
+                with verrou:
+                    statuts[statut] = statuts.get(statut, 0) + 1
+                    latences.append(duree)
+
+    threads = [threading.Thread(target=acheteur, args=(i,)) for i in range(nb_threads)]
+    debut = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duree = time.perf_counter() - debut
+
+    with db:
+        final  = Livre.get_by_id(livre.id)
+        vendus = CommandeLivre.select().where(CommandeLivre.livre == livre.id).count()
+
+    acceptees = statuts.get(201, 0)
+    assert final.stock >= 0, f"stock négatif : {final.stock}"
+    assert acceptees == vendus == stock - final.stock, \
+        f"survente : {acceptees} commandes acceptées, {vendus} lignes, stock {stock} -> {final.stock}"
+
+    latences.sort()
+    return {
+        "threads":    nb_threads,
+        "acceptees":  acceptees,
+        "refusees":   statuts.get(400, 0) + statuts.get(409, 0),
+        "erreurs":    sum(n for s, n in statuts.items() if s >= 500),
+        "stock":      final.stock,
+        "req_par_s":  nb_commandes / duree,
+        "p50_ms":     statistics.median(latences) * 1000,
+        "p99_ms":     latences[int(len(latences) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads",   default="1,8,32")
+    parser.add_argument("--stock",     type=int, default=500)
+    parser.add_argument("--commandes", type=int, default=2000)
+    args    = parser.parse_args()
+    threads = [int(n) for n in args.threads.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # La base est choisie à l'import de backend.database ; une connexion
+        # du pool par thread, comme un worker à max(threads) threads
+        os.environ["DATABASE_URL"]       = "sqlite:///" + os.path.join(tmp, "bench.db")
+        os.environ["FLASK_ENV"]          = "production"
+        os.environ["DB_MAX_CONNECTIONS"] = str(max(threads))
+
+        from backend.app import init_db
+        init_db()
+
+        print(f"POST /orders sur un seul titre — {args.commandes} commandes, stock initial {args.stock}")
+        print(f"{'threads':>7} {'acceptées':>9} {'refusées':>8} {'erreurs':>7} {'stock':>5} "
+              f"{'req/s':>8} {'p50 ms':>7} {'p99 ms':>7}")
+        for nb in threads:
+            r = _mesurer(nb, args.stock, args.commandes)
+            print(f"{r['threads']:>7} {r['acceptees']:>9} {r['refusees']:>8} {r['erreurs']:>7} {r['stock']:>5} "
+                  f"{r['req_par_s']:>8.1f} {r['p50_ms']:>7.1f} {r['p99_ms']:>7.1f}")
+        print("Aucune survente.")
+
+
+if __name__ == "__main__":
+    main()
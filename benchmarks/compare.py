@@ -0,0 +1,81 @@
+# compare.py — Compare deux rapports JSON de benchmarks/run.py.
+#
+# Affiche, par mode / mélange / endpoint, l'évolution du p95 et du débit, et
+# retourne un code de sortie 1 si une régression dépasse le seuil (CI).
+#
+#   python -m benchmarks.compare avant.json apres.json [--seuil 10]
+
+import argparse
+import json
+import sys
+
+
+def _variation(avant, apres):
+    """Variation en %, ou None si la référence est nulle ou absente."""
+    if not avant or apres is None:
+        return None
+    return (apres - avant) / avant * 100
+
+
+def _texte(valeur, format_: str, unite: str = "") -> str:
+    """valeur formatée, ou n/a (valeur absente ou variation impossible)."""
+    return "n/a" if valeur is None else format(valeur, format_) + unite
+
+
+def comparer(avant: dict, apres: dict, seuil: float) -> list:
+    """Retourne la liste des régressions (messages) au-delà du seuil, en %."""
+    regressions = []
+
+    for mode, melanges in apres["resultats"].items():
+        for nom, res in melanges.items():
+            ref = avant["resultats"].get(mode, {}).get(nom)
+            if ref is None:
+                continue
+
+            debit = _variation(ref.get("debit_req_s"), res.get("debit_req_s"))
+            print(f"[{mode}] {nom}: {ref.get('debit_req_s')} -> {res.get('debit_req_s')} req/s "
+                  f"({_texte(debit, '+.1f', ' %')})")
+            if debit is not None and debit < -seuil:
+                regressions.append(f"{mode}/{nom} : débit {debit:+.1f} %")
+
+            for label, e in res["endpoints"].items():
+                r = ref["endpoints"].get(label)
+                if r is None:
+                    continue
+                p95 = _variation(r.get("p95_ms"), e.get("p95_ms"))
+                sql = ""
+                if r.get("sql_moyen") is not None and e.get("sql_moyen") is not None:
+                    sql = f"  SQL {r['sql_moyen']} -> {e['sql_moyen']}"
+                    if e["sql_moyen"] > r["sql_moyen"]:
+                        regressions.append(f"{mode}/{nom} {label} : SQL {r['sql_moyen']} -> {e['sql_moyen']}")
+                print(f"    {label:28} p95 {_texte(r.get('p95_ms'), '>8.2f')} -> "
+                      f"{_texte(e.get('p95_ms'), '>8.2f')} ms ({_texte(p95, '+6.1f', ' %')}){sql}")
+                if p95 is not None and p95 > seuil:
+                    regressions.append(f"{mode}/{nom} {label} : p95 {p95:+.1f} %")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare deux rapports de benchmark.")
+    parser.add_argument("avant")
+    parser.add_argument("apres")
+    parser.add_argument("--seuil", type=float, default=10.0, help="régression tolérée, en %%")
+    args = parser.parse_args()
+
+    with open(args.avant) as f:
+        avant = json.load(f)
+    with open(args.apres) as f:
+        apres = json.load(f)
+
+    regressions = comparer(avant, apres, args.seuil)
+    if regressions:
+        print("\nRégressions :")
+        for r in regressions:
+            print("  -", r)
+        sys.exit(1)
+    print("\nAucune régression au-delà de", args.seuil, "%")
+
+
+if __name__ == "__main__":
+    main()
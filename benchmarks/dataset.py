@@ -0,0 +1,95 @@
+# dataset.py — Génération d'un jeu de données synthétique pour les benchmarks.
+#
+# On part des 30 livres de backend/scripts/seed.py et on les décline jusqu'à
+# la taille voulue (10k, 100k, 1M livres), puis on génère des clients, des
+# commandes et leurs lignes. Tout est inséré par lots avec insert_many().
+
+import random
+
+from backend.database import db
+from backend.models import Livre, Client, Commande, CommandeLivre
+from backend.scripts.seed import ROWS
+
+# Tailles prédéfinies : (nb_livres, nb_commandes)
+ECHELLES = {
+    "10k":  (10_000,    10_000),
+    "100k": (100_000,   100_000),
+    "1m":   (1_000_000, 1_000_000),
+}
+
+STATUTS = ["en_attente", "payee", "livree"]
+
+
+def _par_lots(lignes, taille):
+    lot = []
+    for ligne in lignes:
+        lot.append(ligne)
+        if len(lot) >= taille:
+            yield lot
+            lot = []
+    if lot:
+        yield lot
+
+
+def _livres(nb_livres: int, rng: random.Random):
+    for i in range(nb_livres):
+        modele = ROWS[i % len(ROWS)]
+        yield {
+            "titre":       f"{modele['titre']} — tome {i // len(ROWS) + 1}",
+            "auteur":      modele["auteur"],
+            "description": modele["description"],
+            "prix_cents":  modele["prix_cents"] + rng.randint(-500, 500),
+            "disponible":  rng.random() > 0.05,
+            "image_url":   modele["image_url"],
+        }
+
+
+def generer(nb_livres: int, nb_commandes: int, taille_lot: int = 5_000, graine: int = 42) -> dict:
+    """
+    Remplit la base (déjà initialisée par init_db) et retourne un résumé.
+    Environ 3 commandes par client et 1 à 5 lignes par commande.
+    """
+    rng = random.Random(graine)
+
+    with db.atomic():
+        for lot in _par_lots(_livres(nb_livres, rng), taille_lot):
+            Livre.insert_many(lot).execute()
+
+    nb_clients = max(1, nb_commandes // 3)
+    with db.atomic():
+        clients = ({"nom": f"Client {i}", "email": f"client{i}@exemple.com",
+                    "adresse": f"{i} rue Racine, Chicoutimi"} for i in range(nb_clients))
+        for lot in _par_lots(clients, taille_lot):
+            Client.insert_many(lot).execute()
+
+    nb_lignes = 0
+    with db.atomic():
+        for debut in range(0, nb_commandes, taille_lot):
+            fin       = min(nb_commandes, debut + taille_lot)
+            commandes = []
+            lignes    = []
+            for cmd_id in range(debut + 1, fin + 1):
+                sous_total = 0
+                for _ in range(rng.randint(1, 5)):
+                    livre_id = rng.randint(1, nb_livres)
+                    qty      = rng.randint(1, 3)
+                    lignes.append({"commande": cmd_id, "livre": livre_id, "quantite": qty,
+                                   "titre": f"Livre {livre_id}", "prix_unitaire_cents": 2500})
+                    sous_total += 2500 * qty
+                taxes = round(sous_total * 0.14975)
+                commandes.append({
+                    "id":               cmd_id,
+                    "client":           rng.randint(1, nb_clients),
+                    "sous_total_cents": sous_total,
+                    "taxes_cents":      taxes,
+                    "livraison_cents":  500,
+                    "total_cents":      sous_total + taxes + 500,
+                    "statut":           rng.choice(STATUTS),
+                })
+            Commande.insert_many(commandes).execute()
+            for lot in _par_lots(lignes, taille_lot):
+                CommandeLivre.insert_many(lot).execute()
+            nb_lignes += len(lignes)
+
+    return {"livres": nb_livres, "clients": nb_clients,
+            "commandes": nb_commandes, "lignes": nb_lignes}
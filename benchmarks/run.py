@@ -0,0 +1,263 @@
+# run.py — Benchmark de l'API HTTP du Bookshop.
+#
+# 1. crée une base SQLite synthétique (dataset.py) à l'échelle demandée ;
+# 2. rejoue des mélanges de requêtes (scenarios.py) :
+#      - "inprocess" : via app.test_client(), sans réseau ;
+#      - "wsgi"      : via un vrai serveur WSGI (werkzeug) et http.client ;
+# 3. rapporte par endpoint les latences p50/p95/p99, le débit global et le
+#    nombre moyen de requêtes SQL (mode inprocess seulement : le compteur est
+#    par thread et les requêtes WSGI sont servies par les threads du serveur) ;
+# 4. enregistre le tout en JSON dans benchmarks/results/ (voir compare.py).
+#
+#   python -m benchmarks.run --scale 10k --requests 2000
+#   python -m benchmarks.run --scale 100k --db /tmp/bench100k.db --modes wsgi --concurrency 8
+
+import argparse
+import datetime
+import json
+import os
+import pathlib
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+RESULTS_DIR = pathlib.Path(__file__).resolve().parent / "results"
+
+Reponse = namedtuple("Reponse", "status json headers")
+
+
+# --- Clients HTTP ---
+
+class ClientInProcess:
+    """Appelle l'application Flask directement (pas de réseau, pas de serveur)."""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def _appel(self, method, path, body=None, headers=None):
+        r = self._client.open(path, method=method, json=body, headers=headers or {})
+        return Reponse(r.status_code, r.get_json(silent=True), r.headers)
+
+    def get(self, path, headers=None):
+        return self._appel("GET", path, headers=headers)
+
+    def post(self, path, body):
+        return self._appel("POST", path, body)
+
+    def put(self, path, body):
+        return self._appel("PUT", path, body)
+
+
+class ClientHTTP:
+    """Client HTTP/1.1 keep-alive vers un serveur réel (une connexion par thread)."""
+
+    def __init__(self, host, port):
+        import http.client
+        self._conn = http.client.HTTPConnection(host, port, timeout=60)
+
+    def _appel(self, method, path, body=None, headers=None):
+        entetes = dict(headers or {})
+        data    = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            entetes["Content-Type"] = "application/json"
+        self._conn.request(method, path, body=data, headers=entetes)
+        r       = self._conn.getresponse()
+        contenu = r.read()
+        try:
+            parsed = json.loads(contenu) if contenu else None
+        except ValueError:
+            parsed = None
+        return Reponse(r.status, parsed, dict(r.getheaders()))
+
+    def get(self, path, headers=None):
+        return self._appel("GET", path, headers=headers)
+
+    def post(self, path, body):
+        return self._appel("POST", path, body)
+
+    def put(self, path, body):
+        return self._appel("PUT", path, body)
+
+
+# --- Comptage des requêtes SQL ---
+
+class CompteurSQL:
+    """Compte les appels à db.execute_sql, par thread."""
+
+    def __init__(self, database):
+        self._local    = threading.local()
+        self._original = database.execute_sql
+
+        def execute_sql(sql, params=None, *args, **kwargs):
+            self._local.n = getattr(self._local, "n", 0) + 1
+            return self._original(sql, params, *args, **kwargs)
+
+        database.execute_sql = execute_sql
+
+    def valeur(self) -> int:
+        return getattr(self._local, "n", 0)
+
+
+# --- Statistiques ---
+
+def percentile(valeurs, p):
+    """Percentile par rang le plus proche (valeurs déjà triées)."""
+    if not valeurs:
+        return None
+    rang = max(0, min(len(valeurs) - 1, round(p / 100 * len(valeurs) + 0.5) - 1))
+    return valeurs[rang]
+
+
+def resumer(mesures: dict, duree: float) -> dict:
+    endpoints = {}
+    total     = 0
+    for label, points in sorted(mesures.items()):
+        latences = sorted(ms for ms, _ in points)
+        sql      = [n for _, n in points if n is not None]
+        total   += len(points)
+        endpoints[label] = {
+            "requetes":  len(points),
+            "p50_ms":    round(percentile(latences, 50), 3),
+            "p95_ms":    round(percentile(latences, 95), 3),
+            "p99_ms":    round(percentile(latences, 99), 3),
+            "sql_moyen": round(sum(sql) / len(sql), 2) if sql else None,
+        }
+    return {"requetes": total, "secondes": round(duree, 3),
+            "debit_req_s": round(total / duree, 1) if duree else None,
+            "endpoints": endpoints}
+
+
+# --- Exécution ---
+
+def executer(fabrique_client, melange, nb_requetes, concurrence, etat_global, compteur=None, graine=1):
+    from .scenarios import tirer
+
+    mesures = defaultdict(list)
+    verrou  = threading.Lock()
+    par_thread = [nb_requetes // concurrence + (1 if i < nb_requetes % concurrence else 0)
+                  for i in range(concurrence)]
+
+    def utilisateur(index, n):
+        rng    = random.Random(graine * 1000 + index)
+        http   = fabrique_client()
+        etat   = {**etat_global, "mes_commandes": [], "etags": {}}
+        locales = defaultdict(list)
+        for _ in range(n):
+            operation = tirer(melange, rng)
+            avant_sql = compteur.valeur() if compteur else None
+            debut     = time.perf_counter()
+            label     = operation(http, rng, etat)
+            ms        = (time.perf_counter() - debut) * 1000
+            nb_sql    = compteur.valeur() - avant_sql if compteur else None
+            locales[label].append((ms, nb_sql))
+        with verrou:
+            for label, points in locales.items():
+                mesures[label].extend(points)
+
+    threads = [threading.Thread(target=utilisateur, args=(i, n)) for i, n in enumerate(par_thread)]
+    debut = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return resumer(mesures, time.perf_counter() - debut)
+
+
+def _commit_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'API HTTP du Bookshop.")
+    parser.add_argument("--scale", default="10k", help="10k, 100k ou 1m (livres et commandes)")
+    parser.add_argument("--db", help="fichier SQLite à (ré)utiliser ; généré s'il n'existe pas")
+    parser.add_argument("--mixes", default="navigation,pic_ventes,back_office,mixte")
+    parser.add_argument("--modes", default="inprocess,wsgi")
+    parser.add_argument("--requests", type=int, default=2000, help="requêtes par mélange et par mode")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--output", help="fichier JSON de sortie (défaut : benchmarks/results/<date>.json)")
+    args = parser.parse_args()
+
+    tmp     = tempfile.TemporaryDirectory()
+    db_path = args.db or os.path.join(tmp.name, f"bench_{args.scale}.db")
+    existe  = os.path.exists(db_path)
+
+    # La configuration est lue à l'import de backend : on la fixe avant.
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("FLASK_ENV", "production")
+    os.environ.setdefault("DB_POOL", "true")
+
+    import logging
+    logging.getLogger("bookshop").setLevel(logging.ERROR)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    from backend.app import app, init_db
+    from backend.database import db
+    from backend.models import Livre, Commande
+    from .dataset import ECHELLES, generer
+    from .scenarios import MELANGES
+
+    init_db()
+    if not existe:
+        nb_livres, nb_commandes = ECHELLES[args.scale]
+        debut = time.perf_counter()
+        print(f"Génération du jeu de données ({args.scale})...")
+        print("  ", generer(nb_livres, nb_commandes), f"en {time.perf_counter() - debut:.1f} s")
+    etat_global = {"nb_livres": Livre.select().count(), "nb_commandes": Commande.select().count()}
+    db.close()
+
+    compteur = CompteurSQL(db)
+    resultats = {}
+
+    for mode in args.modes.split(","):
+        serveur = None
+        if mode == "inprocess":
+            fabrique = lambda: ClientInProcess(app)
+        elif mode == "wsgi":
+            from werkzeug.serving import make_server
+            serveur = make_server("127.0.0.1", 0, app, threaded=True)
+            threading.Thread(target=serveur.serve_forever, daemon=True).start()
+            fabrique = lambda: ClientHTTP("127.0.0.1", serveur.server_port)
+        else:
+            parser.error(f"mode inconnu : {mode}")
+
+        resultats[mode] = {}
+        for nom in args.mixes.split(","):
+            res = executer(fabrique, MELANGES[nom], args.requests, args.concurrency, etat_global,
+                           compteur=compteur if mode == "inprocess" else None)
+            resultats[mode][nom] = res
+            print(f"[{mode:9}] {nom:12} {res['debit_req_s']:>8} req/s")
+            for label, e in res["endpoints"].items():
+                sql = f"{e['sql_moyen']:>5} SQL" if e["sql_moyen"] is not None else ""
+                print(f"    {label:28} n={e['requetes']:<6} p50={e['p50_ms']:>8.2f} ms "
+                      f"p95={e['p95_ms']:>8.2f} ms p99={e['p99_ms']:>8.2f} ms {sql}")
+
+        if serveur:
+            serveur.shutdown()
+
+    rapport = {
+        "date":       datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit":     _commit_git(),
+        "echelle":    {"nom": args.scale, **etat_global},
+        "parametres": {"requetes": args.requests, "concurrence": args.concurrency,
+                       "db_pool": os.environ["DB_POOL"]},
+        "resultats":  resultats,
+    }
+
+    sortie = pathlib.Path(args.output) if args.output else \
+        RESULTS_DIR / f"{datetime.datetime.now():%Y%m%d-%H%M%S}_{args.scale}.json"
+    sortie.parent.mkdir(parents=True, exist_ok=True)
+    sortie.write_text(json.dumps(rapport, indent=2, ensure_ascii=False))
+    print(f"Résultats enregistrés : {sortie}")
+
+
+if __name__ == "__main__":
+    main()
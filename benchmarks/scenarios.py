@@ -0,0 +1,93 @@
+# scenarios.py — Mélanges de requêtes réalistes pour les benchmarks.
+#
+# Chaque opération reçoit un client HTTP (in-process ou réseau, voir run.py),
+# un générateur aléatoire et l'état de l'utilisateur virtuel, et retourne le
+# libellé de la route appelée (pour agréger les statistiques par endpoint).
+# Les méthodes du client retournent une Reponse(status, json, headers).
+
+import random
+from urllib.parse import quote
+
+from backend.scripts.seed import ROWS
+
+# Mots de recherche tirés des titres et auteurs du seed, tronqués comme pendant
+# une saisie au clavier ("pyt", "pytho", "python").
+_MOTS = sorted({mot.lower() for r in ROWS for mot in (r["titre"] + " " + r["auteur"]).split() if len(mot) > 3})
+
+
+def recherche(http, rng: random.Random, etat: dict) -> str:
+    mot = rng.choice(_MOTS)
+    http.get("/books?search=" + quote(mot[:rng.randint(3, len(mot))]))
+    return "GET /books?search="
+
+
+def parcours(http, rng: random.Random, etat: dict) -> str:
+    http.get(f"/books/{rng.randint(1, etat['nb_livres'])}")
+    return "GET /books/<id>"
+
+
+def catalogue(http, rng: random.Random, etat: dict) -> str:
+    http.get("/books?disponible=true")
+    return "GET /books?disponible=true"
+
+
+def liste_commandes(http, rng: random.Random, etat: dict) -> str:
+    http.get(f"/orders?page={rng.randint(1, 20)}&limit=20")
+    return "GET /orders"
+
+
+def commande(http, rng: random.Random, etat: dict) -> str:
+    items = [{"book_id": rng.randint(1, etat["nb_livres"]), "quantite": rng.randint(1, 3)}
+             for _ in range(rng.randint(1, 5))]
+    r = http.post("/orders", {
+        "client": {"nom": "Bench", "email": "bench@exemple.com", "adresse": "1 rue Bench"},
+        "items":  items,
+    })
+    if r.status == 201:
+        etat["mes_commandes"].append(r.json["id"])
+    return "POST /orders"
+
+
+def suivi(http, rng: random.Random, etat: dict) -> str:
+    """Polling de l'écran de suivi : revalidation avec l'ETag reçu précédemment."""
+    if etat["mes_commandes"]:
+        order_id = rng.choice(etat["mes_commandes"])
+    else:
+        order_id = rng.randint(1, max(1, etat["nb_commandes"]))
+    etag = etat["etags"].get(order_id)
+    r = http.get(f"/orders/{order_id}", headers={"If-None-Match": etag} if etag else None)
+    if r.headers.get("ETag"):
+        etat["etags"][order_id] = r.headers["ETag"]
+    return "GET /orders/<id>"
+
+
+def changement_statut(http, rng: random.Random, etat: dict) -> str:
+    order_id = rng.randint(1, max(1, etat["nb_commandes"]))
+    http.put(f"/orders/{order_id}/status", {"statut": rng.choice(["payee", "livree"])})
+    return "PUT /orders/<id>/status"
+
+
+def statuts_en_masse(http, rng: random.Random, etat: dict) -> str:
+    """Passage en fin de journée : 500 commandes payées marquées livrées en un appel."""
+    ids = [rng.randint(1, max(1, etat["nb_commandes"])) for _ in range(500)]
+    http.put("/orders/status", {"statut": rng.choice(["payee", "livree"]), "ids": ids})
+    return "PUT /orders/status"
+
+
+# Poids relatifs des opérations dans chaque mélange
+MELANGES = {
+    # Vitrine : surtout de la navigation et de la recherche
+    "navigation": {recherche: 40, parcours: 45, catalogue: 5, suivi: 10},
+    # Pic de ventes : beaucoup de paniers validés et de suivi
+    "pic_ventes": {recherche: 20, parcours: 30, commande: 25, suivi: 25},
+    # Back-office : listes de commandes et changements de statut
+    "back_office": {liste_commandes: 50, suivi: 30, changement_statut: 19, statuts_en_masse: 1},
+    # Mélange global, proche du trafic observé
+    "mixte": {recherche: 25, parcours: 30, catalogue: 2, liste_commandes: 8,
+              commande: 10, suivi: 20, changement_statut: 5},
+}
+
+
+def tirer(melange: dict, rng: random.Random):
+    operations = list(melange)
+    return rng.choices(operations, weights=[melange[o] for o in operations])[0]
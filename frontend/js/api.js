@@ -2,15 +2,26 @@
 const API_BASE = 'http://127.0.0.1:5000';
 
 /*
-  Récupère la liste des livres.
-  Si un terme de recherche est fourni, on l'ajoute dans l'URL.
+  Récupère une page de livres.
+  Options : disponible (true = livres en stock seulement) et after (curseur
+  de la page précédente). Retourne { books, nextCursor } ; nextCursor vaut
+  null sur la dernière page.
+  Pas de ?fields= : les colonnes par défaut (sans la description) suffisent à
+  la grille, et la première page vient alors du cache du serveur, déjà
+  sérialisée et compressée.
 */
-async function getBooks(search = '') {
+async function getBooks(search = '', { disponible = false, after = null } = {}) {
   const u = new URL(API_BASE + '/books');
 
   if (search.trim()) {
     u.searchParams.set('search', search.trim());
   }
+  if (disponible) {
+    u.searchParams.set('disponible', 'true');
+  }
+  if (after) {
+    u.searchParams.set('after', after);
+  }
 
   const r = await fetch(u);
 
@@ -25,7 +36,7 @@ async function getBooks(search = '') {
     throw new Error(d?.message || 'Erreur lors du chargement des livres');
   }
 
-  return d;
+  return { books: d, nextCursor: r.headers.get('X-Next-Cursor') };
 }
 
 /*
@@ -53,6 +64,31 @@ async function createOrder(payload) {
   return d;
 }
 
+/*
+  Calcule les montants d'un panier (sous-total, remise, taxes, livraison, total)
+  sans créer de commande. Mêmes règles que la création de commande.
+*/
+async function quoteOrder(items, codePromo = '') {
+  const r = await fetch(API_BASE + '/orders/quote', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ items, code_promo: codePromo || null })
+  });
+
+  let d = null;
+  try {
+    d = await r.json();
+  } catch {
+    d = null;
+  }
+
+  if (!r.ok) {
+    throw new Error(d?.message || 'Erreur lors du calcul du panier');
+  }
+
+  return d;
+}
+
 /*
   Récupère une commande complète selon son ID.
 */
@@ -99,4 +135,4 @@ async function updateOrderStatus(id, statut) {
 }
 
 // On exporte nos fonctions pour pouvoir les importer dans app.html
-export { getBooks, createOrder, getOrderById, updateOrderStatus };
\ No newline at end of file
+export { getBooks, createOrder, quoteOrder, getOrderById, updateOrderStatus };
\ No newline at end of file
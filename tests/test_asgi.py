@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.app import app as flask_app
+from backend.asgi import AsgiWsgi
+
+
+def _scope(method, path, headers=(), query=b""):
+    return {"type": "http", "method": method, "path": path, "query_string": query,
+            "headers": list(headers), "http_version": "1.1", "scheme": "http",
+            "server": ("127.0.0.1", 5000), "client": ("127.0.0.1", 40000)}
+
+
+def _appeler(asgi, method, path, corps=(), headers=(), query=b""):
+    """Exécute une requête ASGI ; retourne (statut, en-têtes, messages de corps)."""
+    entrees = [{"type": "http.request", "body": c, "more_body": i < len(corps) - 1}
+               for i, c in enumerate(corps)] or [{"type": "http.request", "body": b""}]
+    envoyes = []
+
+    async def receive():
+        return entrees.pop(0) if entrees else {"type": "http.disconnect"}
+
+    async def send(message):
+        envoyes.append(message)
+
+    asyncio.run(asgi(_scope(method, path, headers, query), receive, send))
+
+    debut = envoyes[0]
+    assert debut["type"] == "http.response.start"
+    return debut["status"], dict(debut["headers"]), envoyes[1:]
+
+
+@pytest.fixture
+def asgi(client):
+    adaptateur = AsgiWsgi(flask_app, threads=2)
+    yield adaptateur
+    adaptateur._pool.shutdown()
+
+
+# ─── Tests positifs ────────────────────────────────────────────────────────────
+
+def test_asgi_get_book(asgi, client):
+    """Une réponse JSON complète est envoyée en un seul message de corps."""
+    book_id = client.post("/books", json={"titre": "A", "auteur": "X", "prix_cents": 100}).get_json()["id"]
+
+    statut, entetes, corps = _appeler(asgi, "GET", f"/books/{book_id}")
+
+    assert statut == 200
+    assert entetes[b"content-type"] == b"application/json"
+    assert len(corps) == 1
+    assert json.loads(corps[0]["body"])["titre"] == "A"
+
+
+def test_asgi_post_body_in_chunks(asgi, client):
+    """Le corps de la requête peut arriver en plusieurs messages."""
+    data = json.dumps({"titre": "Reçu en morceaux", "auteur": "X", "prix_cents": 100}).encode()
+
+    statut, _, _ = _appeler(asgi, "POST", "/books", corps=[data[:10], data[10:]],
+                            headers=[(b"content-type", b"application/json"),
+                                     (b"content-length", str(len(data)).encode())])
+
+    assert statut == 201
+    assert client.get("/books").get_json()[0]["titre"] == "Reçu en morceaux"
+
+
+def test_asgi_slow_upload_does_not_hold_a_thread(client):
+    """Un client lent à envoyer son corps n'occupe pas le pool : les autres requêtes passent."""
+    asgi = AsgiWsgi(flask_app, threads=1)
+    data = json.dumps({"titre": "Lent", "auteur": "X", "prix_cents": 100}).encode()
+
+    async def scenario():
+        suite  = asyncio.Event()
+        lent   = []
+        rapide = []
+
+        async def recevoir_lentement():
+            if not suite.is_set():
+                await suite.wait()   # le reste du corps n'arrive qu'après la requête rapide
+                return {"type": "http.request", "body": data[10:], "more_body": False}
+            return {"type": "http.disconnect"}
+
+        premiers = [{"type": "http.request", "body": data[:10], "more_body": True}]
+
+        async def receive_lent():
+            return premiers.pop(0) if premiers else await recevoir_lentement()
+
+        async def send_lent(message):
+            lent.append(message)
+
+        async def receive_rapide():
+            return {"type": "http.request", "body": b""}
+
+        async def send_rapide(message):
+            rapide.append(message)
+
+        envoi = asyncio.create_task(asgi(_scope("POST", "/books", [(b"content-type", b"application/json")]),
+                                         receive_lent, send_lent))
+        await asyncio.wait_for(asgi(_scope("GET", "/books"), receive_rapide, send_rapide), timeout=5)
+        assert rapide[0]["status"] == 200
+        assert lent == []
+
+        suite.set()
+        await asyncio.wait_for(envoi, timeout=5)
+        return lent[0]["status"]
+
+    try:
+        assert asyncio.run(scenario()) == 201
+    finally:
+        asgi._pool.shutdown()
+
+
+@pytest.mark.parametrize("headers", [[(b"content-length", b"100")], []])
+def test_asgi_rejects_oversized_body(client, headers):
+    """Corps au-delà de max_corps (annoncé ou reçu) → 413, sans exécuter la vue."""
+    asgi = AsgiWsgi(flask_app, threads=1, max_corps=50)
+    try:
+        statut, _, _ = _appeler(asgi, "POST", "/books", corps=[b"x" * 40, b"x" * 60],
+                                headers=[(b"content-type", b"application/json")] + headers)
+    finally:
+        asgi._pool.shutdown()
+
+    assert statut == 413
+    assert client.get("/books").get_json() == []
+
+
+def test_asgi_streams_exports(asgi, client):
+    """Une réponse en flux est envoyée morceau par morceau, puis terminée."""
+    from backend.bulk import importer
+    importer((i, {"isbn": str(i), "titre": "Livre " + "x" * 200, "auteur": "X", "prix_cents": 100})
+             for i in range(1000))
+
+    statut, _, corps = _appeler(asgi, "GET", "/books/export", query=b"format=ndjson")
+
+    assert statut == 200
+    assert len(corps) > 2
+    assert all(m.get("more_body") for m in corps[:-1])
+    assert not corps[-1].get("more_body")
+    lignes = b"".join(m["body"] for m in corps).splitlines()
+    assert len(lignes) == 1000
+
+
+def test_asgi_lifespan_runs_startup_once():
+    """Le démarrage (init_db en production) s'exécute au lifespan.startup."""
+    appels    = []
+    messages  = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    envoyes   = []
+    adaptateur = AsgiWsgi(flask_app, threads=1, au_demarrage=lambda: appels.append(1))
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        envoyes.append(message["type"])
+
+    asyncio.run(adaptateur({"type": "lifespan"}, receive, send))
+
+    assert appels == [1]
+    assert envoyes == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
@@ -0,0 +1,117 @@
+import builtins
+import os
+import re
+
+import pytest
+
+from backend.app import FRONTEND_DIR
+from backend.assets import RessourcesStatiques, CACHE_IMMUABLE, CACHE_REVALIDE
+
+
+@pytest.fixture
+def dossier(tmp_path):
+    """Petit frontend : une page qui référence une feuille de style."""
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "styles.css").write_text("body { color: red; }")
+    (tmp_path / "app.html").write_text('<link href="/frontend/css/styles.css">')
+    return tmp_path
+
+
+def _url_versionnee(html: bytes, chemin: str) -> str:
+    racine, ext = os.path.splitext(chemin)
+    m = re.search(rf"/frontend/({re.escape(racine)}\.[0-9a-f]{{12}}{re.escape(ext)})".encode(), html)
+    assert m, f"{chemin} non versionné"
+    return m.group(1).decode()
+
+
+# ─── Tests positifs ────────────────────────────────────────────────────────────
+
+def test_app_html_links_fingerprinted_assets(client):
+    """La page pointe vers les URL versionnées du script et de la feuille de style."""
+    html = client.get("/app").data
+    assert b"/frontend/js/api.js" not in html
+    assert b"/frontend/css/styles.css" not in html
+    _url_versionnee(html, "js/api.js")
+    _url_versionnee(html, "css/styles.css")
+
+
+def test_fingerprinted_url_is_immutable(client):
+    chemin = _url_versionnee(client.get("/app").data, "js/api.js")
+    r = client.get(f"/frontend/{chemin}")
+
+    assert r.status_code == 200
+    assert r.headers["Cache-Control"] == CACHE_IMMUABLE
+    assert r.mimetype == "text/javascript"
+    assert r.data == (FRONTEND_DIR / "js" / "api.js").read_bytes()
+
+
+def test_plain_url_revalidates(client):
+    """Sans empreinte : no-cache, validé par l'ETag (hash du contenu)."""
+    r = client.get("/frontend/css/styles.css")
+    assert r.headers["Cache-Control"] == CACHE_REVALIDE
+    etag = r.headers["ETag"]
+
+    r = client.get("/frontend/css/styles.css", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["Cache-Control"] == CACHE_REVALIDE
+
+
+def test_production_does_not_touch_disk(dossier, monkeypatch):
+    """Une fois chargées, les ressources sont servies sans ouvrir ni stat-er un fichier."""
+    ressources = RessourcesStatiques(dossier)
+    ressources.charger()
+
+    def interdit(*args, **kwargs):
+        raise AssertionError("accès disque")
+
+    monkeypatch.setattr(builtins, "open", interdit)
+    monkeypatch.setattr(os, "stat", interdit)
+    monkeypatch.setattr(os, "walk", interdit)
+
+    ressource, immuable = ressources.trouver("css/styles.css")
+    assert ressource.corps.brut == b"body { color: red; }"
+    assert not immuable
+    assert ressources.trouver(ressource.chemin_versionne) == (ressource, True)
+
+
+def test_dev_mode_reloads_changed_files(dossier):
+    ressources = RessourcesStatiques(dossier, recharger=True)
+    avant, _ = ressources.trouver("css/styles.css")
+
+    fichier = dossier / "css" / "styles.css"
+    fichier.write_text("body { color: blue; }")
+    os.utime(fichier, ns=(1, 1))   # date différente même sur un système de fichiers grossier
+
+    apres, _ = ressources.trouver("css/styles.css")
+    assert apres.corps.brut == b"body { color: blue; }"
+    assert apres.empreinte != avant.empreinte
+    page, _ = ressources.trouver("app.html")
+    assert ressources.url(apres).encode() in page.corps.brut
+
+
+def test_production_ignores_changed_files(dossier):
+    ressources = RessourcesStatiques(dossier)
+    avant, _ = ressources.trouver("css/styles.css")
+    (dossier / "css" / "styles.css").write_text("body { color: blue; }")
+    assert ressources.trouver("css/styles.css")[0] is avant
+
+
+# ─── Tests négatifs ────────────────────────────────────────────────────────────
+
+def test_unknown_fingerprint_is_404(client):
+    assert client.get("/frontend/js/api.000000000000.js").status_code == 404
+
+
+def test_missing_file_is_404(client):
+    assert client.get("/frontend/js/absent.js").status_code == 404
+
+
+def test_path_outside_frontend_is_404(client):
+    assert client.get("/frontend/../backend/app.py").status_code == 404
+
+
+def test_html_keeps_unknown_links(dossier):
+    """Un lien vers un fichier absent du dossier n'est pas réécrit."""
+    (dossier / "app.html").write_text('<script src="/frontend/js/absent.js"></script>')
+    page, _ = RessourcesStatiques(dossier).trouver("app.html")
+    assert page.corps.brut == b'<script src="/frontend/js/absent.js"></script>'
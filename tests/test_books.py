@@ -1,3 +1,6 @@
+import base64
+import json
+
 import pytest
 
 
@@ -57,6 +60,37 @@ def test_update_book(client):
     assert data["auteur"] == "X"  # Inchangé
 
 
+def test_book_stock_drives_availability(client):
+    """Créé sans exemplaire, le livre est indisponible ; un réassort le rend disponible."""
+    book_id = client.post("/books", json={"titre": "X", "auteur": "Y", "prix_cents": 100,
+                                          "stock": 0}).get_json()["id"]
+    assert client.get(f"/books/{book_id}").get_json()["disponible"] is False
+
+    client.put(f"/books/{book_id}", json={"stock": 5})
+    assert client.get(f"/books/{book_id}/stock").get_json() == {"id": book_id, "stock": 5, "disponible": True}
+
+    client.put(f"/books/{book_id}", json={"stock": None})
+    assert client.get(f"/books/{book_id}/stock").get_json()["stock"] is None
+
+
+def test_update_book_keeps_stock(client, monkeypatch):
+    """Modifier un autre champ ne réécrit pas le stock lu avec le livre."""
+    from backend.models import Livre
+
+    book_id = client.post("/books", json={"titre": "X", "auteur": "Y", "prix_cents": 100,
+                                          "stock": 5}).get_json()["id"]
+    original = Livre.save
+
+    def vente_concurrente(self, *args, **kwargs):
+        # Une commande passe entre la lecture du livre et son écriture
+        Livre.update(stock=Livre.stock - 1).where(Livre.id == book_id).execute()
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Livre, "save", vente_concurrente)
+    assert client.put(f"/books/{book_id}", json={"titre": "Z"}).status_code == 200
+    assert client.get(f"/books/{book_id}/stock").get_json()["stock"] == 4
+
+
 def test_delete_book(client):
     """On crée un livre, on le supprime, puis la récupération doit retourner 404."""
     r = client.post("/books", json={"titre": "À supprimer", "auteur": "X", "prix_cents": 100})
@@ -118,6 +152,16 @@ def test_create_book_invalid_price_type(client):
     assert r.status_code == 400
 
 
+@pytest.mark.parametrize("stock", [-1, "beaucoup", "5", True, 2.9, 2**63])
+def test_invalid_stock(client, stock):
+    """stock doit être un entier >= 0 (ou null), en création comme en modification."""
+    r = client.post("/books", json={"titre": "X", "auteur": "Y", "prix_cents": 100, "stock": stock})
+    assert r.status_code == 400
+
+    book_id = client.post("/books", json={"titre": "X", "auteur": "Y", "prix_cents": 100}).get_json()["id"]
+    assert client.put(f"/books/{book_id}", json={"stock": stock}).status_code == 400
+
+
 def test_update_book_not_found(client):
     """Mettre à jour un livre inexistant doit retourner 404."""
     r = client.put("/books/99999", json={"titre": "X"})
@@ -130,6 +174,22 @@ def test_delete_book_not_found(client):
     assert r.status_code == 404
 
 
+def test_delete_ordered_book_keeps_order_history(client):
+    """Un livre déjà commandé n'est pas supprimé (409) : les lignes et totaux de la commande restent intacts."""
+    garde = client.post("/books", json={"titre": "Gardé", "auteur": "X", "prix_cents": 500}).get_json()["id"]
+    vendu = client.post("/books", json={"titre": "Vendu", "auteur": "Y", "prix_cents": 1000}).get_json()["id"]
+    order_id = client.post("/orders", json={
+        "client": {"nom": "A", "email": "a@b.com", "adresse": "1 rue X"},
+        "items":  [{"book_id": garde, "quantite": 1}, {"book_id": vendu, "quantite": 1}],
+    }).get_json()["id"]
+
+    assert client.delete(f"/books/{vendu}").status_code == 409
+
+    commande = client.get(f"/orders/{order_id}").get_json()
+    assert sum(i["ligne_total_cents"] for i in commande["items"]) == commande["sous_total_cents"] == 1500
+    assert client.get(f"/books/{vendu}").status_code == 200
+
+
 # ─── Tests techniques ──────────────────────────────────────────────────────────
 
 def test_404_returns_json(client):
@@ -157,3 +217,462 @@ def test_books_filter_disponible(client):
     results = r.get_json()
     assert r.status_code == 200
     assert all(b["disponible"] for b in results)
+
+
+# ─── Tests techniques — recherche plein texte ─────────────────────────────────
+# FTS5 n'existe que sous SQLite ; PostgreSQL utilise le repli LIKE.
+
+@pytest.mark.sqlite_only
+def test_search_prefix_and_accents(client):
+    """La recherche trouve les préfixes et ignore les accents."""
+    client.post("/books", json={"titre": "Java débutant", "auteur": "Martin", "prix_cents": 999})
+
+    assert len(client.get("/books?search=debut").get_json()) == 1
+    assert len(client.get("/books?search=Mart").get_json()) == 1
+    assert client.get("/books?search=rust").get_json() == []
+
+
+@pytest.mark.sqlite_only
+def test_search_ranks_title_first(client):
+    """Un livre dont le titre correspond passe avant une simple mention en description."""
+    client.post("/books", json={"titre": "Cuisine", "auteur": "A", "prix_cents": 100,
+                                "description": "Recettes pour développeurs Python pressés."})
+    client.post("/books", json={"titre": "Python avancé", "auteur": "B", "prix_cents": 100})
+
+    titres = [b["titre"] for b in client.get("/books?search=python").get_json()]
+    assert titres == ["Python avancé", "Cuisine"]
+
+
+@pytest.mark.sqlite_only
+def test_search_index_follows_updates_and_deletes(client):
+    """L'index suit les modifications et suppressions de livres."""
+    book_id = client.post("/books", json={"titre": "Ancien", "auteur": "X", "prix_cents": 100}).get_json()["id"]
+
+    client.put(f"/books/{book_id}", json={"titre": "Nouveau"})
+    assert client.get("/books?search=ancien").get_json() == []
+    assert len(client.get("/books?search=nouveau").get_json()) == 1
+
+    client.delete(f"/books/{book_id}")
+    assert client.get("/books?search=nouveau").get_json() == []
+
+
+def test_search_falls_back_to_like(client, monkeypatch):
+    """Sans FTS5, la recherche retombe sur le filtre LIKE (titre, auteur ou description)."""
+    import backend.search as search
+
+    client.post("/books", json={"titre": "Python avancé", "auteur": "Dupont", "prix_cents": 999})
+    client.post("/books", json={"titre": "Recettes", "auteur": "Martin", "prix_cents": 999,
+                                "description": "Cuisine des pythonesques"})
+    client.post("/books", json={"titre": "Autre", "auteur": "Durand", "prix_cents": 999})
+    monkeypatch.setattr(search, "_fts_actif", False)
+
+    results = client.get("/books?search=thon").get_json()
+    assert sorted(b["titre"] for b in results) == ["Python avancé", "Recettes"]
+    results = client.get("/books?search=cuisine").get_json()
+    assert [b["titre"] for b in results] == ["Recettes"]
+
+
+def test_search_without_fts_terms_uses_like(client):
+    """Une saisie sans mot indexable (ex. ponctuation) passe par LIKE, description comprise."""
+    client.post("/books", json={"titre": "A", "auteur": "X", "prix_cents": 999, "description": "Prix : 5 $ !"})
+    client.post("/books", json={"titre": "B", "auteur": "Y", "prix_cents": 999})
+
+    assert [b["titre"] for b in client.get("/books?search=$ !").get_json()] == ["A"]
+
+
+def test_like_search_is_paginated(client, monkeypatch):
+    """Sans FTS5, la recherche n'est pas triée par pertinence : elle se pagine par curseur."""
+    import backend.search as search
+
+    for i in range(3):
+        client.post("/books", json={"titre": f"Python {i}", "auteur": "Dupont", "prix_cents": 999})
+    monkeypatch.setattr(search, "_fts_actif", False)
+
+    r = client.get("/books?search=python&limit=2")
+    assert [b["titre"] for b in r.get_json()] == ["Python 0", "Python 1"]
+    r = client.get(f"/books?search=python&limit=2&after={r.headers['X-Next-Cursor']}")
+    assert [b["titre"] for b in r.get_json()] == ["Python 2"]
+    assert "X-Next-Cursor" not in r.headers
+
+
+@pytest.mark.sqlite_only
+def test_relevance_search_rejects_cursor(client):
+    """Triée par pertinence (FTS5, sans ?sort=), la recherche n'a qu'une page : after est refusé."""
+    _create_books(client, [100, 200])
+    after = client.get("/books?limit=1").headers["X-Next-Cursor"]
+    assert client.get(f"/books?search=livre&after={after}").status_code == 400
+    assert client.get(f"/books?search=livre&sort=id&after={after}").status_code == 200
+
+
+# ─── Tests techniques — cache du catalogue ────────────────────────────────────
+
+def test_catalogue_cache_hit_and_invalidation(client):
+    """La 2e lecture vient du cache ; une création de livre l'invalide."""
+    client.post("/books", json={"titre": "Premier", "auteur": "A", "prix_cents": 100})
+
+    client.get("/books")
+    avant = client.get("/cache/stats").get_json()
+    assert len(client.get("/books").get_json()) == 1
+    apres = client.get("/cache/stats").get_json()
+    assert apres["hits"] == avant["hits"] + 1
+
+    client.post("/books", json={"titre": "Second", "auteur": "B", "prix_cents": 100})
+    assert len(client.get("/books").get_json()) == 2
+
+
+def test_catalogue_cache_sees_external_writes(client):
+    """Une écriture faite hors des routes (autre worker, script) invalide le cache via la version partagée."""
+    from backend.models import Livre
+
+    r = client.post("/books", json={"titre": "Original", "auteur": "A", "prix_cents": 100})
+    book_id = r.get_json()["id"]
+    assert client.get(f"/books/{book_id}").get_json()["titre"] == "Original"
+    client.get("/books")
+
+    Livre.update(titre="Modifié").where(Livre.id == book_id).execute()
+
+    assert client.get(f"/books/{book_id}").get_json()["titre"] == "Modifié"
+    assert client.get("/books").get_json()[0]["titre"] == "Modifié"
+
+
+def test_catalogue_cache_drops_load_interrupted_by_write(client):
+    """Un chargement pendant lequel le cache est vidé (écriture concurrente) n'est pas gardé."""
+    from backend.cache import CatalogueCache
+
+    cache = CatalogueCache()
+
+    def lecture_perimee(valeur):
+        def charger():
+            cache.invalider()   # une écriture arrive pendant la lecture en BD
+            return valeur
+        return charger
+
+    assert cache.liste("tous:id", lecture_perimee(b"avant")) == b"avant"
+    assert cache.liste("tous:id", lambda: b"apres") == b"apres"
+
+    assert cache.livre(1, lecture_perimee({"titre": "avant"})) == {"titre": "avant"}
+    assert cache.livre(1, lambda: {"titre": "apres"}) == {"titre": "apres"}
+
+
+def test_catalogue_cache_lru_is_bounded(client):
+    """Le cache des livres individuels ne dépasse pas sa taille maximale."""
+    from backend.cache import CatalogueCache
+
+    cache = CatalogueCache(max_livres=2)
+    for i in range(5):
+        cache.livre(i, lambda i=i: {"id": i})
+
+    assert cache.stats()["livres"] == 2
+    assert cache.livre(4, lambda: None) == {"id": 4}
+
+
+# ─── Tests techniques — ETag / 304 ────────────────────────────────────────────
+
+def test_books_etag_not_modified(client):
+    """GET /books avec l'ETag courant → 304 ; après une écriture → 200."""
+    client.post("/books", json={"titre": "A", "auteur": "X", "prix_cents": 100})
+
+    r = client.get("/books")
+    etag = r.headers["ETag"]
+    assert "no-cache" in r.headers["Cache-Control"]
+
+    r304 = client.get("/books", headers={"If-None-Match": etag})
+    assert r304.status_code == 304
+    assert r304.data == b""
+
+    client.post("/books", json={"titre": "B", "auteur": "Y", "prix_cents": 100})
+    assert client.get("/books", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_book_etag_and_last_modified(client):
+    """GET /books/<id> fournit ETag + Last-Modified et répond 304 à la revalidation."""
+    book_id = client.post("/books", json={"titre": "A", "auteur": "X", "prix_cents": 100}).get_json()["id"]
+
+    r = client.get(f"/books/{book_id}")
+    assert "Last-Modified" in r.headers
+
+    assert client.get(f"/books/{book_id}", headers={"If-None-Match": r.headers["ETag"]}).status_code == 304
+    assert client.get(f"/books/{book_id}",
+                      headers={"If-Modified-Since": r.headers["Last-Modified"]}).status_code == 304
+
+
+# ─── Tests positifs — pagination, tri et champs ───────────────────────────────
+
+def _create_books(client, prix):
+    return [client.post("/books", json={"titre": f"Livre {i:02d}", "auteur": "X", "prix_cents": p,
+                                        "description": "Longue description."}).get_json()["id"]
+            for i, p in enumerate(prix)]
+
+
+def test_list_books_skips_description_by_default(client):
+    """La liste n'envoie la description que si ?fields= la demande."""
+    _create_books(client, [100])
+
+    assert "description" not in client.get("/books").get_json()[0]
+    livre = client.get("/books?fields=titre,description").get_json()[0]
+    assert set(livre) == {"id", "titre", "description"}
+
+
+def test_list_books_cursor_pagination(client):
+    """?sort=-prix_cents : les pages se suivent sans doublon ni trou, égalités départagées par id."""
+    ids = _create_books(client, [300, 100, 200, 200, 100, 300, 200])
+
+    vus, after = [], ""
+    while True:
+        r = client.get(f"/books?sort=-prix_cents&limit=3&fields=prix_cents&after={after}")
+        vus += [(b["prix_cents"], b["id"]) for b in r.get_json()]
+        after = r.headers.get("X-Next-Cursor")
+        if not after:
+            break
+
+    assert len(vus) == len(ids)
+    assert vus == sorted(vus, key=lambda v: (-v[0], -v[1]))
+
+
+def test_list_books_sorted_by_title(client):
+    _create_books(client, [100, 100, 100])
+    titres = [b["titre"] for b in client.get("/books?sort=-titre&limit=2").get_json()]
+    assert titres == ["Livre 02", "Livre 01"]
+
+
+def test_list_books_selects_requested_columns(client, count_queries):
+    """?fields= ne lit que les colonnes demandées (plus l'id et la clé de tri)."""
+    _create_books(client, [100])
+
+    with count_queries() as qc:
+        client.get("/books?fields=titre&sort=prix_cents")
+
+    sql = next(q for q in qc.queries if 'FROM "livre"' in q)
+    assert '"description"' not in sql and '"auteur"' not in sql
+
+
+# ─── Tests négatifs — pagination, tri et champs ───────────────────────────────
+
+@pytest.mark.parametrize("params", [
+    "limit=abc", "sort=auteur", "fields=titre,mot_de_passe", "after=pas-un-curseur",
+])
+def test_list_books_invalid_params(client, params):
+    assert client.get("/books?" + params).status_code == 400
+
+
+def _curseur(*valeurs) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(valeurs)).encode()).decode()
+
+
+@pytest.mark.parametrize("sort, after", [
+    ("titre",      _curseur("titre", {"$gt": 1}, 1)),
+    ("titre",      _curseur("titre", ["a"], 1)),
+    ("titre",      _curseur("titre", 3, 1)),
+    ("prix_cents", _curseur("prix_cents", "100", 1)),
+    ("prix_cents", _curseur("prix_cents", 2 ** 70, 1)),
+    ("id",         _curseur("id", True, 1)),
+    ("id",         _curseur("id", 1, None)),
+    ("id",         _curseur("id", 1)),
+    ("id",         _curseur({"tri": "id"})),
+])
+def test_list_books_crafted_cursor(client, sort, after):
+    """Un curseur fabriqué (valeur d'un autre type) est refusé : 400, pas 500."""
+    _create_books(client, [100, 200])
+    assert client.get(f"/books?sort={sort}&after={after}").status_code == 400
+
+
+def test_list_books_cursor_from_other_sort(client):
+    """Un curseur n'est valable que pour le tri qui l'a produit."""
+    _create_books(client, [100, 200])
+    after = client.get("/books?sort=titre&limit=1").headers["X-Next-Cursor"]
+    assert client.get(f"/books?sort=prix_cents&after={after}").status_code == 400
+
+
+# ─── Tests positifs — export en flux ──────────────────────────────────────────
+
+def test_export_books_ndjson(client):
+    """GET /books/export renvoie un livre par ligne (NDJSON), trié par id."""
+    import json
+
+    for titre in ("A", "B", "C"):
+        client.post("/books", json={"titre": titre, "auteur": "X", "prix_cents": 100})
+
+    r = client.get("/books/export")
+    assert r.status_code == 200
+    assert r.mimetype == "application/x-ndjson"
+
+    lignes = [json.loads(l) for l in r.get_data(as_text=True).splitlines()]
+    assert [l["titre"] for l in lignes] == ["A", "B", "C"]
+
+
+def test_export_books_json_array(client):
+    """?format=json renvoie un tableau JSON valide (envoyé par morceaux)."""
+    client.post("/books", json={"titre": "Dispo",   "auteur": "X", "prix_cents": 100})
+    client.post("/books", json={"titre": "Indispo", "auteur": "X", "prix_cents": 100, "disponible": False})
+
+    assert [b["titre"] for b in client.get("/books/export?format=json&disponible=true").get_json()] == ["Dispo"]
+    assert client.get("/books/export?format=json").get_json()[1]["titre"] == "Indispo"
+
+
+def test_export_books_is_streamed(client):
+    """La réponse est un flux (pas de corps pré-calculé)."""
+    client.post("/books", json={"titre": "A", "auteur": "X", "prix_cents": 100})
+    r = client.get("/books/export", buffered=False)
+    assert r.is_streamed
+    r.close()
+
+
+def test_export_books_invalid_format(client):
+    """Format inconnu → 400."""
+    assert client.get("/books/export?format=xml").status_code == 400
+
+
+# ─── Tests positifs — import en masse ─────────────────────────────────────────
+
+def _ndjson(*livres):
+    import json
+    return "\n".join(json.dumps(l) for l in livres) + "\n"
+
+
+def test_bulk_import_ndjson_upserts_by_isbn(client):
+    """POST /books/bulk crée les nouveaux ISBN et met à jour les existants."""
+    r = client.post("/books/bulk", data=_ndjson(
+        {"isbn": "111", "titre": "Un",   "auteur": "A", "prix_cents": 100},
+        {"isbn": "222", "titre": "Deux", "auteur": "B", "prix_cents": 200},
+    ), content_type="application/x-ndjson")
+    assert r.status_code == 200
+    assert r.get_json()["crees"] == 2
+
+    r = client.post("/books/bulk", data=_ndjson(
+        {"isbn": "222", "titre": "Deux (2e éd.)", "auteur": "B", "prix_cents": 250},
+        {"isbn": "333", "titre": "Trois",         "auteur": "C", "prix_cents": 300},
+    ), content_type="application/x-ndjson")
+    rapport = r.get_json()
+    assert (rapport["crees"], rapport["mis_a_jour"]) == (1, 1)
+
+    livres = {b["isbn"]: b for b in client.get("/books").get_json()}
+    assert len(livres) == 3
+    assert livres["222"]["titre"] == "Deux (2e éd.)"
+    assert livres["222"]["prix_cents"] == 250
+
+
+def test_bulk_import_csv(client):
+    """Le format CSV (avec en-têtes) est accepté via le Content-Type text/csv."""
+    csv = ("isbn,titre,auteur,prix_cents,disponible\n"
+           "111,Un,A,100,oui\n"
+           "222,Deux,B,200,false\n")
+    rapport = client.post("/books/bulk", data=csv, content_type="text/csv").get_json()
+    assert rapport["crees"] == 2
+
+    dispo = {b["isbn"]: b["disponible"] for b in client.get("/books").get_json()}
+    assert dispo == {"111": True, "222": False}
+
+
+def test_bulk_import_reports_row_errors_without_aborting(client):
+    """Les lignes invalides sont rapportées avec leur numéro ; les autres sont importées."""
+    corps = _ndjson(
+        {"isbn": "111", "titre": "Un", "auteur": "A", "prix_cents": 100},
+        {"isbn": "222", "titre": "Deux", "auteur": "B", "prix_cents": -5},
+        {"titre": "Sans ISBN", "auteur": "C", "prix_cents": 100},
+    ) + "pas du json\n"
+    rapport = client.post("/books/bulk", data=corps).get_json()
+
+    assert rapport["crees"]   == 1
+    assert rapport["erreurs"] == 3
+    assert [e["ligne"] for e in rapport["details"]] == [2, 3, 4]
+
+
+def test_bulk_import_updates_search_index(client):
+    """Les livres importés sont trouvables par la recherche."""
+    client.post("/books/bulk", data=_ndjson(
+        {"isbn": "111", "titre": "Rust embarqué", "auteur": "A", "prix_cents": 100}))
+    assert len(client.get("/books?search=rust").get_json()) == 1
+
+
+def test_bulk_import_isolates_rejected_rows(client, monkeypatch):
+    """Un lot refusé par la BD est rejoué ligne par ligne : seules les fautives échouent."""
+    import backend.bulk as bulk
+    from peewee import IntegrityError
+
+    original = bulk._upsert
+
+    def upsert(lignes):
+        if any(l["isbn"] == "666" for l in lignes):
+            raise IntegrityError("refus simulé")
+        original(lignes)
+
+    monkeypatch.setattr(bulk, "_upsert", upsert)
+
+    rapport = client.post("/books/bulk", data=_ndjson(
+        {"isbn": "111", "titre": "Un",    "auteur": "A", "prix_cents": 100},
+        {"isbn": "666", "titre": "Refus", "auteur": "B", "prix_cents": 100},
+        {"isbn": "333", "titre": "Trois", "auteur": "C", "prix_cents": 100},
+    )).get_json()
+
+    assert rapport["crees"] == 2
+    assert [e["ligne"] for e in rapport["details"]] == [2]
+
+
+@pytest.mark.parametrize("champ,valeur", [
+    ("prix_cents", True),
+    ("prix_cents", 12.5),
+    ("prix_cents", 2**63),
+    ("prix_cents", "douze"),
+    ("disponible", 5),
+    ("disponible", []),
+    ("disponible", "peut-être"),
+])
+def test_bulk_import_rejects_invalid_values(client, champ, valeur):
+    """Booléen, flottant ou entier hors 64 bits en prix, disponible non booléen : ligne rapportée."""
+    livre = {"isbn": "111", "titre": "Un", "auteur": "A", "prix_cents": 100, champ: valeur}
+    rapport = client.post("/books/bulk", data=_ndjson(
+        livre,
+        {"isbn": "222", "titre": "Deux", "auteur": "B", "prix_cents": 200},
+    )).get_json()
+
+    assert rapport["crees"] == 1
+    assert [e["ligne"] for e in rapport["details"]] == [1]
+
+
+def test_bulk_import_reports_database_value_errors(client, monkeypatch):
+    """DataError / OverflowError au rejeu : la ligne est rapportée, pas de 500."""
+    import backend.bulk as bulk
+    from peewee import DataError
+
+    original = bulk._upsert
+
+    def upsert(lignes):
+        if any(l["isbn"] == "666" for l in lignes):
+            raise DataError("valeur hors limites")
+        if any(l["isbn"] == "777" for l in lignes):
+            raise OverflowError("Python int too large to convert to SQLite INTEGER")
+        original(lignes)
+
+    monkeypatch.setattr(bulk, "_upsert", upsert)
+
+    r = client.post("/books/bulk", data=_ndjson(
+        {"isbn": "111", "titre": "Un",    "auteur": "A", "prix_cents": 100},
+        {"isbn": "666", "titre": "Refus", "auteur": "B", "prix_cents": 100},
+        {"isbn": "777", "titre": "Trop",  "auteur": "C", "prix_cents": 100},
+    ))
+
+    assert r.status_code == 200
+    assert r.get_json()["crees"] == 1
+    assert [e["ligne"] for e in r.get_json()["details"]] == [2, 3]
+
+
+def test_create_book_duplicate_isbn(client):
+    """Créer un livre avec un ISBN déjà utilisé → 409."""
+    client.post("/books", json={"titre": "A", "auteur": "X", "prix_cents": 100, "isbn": "111"})
+    r = client.post("/books", json={"titre": "B", "auteur": "Y", "prix_cents": 100, "isbn": "111"})
+    assert r.status_code == 409
+
+
+def test_import_cli(client, tmp_path, monkeypatch, capsys):
+    """python -m backend.scripts.import importe un fichier CSV."""
+    import importlib
+    import sys
+
+    fichier = tmp_path / "catalogue.csv"
+    fichier.write_text("isbn,titre,auteur,prix_cents\n111,Un,A,100\n222,Deux,B,200\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["import", str(fichier), "--batch", "1"])
+
+    importlib.import_module("backend.scripts.import").run()
+
+    assert "2 créés" in capsys.readouterr().out
+    assert len(client.get("/books").get_json()) == 2
@@ -0,0 +1,115 @@
+import gzip
+
+import pytest
+
+from backend import app as app_module, compression
+from backend.app import FRONTEND_DIR
+from backend.assets import RessourcesStatiques
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+def _create_books(client, n):
+    for i in range(n):
+        client.post("/books", json={"titre": f"Livre {i}", "auteur": "Auteur", "prix_cents": 1000 + i})
+
+
+@pytest.fixture
+def compteur(monkeypatch):
+    """Compte les appels à compression.compresser (fichiers du frontend rechargés à neuf)."""
+    monkeypatch.setattr(app_module, "ressources", RessourcesStatiques(FRONTEND_DIR))
+    appels = []
+    original = compression.compresser
+
+    def compter(*args, **kwargs):
+        appels.append(args[1])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(compression, "compresser", compter)
+    return appels
+
+
+# ─── Tests positifs — négociation ──────────────────────────────────────────────
+
+def test_json_list_is_gzipped(client):
+    """Une liste assez grande est compressée si le client accepte gzip."""
+    _create_books(client, 30)
+    brut = client.get("/books").data
+
+    r = client.get("/books", headers=GZIP)
+
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["Vary"]
+    assert gzip.decompress(r.data) == brut
+    assert len(r.data) < len(brut)
+
+
+def test_compressed_response_revalidates(client):
+    """La variante compressée a un ETag faible, accepté par If-None-Match."""
+    _create_books(client, 30)
+    etag = client.get("/books", headers=GZIP).headers["ETag"]
+
+    assert etag.startswith('W/"')
+    assert client.get("/books", headers={**GZIP, "If-None-Match": etag}).status_code == 304
+
+
+def test_dynamic_json_is_compressed(client):
+    """Une page hors cache du catalogue (tri, limite) est compressée à la volée."""
+    _create_books(client, 30)
+    r = client.get("/books?limit=30&sort=titre", headers=GZIP)
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert len(gzip.decompress(r.data)) > len(r.data)
+
+
+def test_static_file_is_compressed_once(client, compteur):
+    """app.html est compressé une fois, puis la variante est réutilisée."""
+    for _ in range(3):
+        r = client.get("/app", headers=GZIP)
+        assert r.headers["Content-Encoding"] == "gzip"
+        assert b"<html" in gzip.decompress(r.data)
+    assert compteur == ["gzip"]
+
+
+def test_static_file_revalidates(client):
+    """Le navigateur renvoie l'ETag faible de la variante gzip : 304."""
+    etag = client.get("/app", headers=GZIP).headers["ETag"]
+    assert client.get("/app", headers={**GZIP, "If-None-Match": etag}).status_code == 304
+
+
+def test_catalogue_page_is_compressed_once(client, compteur):
+    """La page du catalogue en cache garde sa variante compressée."""
+    _create_books(client, 30)
+    for _ in range(3):
+        assert client.get("/books", headers=GZIP).headers["Content-Encoding"] == "gzip"
+    assert compteur == ["gzip"]
+
+
+def test_brotli_preferred_when_installed(client):
+    brotli = pytest.importorskip("brotli")
+    _create_books(client, 30)
+    r = client.get("/books", headers={"Accept-Encoding": "gzip, br"})
+    assert r.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(r.data) == client.get("/books").data
+
+
+# ─── Tests négatifs — pas de compression ──────────────────────────────────────
+
+def test_small_response_not_compressed(client):
+    r = client.get("/books", headers=GZIP)
+    assert "Content-Encoding" not in r.headers
+
+
+def test_no_accept_encoding_not_compressed(client):
+    _create_books(client, 30)
+    assert "Content-Encoding" not in client.get("/books").headers
+
+
+def test_refused_encoding_not_compressed(client):
+    _create_books(client, 30)
+    r = client.get("/books", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in r.headers
+
+
+def test_streamed_export_not_compressed(client):
+    _create_books(client, 30)
+    assert "Content-Encoding" not in client.get("/books/export", headers=GZIP).headers
@@ -0,0 +1,82 @@
+import json
+import logging
+import queue
+
+from backend.logs import JsonFormatter, Echantillonnage, QueueHandlerBorne
+
+
+def _record(msg, *args, niveau=logging.WARNING, **extra):
+    record = logging.LogRecord("bookshop", niveau, __file__, 1, msg, args, None)
+    for cle, valeur in extra.items():
+        setattr(record, cle, valeur)
+    return record
+
+
+# ─── Tests positifs ────────────────────────────────────────────────────────────
+
+def test_json_formatter_includes_extra_fields():
+    """Chaque ligne est un objet JSON qui reprend les champs passés dans extra=."""
+    ligne = JsonFormatter().format(_record("Erreur %d : %s", 404, "Livre introuvable", code=404))
+    data  = json.loads(ligne)
+
+    assert data["niveau"]  == "WARNING"
+    assert data["message"] == "Erreur 404 : Livre introuvable"
+    assert data["code"]    == 404
+
+
+def test_sampling_limits_repeated_warnings():
+    """Au-delà du quota par fenêtre, un même avertissement est supprimé et compté."""
+    filtre = Echantillonnage(max_par_fenetre=3, fenetre=60)
+
+    passes = [filtre.filter(_record("404 sur %s", f"/x/{i}")) for i in range(10)]
+
+    assert passes.count(True) == 3
+    assert filtre.supprimes   == 7
+    assert filtre.filter(_record("Autre message"))
+
+
+def test_sampling_keys_on_code_and_path():
+    """Une rafale de 404 ne fait pas taire les 400/409 logués par error()."""
+    filtre = Echantillonnage(max_par_fenetre=3, fenetre=60)
+
+    for _ in range(10):
+        filtre.filter(_record("Erreur %d : %s", 404, "Livre introuvable", code=404, path="/books/999"))
+
+    assert filtre.filter(_record("Erreur %d : %s", 400, "Données invalides", code=400, path="/orders"))
+    assert filtre.filter(_record("Erreur %d : %s", 409, "Stock insuffisant", code=409, path="/orders"))
+    assert filtre.filter(_record("Erreur %d : %s", 404, "Commande introuvable", code=404, path="/orders/7"))
+    assert filtre.supprimes == 7
+
+
+def test_sampling_bounds_tracked_keys():
+    """Chemins innombrables : le nombre de clés suivies reste borné et le quota s'applique."""
+    filtre = Echantillonnage(max_par_fenetre=3, fenetre=60, max_cles=5)
+
+    passes = [filtre.filter(_record("Erreur %d : %s", 404, "x", code=404, path=f"/books/{i}")) for i in range(50)]
+
+    assert len(filtre._compteurs) <= 6
+    assert passes.count(True) == 5 + 3
+
+
+def test_sampling_never_drops_errors():
+    """Les erreurs ne sont jamais échantillonnées."""
+    filtre = Echantillonnage(max_par_fenetre=0)
+    assert filtre.filter(_record("500 — %s", "boom", niveau=logging.ERROR))
+
+
+def test_bounded_queue_drops_instead_of_blocking():
+    """File pleine : l'enregistrement est abandonné et compté, sans bloquer."""
+    handler = QueueHandlerBorne(queue.Queue(maxsize=2))
+
+    for i in range(5):
+        handler.handle(_record("message %d", i, niveau=logging.INFO))
+
+    assert handler.queue.qsize() == 2
+    assert handler.perdus        == 3
+
+
+def test_log_counters_in_metrics(client):
+    """/metrics expose les compteurs de logs abandonnés et échantillonnés."""
+    texte = client.get("/metrics").get_data(as_text=True)
+    assert "bookshop_log_dropped_total" in texte
+    assert "bookshop_log_sampled_total" in texte
@@ -0,0 +1,61 @@
+import pytest
+
+from backend.metrics import metriques, Metriques
+
+
+@pytest.fixture(autouse=True)
+def _metriques_vides():
+    metriques.reinitialiser()
+
+
+def _valeur(texte: str, prefixe: str) -> float:
+    """Retourne la valeur de la première ligne Prometheus qui commence par prefixe."""
+    for ligne in texte.splitlines():
+        if ligne.startswith(prefixe):
+            return float(ligne.rsplit(" ", 1)[1])
+    raise AssertionError(f"métrique absente : {prefixe}")
+
+
+# ─── Tests positifs ────────────────────────────────────────────────────────────
+
+def test_metrics_counts_requests_and_sql(client):
+    """/metrics expose le nombre de requêtes et de requêtes SQL par endpoint."""
+    book_id = client.post("/books", json={"titre": "A", "auteur": "X", "prix_cents": 100}).get_json()["id"]
+    client.get(f"/books/{book_id}")
+    client.get(f"/books/{book_id}")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.mimetype == "text/plain"
+
+    texte = r.get_data(as_text=True)
+    assert _valeur(texte, 'bookshop_http_requests_total{endpoint="/books/<int:book_id>",method="GET",status="200"}') == 2
+    assert _valeur(texte, 'bookshop_db_queries_total{endpoint="/books/<int:book_id>",method="GET"}') >= 2
+    assert _valeur(texte, 'bookshop_http_request_duration_seconds_count{endpoint="/books/<int:book_id>",method="GET"}') == 2
+    assert "bookshop_catalogue_cache_hits_total" in texte
+
+
+def test_metrics_unknown_route_label(client):
+    """Les 404 sur des routes inconnues sont regroupées sous un seul libellé."""
+    client.get("/route/inconnue")
+    texte = client.get("/metrics").get_data(as_text=True)
+    assert 'endpoint="inconnu",method="GET",status="404"' in texte
+
+
+def test_server_timing_header_in_debug(client):
+    """En mode debug, chaque réponse porte un en-tête Server-Timing."""
+    r = client.get("/books")
+    assert "db;dur=" in r.headers["Server-Timing"]
+
+
+def test_histogram_buckets_are_cumulative():
+    """Les seaux de l'histogramme sont cumulatifs et se terminent par +Inf."""
+    m = Metriques()
+    m.enregistrer("/x", "GET", 200, 0.003, 1, 0.001)
+    m.enregistrer("/x", "GET", 200, 0.2,   1, 0.001)
+    m.enregistrer("/x", "GET", 200, 10.0,  1, 0.001)
+
+    texte = m.prometheus()
+    assert _valeur(texte, 'bookshop_http_request_duration_seconds_bucket{endpoint="/x",method="GET",le="0.005"}') == 1
+    assert _valeur(texte, 'bookshop_http_request_duration_seconds_bucket{endpoint="/x",method="GET",le="0.25"}') == 2
+    assert _valeur(texte, 'bookshop_http_request_duration_seconds_bucket{endpoint="/x",method="GET",le="+Inf"}') == 3
@@ -266,3 +266,513 @@ def test_update_order_status_not_found(client):
 def test_list_orders_invalid_statut_filter(client):
     """Filtre statut invalide dans GET /orders → 400."""
     assert client.get("/orders?statut=inconnu").status_code == 400
+
+
+# ─── Tests techniques — nombre de requêtes SQL ───────────────────────────────
+
+def test_list_orders_constant_query_count(client, count_queries):
+    """GET /orders émet un nombre constant de requêtes, peu importe la taille de la page."""
+    book_id = _create_book(client)
+    _create_order(client, book_id)
+
+    with count_queries() as qc_un:
+        client.get("/orders?limit=100")
+
+    for _ in range(5):
+        _create_order(client, book_id)
+
+    with count_queries() as qc_six:
+        r = client.get("/orders?limit=100")
+
+    assert len(r.get_json()["orders"]) == 6
+    assert qc_six.count == qc_un.count
+
+
+def test_get_order_constant_query_count(client, count_queries):
+    """GET /orders/<id> ne fait pas une requête par ligne de commande."""
+    ids = [_create_book(client) for _ in range(5)]
+    r = client.post("/orders", json={
+        "client": {"nom": "A", "email": "a@b.com", "adresse": "Rue X"},
+        "items":  [{"book_id": bid, "quantite": 1} for bid in ids],
+    })
+    order_id = r.get_json()["id"]
+
+    with count_queries() as qc:
+        r = client.get(f"/orders/{order_id}")
+
+    assert len(r.get_json()["items"]) == 5
+    assert qc.count == 2
+
+
+def test_create_order_constant_query_count(client, count_queries):
+    """POST /orders coûte le même nombre de requêtes pour 1 ou 10 lignes."""
+    ids = [_create_book(client) for _ in range(10)]
+
+    def commander(book_ids):
+        return client.post("/orders", json={
+            "client": {"nom": "A", "email": "a@b.com", "adresse": "Rue X"},
+            "items":  [{"book_id": bid, "quantite": 1} for bid in book_ids],
+        })
+
+    with count_queries() as qc_un:
+        assert commander(ids[:1]).status_code == 201
+
+    with count_queries() as qc_dix:
+        assert commander(ids).status_code == 201
+
+    assert qc_dix.count == qc_un.count
+
+
+def test_create_order_is_atomic(client, monkeypatch):
+    """Si l'insertion des lignes échoue, ni le client ni la commande ne restent en BD."""
+    from backend.models import Client, Commande, CommandeLivre
+
+    book_id = _create_book(client)
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("échec simulé")
+
+    monkeypatch.setattr(CommandeLivre, "insert_many", boom)
+
+    with pytest.raises(RuntimeError):
+        _create_order(client, book_id)
+
+    assert Client.select().count()   == 0
+    assert Commande.select().count() == 0
+
+
+def test_order_lines_keep_checkout_price(client):
+    """Modifier un livre ne change pas les commandes passées (titre et prix figés)."""
+    book_id  = _create_book(client)
+    order_id = _create_order(client, book_id).get_json()["id"]
+
+    client.put(f"/books/{book_id}", json={"titre": "Nouveau titre", "prix_cents": 9900})
+
+    item = client.get(f"/orders/{order_id}").get_json()["items"][0]
+    assert item["titre"]               == "Livre Commande"
+    assert item["prix_unitaire_cents"] == 2000
+    assert item["ligne_total_cents"]   == 4000
+
+    export = client.get("/orders/export?format=json").get_json()
+    assert export[0]["items"][0]["prix_unitaire_cents"] == 2000
+
+
+def test_get_order_reads_lines_without_join(client, count_queries):
+    """Les lignes d'une commande sont lues sans jointure sur livre."""
+    book_id  = _create_book(client)
+    order_id = _create_order(client, book_id).get_json()["id"]
+
+    with count_queries() as qc:
+        client.get(f"/orders/{order_id}")
+
+    assert not any('JOIN "livre"' in sql for sql in qc.queries)
+
+
+# ─── Tests positifs — clients ─────────────────────────────────────────────────
+
+def _commander_en_tant_que(client, book_id, email, adresse="123 Rue X"):
+    r = client.post("/orders", json={
+        "client": {"nom": "Alice", "email": email, "adresse": adresse},
+        "items":  [{"book_id": book_id, "quantite": 1}],
+    })
+    assert r.status_code == 201
+    return r.get_json()["id"]
+
+
+def test_returning_client_is_reused(client):
+    """Un même email (casse et espaces ignorés) désigne un seul client, à jour."""
+    from backend.models import Client
+
+    book_id = _create_book(client)
+    a = _commander_en_tant_que(client, book_id, "alice@exemple.com")
+    b = _commander_en_tant_que(client, book_id, " Alice@Exemple.COM", adresse="9 Rue Neuve")
+
+    assert Client.select().count() == 1
+    premiere = client.get(f"/orders/{a}").get_json()["client"]
+    seconde  = client.get(f"/orders/{b}").get_json()["client"]
+    assert premiere["id"] == seconde["id"]
+    assert seconde["email"]   == "alice@exemple.com"
+    assert seconde["adresse"] == "9 Rue Neuve"
+
+
+def test_order_keeps_its_own_shipping_details(client):
+    """Une nouvelle commande du même email ne réécrit pas le nom ni l'adresse des précédentes."""
+    book_id = _create_book(client)
+    a = _commander_en_tant_que(client, book_id, "a@b.com", adresse="1 rue Vieille")
+    etag = client.get(f"/orders/{a}").headers["ETag"]
+
+    r = client.post("/orders", json={
+        "client": {"nom": "Mallory", "email": "A@b.com", "adresse": "666 rue Pirate"},
+        "items":  [{"book_id": book_id, "quantite": 1}],
+    })
+    b = r.get_json()["id"]
+
+    premiere = client.get(f"/orders/{a}", headers={"If-None-Match": etag})
+    assert premiere.status_code == 304
+    premiere = client.get(f"/orders/{a}").get_json()["client"]
+    seconde  = client.get(f"/orders/{b}").get_json()["client"]
+    assert (premiere["nom"], premiere["adresse"]) == ("Alice", "1 rue Vieille")
+    assert (seconde["nom"], seconde["adresse"])   == ("Mallory", "666 rue Pirate")
+    assert premiere["id"] == seconde["id"]
+
+    listees = {o["id"]: o["client"]["adresse"] for o in client.get("/orders").get_json()["orders"]}
+    assert listees == {a: "1 rue Vieille", b: "666 rue Pirate"}
+
+
+def test_list_orders_by_email(client):
+    """GET /orders?email= ne renvoie que les commandes de ce client."""
+    book_id = _create_book(client)
+    a1 = _commander_en_tant_que(client, book_id, "alice@exemple.com")
+    _commander_en_tant_que(client, book_id, "bob@exemple.com")
+    a2 = _commander_en_tant_que(client, book_id, "alice@exemple.com")
+
+    data = client.get("/orders?email=ALICE@exemple.com").get_json()
+    assert [o["id"] for o in data["orders"]] == [a2, a1]
+    assert data["total"] == 2
+
+    assert client.get("/orders?email=personne@exemple.com").get_json()["orders"] == []
+
+
+def test_list_client_orders(client):
+    """GET /clients/<id>/orders renvoie l'historique du client, paginé."""
+    book_id = _create_book(client)
+    ids = [_commander_en_tant_que(client, book_id, "alice@exemple.com") for _ in range(3)]
+    _commander_en_tant_que(client, book_id, "bob@exemple.com")
+    client_id = client.get(f"/orders/{ids[0]}").get_json()["client"]["id"]
+
+    data = client.get(f"/clients/{client_id}/orders?limit=2").get_json()
+    assert [o["id"] for o in data["orders"]] == ids[:0:-1]
+    assert data["total"] == 3
+    assert data["next_cursor"] == ids[1]
+
+
+def test_list_client_orders_not_found(client):
+    """Client inexistant → 404."""
+    assert client.get("/clients/9999/orders").status_code == 404
+
+
+# ─── Tests positifs — pagination par curseur ──────────────────────────────────
+
+def test_list_orders_cursor_pagination(client):
+    """?after_id= parcourt toutes les commandes sans doublon ni trou."""
+    book_id = _create_book(client)
+    ids = [_create_order(client, book_id).get_json()["id"] for _ in range(5)]
+
+    r1 = client.get("/orders?limit=2").get_json()
+    r2 = client.get(f"/orders?limit=2&after_id={r1['next_cursor']}").get_json()
+    r3 = client.get(f"/orders?limit=2&after_id={r2['next_cursor']}").get_json()
+
+    vus = [o["id"] for r in (r1, r2, r3) for o in r["orders"]]
+    assert vus == sorted(ids, reverse=True)
+    assert r3["next_cursor"] is None
+    assert "page" not in r2
+
+
+def test_list_orders_cursor_with_statut(client):
+    """Le curseur se combine avec le filtre ?statut=."""
+    book_id = _create_book(client)
+    ids = [_create_order(client, book_id).get_json()["id"] for _ in range(4)]
+    for order_id in ids[:3]:
+        client.put(f"/orders/{order_id}/status", json={"statut": "payee"})
+
+    r = client.get(f"/orders?statut=payee&limit=10&after_id={ids[2]}").get_json()
+    assert [o["id"] for o in r["orders"]] == [ids[1], ids[0]]
+    assert r["total"] == 3
+
+
+def test_list_orders_without_total(client, count_queries):
+    """?with_total=false supprime le COUNT(*) et les champs total/pages."""
+    book_id = _create_book(client)
+    _create_order(client, book_id)
+
+    with count_queries() as qc:
+        r = client.get("/orders?with_total=false").get_json()
+
+    assert "total" not in r and "pages" not in r
+    assert len(r["orders"]) == 1
+    assert qc.count == 1
+
+
+def test_list_orders_invalid_cursor(client):
+    """after_id non entier → 400."""
+    assert client.get("/orders?after_id=abc").status_code == 400
+
+
+@pytest.mark.parametrize("url", [
+    "/orders?after_id={n}",
+    "/orders?statut=payee&after_id={n}",
+    "/orders?page={n}",
+    "/clients/{client_id}/orders?after_id={n}",
+])
+def test_list_orders_out_of_range_cursor(client, url):
+    """after_id ou page au-delà des 64 bits → 400 (et non 500)."""
+    book_id  = _create_book(client)
+    order_id = _commander_en_tant_que(client, book_id, "alice@exemple.com")
+    client_id = client.get(f"/orders/{order_id}").get_json()["client"]["id"]
+
+    assert client.get(url.format(n=2**70, client_id=client_id)).status_code == 400
+
+
+# ─── Tests techniques — ETag / 304 ────────────────────────────────────────────
+
+def test_get_order_etag_changes_with_status(client, count_queries):
+    """Le suivi de commande reçoit 304 tant que le statut ne change pas, sans charger les lignes."""
+    book_id  = _create_book(client)
+    order_id = _create_order(client, book_id).get_json()["id"]
+
+    r    = client.get(f"/orders/{order_id}")
+    etag = r.headers["ETag"]
+    assert r.headers["Cache-Control"].startswith("private")
+
+    with count_queries() as qc:
+        r304 = client.get(f"/orders/{order_id}", headers={"If-None-Match": etag})
+    assert r304.status_code == 304
+    assert qc.count == 1
+
+    client.put(f"/orders/{order_id}/status", json={"statut": "payee"})
+
+    r2 = client.get(f"/orders/{order_id}", headers={"If-None-Match": etag})
+    assert r2.status_code == 200
+    assert r2.get_json()["statut"] == "payee"
+    assert r2.headers["ETag"] != etag
+
+
+# ─── Tests positifs — export en flux ──────────────────────────────────────────
+
+def test_export_orders_groups_lines(client, count_queries):
+    """GET /orders/export regroupe les lignes par commande, en une seule requête SQL."""
+    import json
+
+    ids = [_create_book(client) for _ in range(3)]
+    client.post("/orders", json={
+        "client": {"nom": "A", "email": "a@b.com", "adresse": "Rue X"},
+        "items":  [{"book_id": bid, "quantite": 1} for bid in ids],
+    })
+    _create_order(client, ids[0])
+
+    with count_queries() as qc:
+        r = client.get("/orders/export")
+        commandes = [json.loads(l) for l in r.get_data(as_text=True).splitlines()]
+
+    assert [len(c["items"]) for c in commandes] == [3, 1]
+    assert commandes[0]["client"]["nom"] == "A"
+    assert commandes[0]["created_at"]
+    assert qc.count == 1
+
+
+def test_export_orders_filters(client):
+    """Les filtres ?statut=, ?depuis= et ?jusqu_au= s'appliquent à l'export."""
+    from datetime import datetime, timedelta, timezone
+
+    book_id  = _create_book(client)
+    order_id = _create_order(client, book_id).get_json()["id"]
+    _create_order(client, book_id)
+    client.put(f"/orders/{order_id}/status", json={"statut": "payee"})
+
+    payees = client.get("/orders/export?format=json&statut=payee").get_json()
+    assert [c["id"] for c in payees] == [order_id]
+
+    aujourdhui = datetime.now(timezone.utc).date()  # created_at est en UTC
+    demain = (aujourdhui + timedelta(days=1)).isoformat()
+    assert client.get(f"/orders/export?format=json&depuis={demain}").get_json() == []
+    hier = (aujourdhui - timedelta(days=1)).isoformat()
+    assert len(client.get(f"/orders/export?format=json&jusqu_au={demain}&depuis={hier}").get_json()) == 2
+
+
+def test_export_orders_invalid_date(client):
+    """Date mal formée → 400."""
+    assert client.get("/orders/export?depuis=hier").status_code == 400
+
+
+# ─── Tests positifs — changement de statut en masse ──────────────────────────
+
+def test_bulk_status_reports_each_id(client):
+    """PUT /orders/status applique les transitions et rapporte le résultat par id."""
+    book_id = _create_book(client)
+    a, b, c = (_create_order(client, book_id).get_json()["id"] for _ in range(3))
+    client.put(f"/orders/{b}/status", json={"statut": "payee"})
+    client.put(f"/orders/{c}/status", json={"statut": "payee"})
+    client.put(f"/orders/{c}/status", json={"statut": "livree"})
+
+    r = client.put("/orders/status", json={"statut": "livree", "ids": [a, b, c, 9999]})
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data["modifiees"] == 1
+    assert data["resultats"] == [
+        {"id": a,    "resultat": "non_autorisee", "statut": "en_attente"},
+        {"id": b,    "resultat": "modifiee"},
+        {"id": c,    "resultat": "inchangee"},
+        {"id": 9999, "resultat": "introuvable"},
+    ]
+    assert client.get(f"/orders/{b}").get_json()["statut"] == "livree"
+    assert client.get(f"/orders/{a}").get_json()["statut"] == "en_attente"
+
+
+def test_bulk_status_by_filter(client):
+    """Avec un filtre, toutes les commandes au statut prédécesseur passent au suivant."""
+    book_id = _create_book(client)
+    ids = [_create_order(client, book_id).get_json()["id"] for _ in range(3)]
+    client.put(f"/orders/{ids[0]}/status", json={"statut": "payee"})
+
+    data = client.put("/orders/status",
+                      json={"statut": "payee", "filtre": {"statut": "en_attente"}}).get_json()
+    assert [r["id"] for r in data["resultats"]] == ids[1:]
+
+    data = client.put("/orders/status",
+                      json={"statut": "livree", "filtre": {"statut": "en_attente"}}).get_json()
+    assert data["modifiees"] == 0
+
+
+def test_bulk_status_constant_query_count(client, count_queries):
+    """Le nombre de requêtes SQL ne dépend pas du nombre de commandes."""
+    book_id = _create_book(client)
+    ids = [_create_order(client, book_id).get_json()["id"] for _ in range(20)]
+
+    with count_queries() as qc_petit:
+        client.put("/orders/status", json={"statut": "payee", "ids": ids[:2]})
+
+    with count_queries() as qc_grand:
+        client.put("/orders/status", json={"statut": "payee", "ids": ids[2:]})
+
+    assert qc_petit.count > 0
+    assert qc_grand.count == qc_petit.count
+
+
+def test_bulk_status_updates_etag(client):
+    """Les commandes modifiées en masse changent d'ETag (updated_at mis à jour)."""
+    book_id  = _create_book(client)
+    order_id = _create_order(client, book_id).get_json()["id"]
+    etag = client.get(f"/orders/{order_id}").headers["ETag"]
+
+    client.put("/orders/status", json={"statut": "payee", "ids": [order_id]})
+    r = client.get(f"/orders/{order_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+
+
+# ─── Tests positifs — stock ───────────────────────────────────────────────────
+
+def _create_stocked_book(client, stock):
+    r = client.post("/books", json={"titre": "Best-seller", "auteur": "Test",
+                                    "prix_cents": 2000, "stock": stock})
+    assert r.status_code == 201
+    return r.get_json()["id"]
+
+
+def test_order_reserves_stock(client):
+    book_id = _create_stocked_book(client, 5)
+    assert _create_order(client, book_id, quantite=2).status_code == 201
+    assert client.get(f"/books/{book_id}/stock").get_json() == {"id": book_id, "stock": 3, "disponible": True}
+
+
+def test_order_sells_out_book(client):
+    """Le dernier exemplaire vendu rend le livre indisponible, y compris dans le cache."""
+    book_id = _create_stocked_book(client, 2)
+    assert client.get(f"/books/{book_id}").get_json()["disponible"] is True
+
+    assert _create_order(client, book_id, quantite=2).status_code == 201
+
+    assert client.get(f"/books/{book_id}/stock").get_json()["stock"] == 0
+    assert client.get(f"/books/{book_id}").get_json()["disponible"] is False
+    assert _create_order(client, book_id, quantite=1).status_code == 400
+
+
+def test_untracked_stock_is_not_reserved(client):
+    """Sans stock (NULL), seul disponible compte, comme avant."""
+    book_id = _create_book(client)
+    assert _create_order(client, book_id, quantite=50).status_code == 201
+    assert client.get(f"/books/{book_id}/stock").get_json()["stock"] is None
+
+
+def test_reservation_keeps_catalogue_cache(client):
+    """Une réservation qui n'épuise pas le livre ne change pas la version du catalogue."""
+    from backend.cache import lire_version
+
+    book_id = _create_stocked_book(client, 5)
+    avant = lire_version()
+    assert _create_order(client, book_id, quantite=1).status_code == 201
+    assert lire_version() == avant
+
+
+def test_reserve_stock_constant_query_count(client, count_queries):
+    """La réservation est un seul UPDATE, pour 1 ou 10 livres suivis."""
+    ids = [_create_stocked_book(client, 10) for _ in range(10)]
+
+    def commander(book_ids):
+        return client.post("/orders", json={
+            "client": {"nom": "A", "email": "a@b.com", "adresse": "Rue X"},
+            "items":  [{"book_id": bid, "quantite": 1} for bid in book_ids],
+        })
+
+    with count_queries() as qc_un:
+        assert commander(ids[:1]).status_code == 201
+
+    with count_queries() as qc_dix:
+        assert commander(ids).status_code == 201
+
+    assert qc_dix.count == qc_un.count
+
+
+# ─── Tests négatifs — stock ───────────────────────────────────────────────────
+
+def test_insufficient_stock_is_conflict(client):
+    from backend.models import Commande
+
+    book_id = _create_stocked_book(client, 1)
+    assert _create_order(client, book_id, quantite=2).status_code == 409
+    assert Commande.select().count() == 0
+
+
+def test_same_book_lines_are_summed(client):
+    """Deux lignes du même livre réservent leur somme : 2 + 2 > 3, rien n'est écrit."""
+    from backend.models import Client, Commande
+
+    book_id = _create_stocked_book(client, 3)
+    r = client.post("/orders", json={
+        "client": {"nom": "A", "email": "a@b.com", "adresse": "Rue X"},
+        "items":  [{"book_id": book_id, "quantite": 2}, {"book_id": book_id, "quantite": 2}],
+    })
+
+    assert r.status_code == 409
+    assert client.get(f"/books/{book_id}/stock").get_json()["stock"] == 3
+    assert Client.select().count() == 0
+    assert Commande.select().count() == 0
+
+
+def test_reservation_does_not_trust_read_stock(client):
+    """Un stock lu avant une vente concurrente ne permet pas de survendre."""
+    from backend.app import _reserver_stock, StockInsuffisant
+    from backend.models import Livre
+
+    book_id = _create_stocked_book(client, 1)
+    lu = Livre.get_by_id(book_id)                     # stock = 1 en mémoire
+    assert _create_order(client, book_id, quantite=1).status_code == 201
+
+    with pytest.raises(StockInsuffisant):
+        _reserver_stock([(lu, 1)])
+    assert Livre.get_by_id(book_id).stock == 0
+
+
+def test_stock_of_unknown_book(client):
+    assert client.get("/books/99999/stock").status_code == 404
+
+
+# ─── Tests négatifs — changement de statut en masse ──────────────────────────
+
+@pytest.mark.parametrize("payload", [
+    {"statut": "expediee", "ids": [1]},
+    {"statut": "payee"},
+    {"statut": "payee", "ids": [1], "filtre": {}},
+    {"statut": "payee", "ids": "1,2"},
+    {"statut": "payee", "filtre": {"depuis": "hier"}},
+    {"statut": "payee", "filtre": {"statut": ["en_attente"]}},
+    {"statut": "payee", "filtre": {"statut": {"en_attente": 1}}},
+    {"statut": "payee", "filtre": {}},
+    {"statut": "payee", "filtre": {"depuis": "", "jusqu_au": None}},
+])
+def test_bulk_status_invalid_payload(client, payload):
+    """Corps invalide (y compris un filtre sans critère) → 400, aucune commande modifiée."""
+    from backend.models import Commande
+
+    _create_order(client, _create_book(client))
+    assert client.put("/orders/status", json=payload).status_code == 400
+    assert Commande.select().where(Commande.statut == "payee").count() == 0
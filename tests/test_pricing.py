@@ -0,0 +1,177 @@
+import json
+
+import pytest
+
+from backend import pricing
+from backend.models import Commande
+from backend.pricing import ReglesTarifaires
+
+
+REGLES = {
+    "version":    "test-1",
+    "taxes":      {"standard": 0.14975, "livre": 0.05},
+    "livraison":  [{"a_partir_de_cents": 0,    "frais_cents": 500},
+                   {"a_partir_de_cents": 5000, "frais_cents": 0}],
+    "promotions": [{"nom": "Rentrée", "code": "rentree10", "pourcentage": 10, "minimum_cents": 3000}],
+}
+
+
+@pytest.fixture
+def regles(tmp_path):
+    """Charge REGLES depuis un fichier ; les règles par défaut sont rétablies ensuite."""
+    chemin = tmp_path / "regles.json"
+    chemin.write_text(json.dumps(REGLES), encoding="utf-8")
+    yield pricing.recharger(str(chemin))
+    pricing.recharger("")
+
+
+def _create_book(client, prix_cents=2000, categorie_taxe=None):
+    data = {"titre": "Livre", "auteur": "X", "prix_cents": prix_cents}
+    if categorie_taxe:
+        data["categorie_taxe"] = categorie_taxe
+    r = client.post("/books", json=data)
+    assert r.status_code == 201
+    return r.get_json()["id"]
+
+
+# ─── Tests positifs — moteur de tarification ──────────────────────────────────
+
+def test_default_rules_match_config():
+    """Sans fichier : un seul taux (TAXE_TOTALE) et une livraison fixe."""
+    r = pricing.charger_regles("").calculer([(2000, 1, "standard")])
+    assert r == {
+        "sous_total_cents": 2000,
+        "remise_cents":     0,
+        "taxes_cents":      round(2000 * 0.14975),
+        "livraison_cents":  500,
+        "total_cents":      2000 + round(2000 * 0.14975) + 500,
+        "promotion":        None,
+        "version_tarifs":   "defaut",
+    }
+
+
+def test_taxes_rounded_once_per_category():
+    """1000 lignes à 1¢ : la taxe porte sur le total de la catégorie, pas ligne par ligne."""
+    r = pricing.charger_regles("").calculer([(1, 1, "standard")] * 1000)
+    assert r["taxes_cents"] == 150   # 1000 x 14,975 % = 149,75 -> 150 (0 par ligne)
+
+
+def test_tiers_categories_and_promotion(regles):
+    """Remise avant taxes, taux par catégorie, livraison selon le montant remisé."""
+    r = regles.calculer([(4000, 1, "livre"), (2000, 1, "standard")], code_promo="RENTREE10")
+
+    assert r["remise_cents"]    == 600                       # 10 % de 6000
+    assert r["taxes_cents"]     == 180 + round(1800 * 0.14975)
+    assert r["livraison_cents"] == 0                         # 5400 >= 5000
+    assert r["promotion"]       == "Rentrée"
+    assert r["version_tarifs"]  == "test-1"
+
+
+def test_promotion_requires_code_and_minimum(regles):
+    assert regles.calculer([(4000, 1, "livre")])["remise_cents"] == 0
+    assert regles.calculer([(1000, 1, "livre")], "RENTREE10")["remise_cents"] == 0
+
+
+def test_version_defaults_to_file_hash(tmp_path):
+    """Sans version explicite, deux fichiers différents donnent deux versions."""
+    versions = set()
+    for taux in (0.05, 0.1):
+        chemin = tmp_path / f"{taux}.json"
+        chemin.write_text(json.dumps({"taxes": {"standard": taux}}), encoding="utf-8")
+        versions.add(pricing.charger_regles(str(chemin)).version)
+    assert len(versions) == 2
+
+
+# ─── Tests négatifs — règles invalides ─────────────────────────────────────────
+
+@pytest.mark.parametrize("taxes, livraison", [
+    ({"livre": 0.05}, [(0, 500)]),          # pas de taux standard
+    ({"standard": 0.1}, [(1000, 0)]),       # aucun palier à 0
+])
+def test_invalid_rules(taxes, livraison):
+    with pytest.raises(ValueError):
+        ReglesTarifaires("v", taxes, livraison)
+
+
+# ─── Tests positifs — POST /orders/quote ──────────────────────────────────────
+
+def test_quote_matches_order(client):
+    """Le devis et la commande donnent les mêmes montants."""
+    book_id = _create_book(client)
+    items   = [{"book_id": book_id, "quantite": 3}]
+
+    devis    = client.post("/orders/quote", json={"items": items}).get_json()
+    commande = client.post("/orders", json={
+        "client": {"nom": "A", "email": "a@b.com", "adresse": "Rue X"}, "items": items,
+    }).get_json()
+
+    for cle in ("sous_total_cents", "remise_cents", "taxes_cents", "livraison_cents", "total_cents"):
+        assert devis[cle] == commande[cle]
+    assert devis["items"][0]["ligne_total_cents"] == 6000
+
+
+def test_quote_writes_nothing(client, count_queries):
+    """Un devis ne coûte qu'une lecture des livres."""
+    book_id = _create_book(client)
+
+    with count_queries() as qc:
+        r = client.post("/orders/quote", json={"items": [{"book_id": book_id}]})
+
+    assert r.status_code == 200
+    assert qc.count == 1
+    assert Commande.select().count() == 0
+
+
+def test_order_stores_rules_version_and_discount(client, regles):
+    book_id = _create_book(client, prix_cents=4000, categorie_taxe="livre")
+
+    r = client.post("/orders", json={
+        "client":     {"nom": "A", "email": "a@b.com", "adresse": "Rue X"},
+        "items":      [{"book_id": book_id, "quantite": 1}],
+        "code_promo": "rentree10",
+    })
+
+    assert r.status_code == 201
+    cmd = Commande.get_by_id(r.get_json()["id"])
+    assert (cmd.remise_cents, cmd.taxes_cents, cmd.version_tarifs) == (400, 180, "test-1")
+    assert client.get(f"/orders/{cmd.id}").get_json()["remise_cents"] == 400
+
+
+# ─── Tests négatifs — POST /orders/quote ──────────────────────────────────────
+
+@pytest.mark.parametrize("items, code", [
+    ([], 400),
+    ([{"book_id": "abc"}], 400),
+    ([{"book_id": 1, "quantite": 0}], 400),
+    ([{"book_id": 999}], 404),
+])
+def test_quote_invalid_items(client, items, code):
+    _create_book(client)
+    assert client.post("/orders/quote", json={"items": items}).status_code == code
+
+
+@pytest.mark.parametrize("code_promo", [10, ["RENTREE10"], {"code": "RENTREE10"}, True])
+def test_invalid_promo_code(client, code_promo):
+    """code_promo doit être une chaîne (ou absent) : 400, pas 500."""
+    book_id = _create_book(client)
+    items   = [{"book_id": book_id}]
+
+    assert client.post("/orders/quote", json={"items": items, "code_promo": code_promo}).status_code == 400
+    r = client.post("/orders", json={
+        "client":     {"nom": "A", "email": "a@b.com", "adresse": "Rue X"},
+        "items":      items,
+        "code_promo": code_promo,
+    })
+    assert r.status_code == 400
+    assert Commande.select().count() == 0
+
+
+@pytest.mark.parametrize("categorie", ["inconnue", ["livre"], {}, 5, None])
+def test_book_invalid_tax_category(client, categorie):
+    """Catégorie absente des règles ou qui n'est pas une chaîne : 400, en création comme en modification."""
+    r = client.post("/books", json={"titre": "A", "auteur": "X", "prix_cents": 100,
+                                    "categorie_taxe": categorie})
+    assert r.status_code == 400
+
+    book_id = _create_book(client)
+    assert client.put(f"/books/{book_id}", json={"categorie_taxe": categorie}).status_code == 400
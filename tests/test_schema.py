@@ -0,0 +1,279 @@
+import pytest
+from peewee import Tuple
+
+from backend.app import init_db
+from backend.database import db
+from backend.models import Livre, Client, Commande, CommandeLivre
+
+
+def _plan(query) -> str:
+    """Retourne le plan d'exécution SQLite d'une requête Peewee, sur une ligne."""
+    sql, params = query.sql()
+    rows = db.execute_sql("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+# ─── Tests techniques — index des requêtes chaudes ────────────────────────────
+# Les plans d'exécution sont propres à SQLite (EXPLAIN QUERY PLAN).
+
+@pytest.mark.sqlite_only
+def test_orders_by_statut_uses_index(client):
+    """GET /orders?statut= filtre, trie et pagine via l'index (statut, id DESC)."""
+    qs = (Commande.select()
+          .where((Commande.statut == "payee") & (Commande.id < 100))
+          .order_by(Commande.id.desc())
+          .limit(11))
+    plan = _plan(qs)
+    assert "commande_statut_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.sqlite_only
+def test_count_by_statut_uses_index(client):
+    """Le COUNT(*) filtré par statut n'a pas besoin de parcourir la table."""
+    plan = _plan(Commande.select(Commande.id).where(Commande.statut == "payee"))
+    assert "commande_statut_id" in plan
+
+
+@pytest.mark.sqlite_only
+def test_available_books_use_partial_index(client):
+    """GET /books?disponible=true parcourt l'index partiel des livres disponibles."""
+    assert "livre_disponibles" in _plan(Livre.select().where(Livre.disponible == True))
+
+
+@pytest.mark.sqlite_only
+@pytest.mark.parametrize("cle", [Livre.titre, Livre.prix_cents])
+def test_books_cursor_uses_sort_index(client, cle):
+    """GET /books?sort=-<clé>&after= : reprise et tri lus dans l'index (clé, id)."""
+    plan = _plan(Livre.select(Livre.id)
+                 .where(Tuple(cle, Livre.id) < Tuple(100, 10))
+                 .order_by(cle.desc(), Livre.id.desc())
+                 .limit(51))
+    assert "SEARCH" in plan and "TEMP B-TREE" not in plan
+
+
+@pytest.mark.sqlite_only
+def test_client_email_uses_index(client):
+    """La recherche d'un client par email passe par l'index sur email."""
+    assert "client_email" in _plan(Client.select().where(Client.email == "a@b.com"))
+
+
+@pytest.mark.sqlite_only
+def test_orders_by_email_use_indexes(client):
+    """GET /orders?email= : client trouvé par l'index unique, puis ses commandes par client_id."""
+    clients = Client.select(Client.id).where(Client.email == "a@b.com")
+    plan = _plan(Commande.select()
+                 .where(Commande.client == clients)
+                 .order_by(Commande.id.desc()))
+    assert "client_email" in plan
+    assert "commande_client_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.sqlite_only
+def test_order_lines_use_index(client):
+    """Les lignes d'une commande sont trouvées par index, pas par parcours."""
+    plan = _plan(CommandeLivre.select().where(CommandeLivre.commande == 1))
+    assert "SEARCH" in plan and "INDEX" in plan
+
+
+# ─── Tests techniques — migration ─────────────────────────────────────────────
+
+def test_init_db_adds_missing_indexes(client):
+    """init_db() recrée les index absents d'une base existante."""
+    db.execute_sql('DROP INDEX "commande_statut_id"')
+    db.execute_sql('DROP INDEX "livre_disponibles"')
+
+    init_db()
+
+    noms = {i.name for table in ("commande", "livre") for i in db.get_indexes(table)}
+    assert {"commande_statut_id", "livre_disponibles"} <= noms
+
+
+def test_init_db_adds_updated_at(client):
+    """init_db() ajoute et remplit updated_at sur une base qui ne l'a pas encore."""
+    Livre.create(titre="Ancien", auteur="X", prix_cents=100)
+    db.execute_sql('DROP INDEX IF EXISTS "livre_disponibles"')
+    db.execute_sql('ALTER TABLE "livre" DROP COLUMN "updated_at"')
+
+    init_db()
+
+    assert Livre.get(Livre.titre == "Ancien").updated_at is not None
+
+
+def test_init_db_backfills_order_line_snapshot(client):
+    """init_db() ajoute titre et prix aux lignes existantes, depuis le livre."""
+    livre = Livre.create(titre="Ancien", auteur="X", prix_cents=1500)
+    c     = Client.create(nom="A", email="a@exemple.com", adresse="1 rue X")
+    cmd   = Commande.create(client=c)
+    db.execute_sql('INSERT INTO "commandelivre" ("commande_id", "livre_id", "quantite") '
+                   'VALUES (?, ?, 2)', (cmd.id, livre.id))
+    db.execute_sql('ALTER TABLE "commandelivre" DROP COLUMN "titre"')
+    db.execute_sql('ALTER TABLE "commandelivre" DROP COLUMN "prix_unitaire_cents"')
+
+    init_db()
+
+    ligne = CommandeLivre.get(CommandeLivre.commande == cmd)
+    assert (ligne.titre, ligne.prix_unitaire_cents) == ("Ancien", 1500)
+
+
+def test_init_db_adds_pricing_columns(client):
+    """
+    init_db() ajoute catégorie de taxe, remise et version des règles aux
+    anciennes bases, sans reconstruire livre ni commande : des lignes de
+    commande les référencent (clés étrangères).
+    """
+    livre = Livre.create(titre="Ancien", auteur="X", prix_cents=100)
+    cmd   = Commande.create(client=Client.create(nom="A", email="a@exemple.com", adresse="1 rue X"))
+    CommandeLivre.create(commande=cmd, livre=livre, quantite=1, titre="Ancien", prix_unitaire_cents=100)
+    db.execute_sql('ALTER TABLE "livre" DROP COLUMN "categorie_taxe"')
+    db.execute_sql('ALTER TABLE "commande" DROP COLUMN "remise_cents"')
+    db.execute_sql('ALTER TABLE "commande" DROP COLUMN "version_tarifs"')
+
+    init_db()
+
+    cmd = Commande.get_by_id(cmd.id)
+    assert Livre.get_by_id(livre.id).categorie_taxe == "standard"
+    assert (cmd.remise_cents, cmd.version_tarifs) == (0, None)
+    assert CommandeLivre.select().count() == 1
+
+
+def test_null_pricing_columns_read_as_defaults(client):
+    """Une catégorie ou une remise NULL (colonnes migrées) vaut la valeur par défaut."""
+    book_id = client.post("/books", json={"titre": "A", "auteur": "X", "prix_cents": 100}).get_json()["id"]
+    order_id = client.post("/orders", json={
+        "client": {"nom": "A", "email": "a@b.com", "adresse": "Rue X"},
+        "items":  [{"book_id": book_id, "quantite": 1}],
+    }).get_json()["id"]
+    db.execute_sql('ALTER TABLE "livre" DROP COLUMN "categorie_taxe"')
+    db.execute_sql('ALTER TABLE "commande" DROP COLUMN "remise_cents"')
+    init_db()
+    Livre.update(categorie_taxe=None).execute()
+    Commande.update(remise_cents=None).execute()
+
+    assert client.get(f"/books/{book_id}").get_json()["categorie_taxe"] == "standard"
+    assert client.get("/books?fields=categorie_taxe").get_json()[0]["categorie_taxe"] == "standard"
+    assert client.get(f"/orders/{order_id}").get_json()["remise_cents"] == 0
+    assert client.get("/orders").get_json()["orders"][0]["remise_cents"] == 0
+    assert client.post("/orders/quote", json={"items": [{"book_id": book_id}]}).status_code == 200
+
+
+def test_init_db_adds_stock_column(client):
+    """init_db() ajoute le stock (non suivi) et recrée le trigger de version sans lui."""
+    from backend.cache import lire_version
+
+    livre = Livre.create(titre="Ancien", auteur="X", prix_cents=100)
+    db.execute_sql('ALTER TABLE "livre" DROP COLUMN "stock"')
+
+    init_db()
+
+    assert Livre.get_by_id(livre.id).stock is None
+    avant = lire_version()
+    Livre.update(stock=3).where(Livre.id == livre.id).execute()
+    assert lire_version() == avant
+    Livre.update(prix_cents=200).where(Livre.id == livre.id).execute()
+    assert lire_version() == avant + 1
+
+
+def test_init_db_deduplicates_clients(client):
+    """init_db() fusionne les clients d'un même email avant de rendre l'index unique."""
+    db.execute_sql('DROP INDEX "client_email"')
+    db.execute_sql('CREATE INDEX "client_email" ON "client" ("email")')
+    a = Client.create(nom="A", email="alice@exemple.com",    adresse="1 rue X")
+    b = Client.create(nom="A", email=" Alice@Exemple.com ", adresse="2 rue Y")
+    autre = Client.create(nom="B", email="bob@exemple.com", adresse="3 rue Z")
+    for c in (a, b, autre):
+        Commande.create(client=c)
+
+    init_db()
+
+    assert Client.select().count() == 2
+    assert Commande.select().where(Commande.client == a.id).count() == 2
+    assert {i.name: i.unique for i in db.get_indexes("client")}["client_email"]
+
+
+def test_init_db_backfills_order_client_snapshot(client):
+    """init_db() copie nom et adresse du client dans les commandes, avant de fusionner les doublons."""
+    db.execute_sql('DROP INDEX "client_email"')
+    db.execute_sql('CREATE INDEX "client_email" ON "client" ("email")')
+    a = Client.create(nom="A", email="alice@exemple.com",    adresse="1 rue X")
+    b = Client.create(nom="A", email=" Alice@Exemple.com ", adresse="2 rue Y")
+    cmd_a, cmd_b = Commande.create(client=a), Commande.create(client=b)
+    db.execute_sql('ALTER TABLE "commande" DROP COLUMN "nom_client"')
+    db.execute_sql('ALTER TABLE "commande" DROP COLUMN "adresse_livraison"')
+
+    init_db()
+
+    assert Commande.get_by_id(cmd_a.id).adresse_livraison == "1 rue X"
+    assert Commande.get_by_id(cmd_b.id).adresse_livraison == "2 rue Y"
+    assert Commande.get_by_id(cmd_b.id).client_id == a.id
+
+
+@pytest.mark.sqlite_only
+def test_init_db_rejects_old_sqlite(client, monkeypatch):
+    """SQLite sans RETURNING (< 3.35) : init_db() échoue tout de suite, avec un message clair."""
+    monkeypatch.setattr(db, "server_version", (3, 31, 1))
+
+    with pytest.raises(RuntimeError, match=r"SQLite 3\.31\.1 trouvé, 3\.35\.0 ou plus requis"):
+        init_db()
+
+
+# ─── Tests techniques — pool de connexions ────────────────────────────────────
+
+@pytest.mark.sqlite_only
+def test_pooled_db_reuses_connection(tmp_path):
+    """En mode pool, db.close() rend la connexion : la suivante est la même."""
+    from backend.database import creer_db
+
+    pool_db = creer_db(f"sqlite:///{tmp_path / 'pool.db'}", pool=True)
+    pool_db.connect()
+    conn = pool_db.connection()
+    pool_db.close()
+
+    pool_db.connect()
+    assert pool_db.connection() is conn
+    assert pool_db.execute_sql("PRAGMA journal_mode").fetchone()[0] == "wal"
+    pool_db.close_all()
+
+
+def test_database_url_selects_engine():
+    """DATABASE_URL choisit le moteur ; PostgreSQL passe toujours par un pool."""
+    from playhouse.pool import PooledPostgresqlDatabase, PooledSqliteDatabase
+    from backend.database import creer_db, est_sqlite
+
+    assert est_sqlite(creer_db("sqlite:///x.db"))
+    assert isinstance(creer_db("sqlite+pool:///x.db"), PooledSqliteDatabase)
+
+    pg = creer_db("postgresql://u:p@localhost:5432/bookshop")
+    assert isinstance(pg, PooledPostgresqlDatabase)
+    assert pg.database == "bookshop"
+
+    with pytest.raises(ValueError):
+        creer_db("mysql://localhost/bookshop")
+
+
+@pytest.mark.sqlite_only
+def test_pooled_db_connection_usable_from_other_thread(tmp_path):
+    """Une connexion du pool rendue par un thread peut être reprise par un autre."""
+    import threading
+    from backend.database import creer_db
+
+    pool_db = creer_db(f"sqlite:///{tmp_path / 'pool.db'}", pool=True)
+    pool_db.connect()
+    pool_db.close()
+
+    erreurs = []
+
+    def autre_thread():
+        try:
+            pool_db.connect()
+            pool_db.execute_sql("SELECT 1")
+            pool_db.close()
+        except Exception as e:
+            erreurs.append(e)
+
+    t = threading.Thread(target=autre_thread)
+    t.start()
+    t.join()
+    pool_db.close_all()
+    assert erreurs == []
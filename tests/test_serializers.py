@@ -0,0 +1,65 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from backend import serializers
+from backend.app import app
+from backend.serializers import Conversion, compiler
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def moteur(request, monkeypatch):
+    """Chaque test tourne avec orjson (s'il est installé) puis avec le module json."""
+    if request.param == "orjson" and serializers.orjson is None:
+        pytest.skip("orjson non installé")
+    if request.param == "stdlib":
+        monkeypatch.setattr(serializers, "orjson", None)
+    return request.param
+
+
+# ─── Tests positifs — fournisseur JSON ─────────────────────────────────────────
+
+def test_dumps_matches_flask_conventions(moteur):
+    """Clés triées et dates au format HTTP, quel que soit l'encodeur."""
+    texte = app.json.dumps({"b": 1, "a": datetime(2024, 6, 1, 12, 30)})
+    assert texte.replace(" ", "") == '{"a":"Sat,01Jun202412:30:00GMT","b":1}'
+
+
+def test_dumps_falls_back_for_big_integers(moteur):
+    """Un entier hors 64 bits (refusé par orjson) passe par le module json."""
+    assert json.loads(app.json.dumps_bytes({"n": 2 ** 70})) == {"n": 2 ** 70}
+
+
+def test_jsonify_and_request_body(client, moteur):
+    """Corps de requête et de réponse passent par le fournisseur de l'app."""
+    r = client.post("/books", json={"titre": "Été", "auteur": "X", "prix_cents": 100})
+    assert r.status_code == 201
+    assert r.get_json()["titre"] == "Été"
+    assert client.post("/books", data="{pas du json", content_type="application/json").status_code == 400
+
+
+# ─── Tests positifs — sérialiseurs compilés ────────────────────────────────────
+
+def test_compiler_builds_nested_dicts():
+    vers_dict = compiler({"id": 0, "client": {"nom": 2}, "actif": Conversion(bool, 1)})
+    assert vers_dict((7, 1, "Alice")) == {"id": 7, "client": {"nom": "Alice"}, "actif": True}
+
+
+def test_list_rows_match_detail_routes(client):
+    """Les listes (lignes .tuples()) ont la même forme que les routes de détail."""
+    book_id = client.post("/books", json={"titre": "A", "auteur": "X", "prix_cents": 100,
+                                          "disponible": False}).get_json()["id"]
+    order_book = client.post("/books", json={"titre": "B", "auteur": "X", "prix_cents": 100}).get_json()["id"]
+    order_id = client.post("/orders", json={
+        "client": {"nom": "A", "email": "a@b.com", "adresse": "Rue X"},
+        "items":  [{"book_id": order_book, "quantite": 1}],
+    }).get_json()["id"]
+
+    livre = client.get(f"/books/{book_id}").get_json()
+    del livre["description"]
+    assert livre in client.get("/books").get_json()
+
+    commande = client.get(f"/orders/{order_id}").get_json()
+    del commande["items"]
+    assert client.get("/orders").get_json()["orders"] == [commande]
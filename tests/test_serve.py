@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from backend import database, logs
+from backend.app import app, prechauffer_cache
+from backend.cache import catalogue_cache
+from backend.database import db, creer_db
+from backend.serve import options
+from backend.config import WEB_WORKERS, WEB_THREADS, WEB_KEEPALIVE
+
+
+# ─── Tests positifs — préchauffage ────────────────────────────────────────────
+
+def test_prechauffer_cache_serves_catalogue_from_memory(client, count_queries):
+    """Après le préchauffage, listes et livres sont servis sans requête sur livre."""
+    ids = [client.post("/books", json={"titre": f"Livre {i}", "auteur": "X", "prix_cents": 100}).get_json()["id"]
+           for i in range(3)]
+    catalogue_cache.invalider()
+
+    prechauffer_cache()
+
+    with count_queries() as qc:
+        assert len(client.get("/books").get_json()) == 3
+        assert client.get("/books?disponible=true").status_code == 200
+        assert client.get(f"/books/{ids[0]}").status_code == 200
+    assert not any('FROM "livre"' in sql for sql in qc.queries)
+
+
+# ─── Tests techniques — configuration et fork ─────────────────────────────────
+
+def test_options_come_from_config():
+    """Workers, threads et keep-alive viennent de config.py ; l'app est préchargée."""
+    opts = options()
+    assert (opts["workers"], opts["threads"], opts["keepalive"]) == (WEB_WORKERS, WEB_THREADS, WEB_KEEPALIVE)
+    assert opts["preload_app"] is True
+    assert opts["worker_class"] == "gthread"
+
+
+@pytest.mark.sqlite_only
+def test_apres_fork_forgets_inherited_pool(tmp_path):
+    """Le worker oublie les connexions du pool héritées du master."""
+    pool = creer_db(f"sqlite:///{tmp_path / 'pool.db'}", pool=True)
+    pool.connect()
+    pool.close()
+    assert len(pool._connections) == 1
+
+    database.apres_fork(pool)
+
+    assert pool._connections == [] and pool.is_closed()
+    pool.connect()
+    assert pool.execute_sql("SELECT 1").fetchone() == (1,)
+    pool.close_all()
+
+
+def test_logs_apres_fork_starts_new_writer():
+    """Un nouveau thread d'écriture (et une file neuve) remplace celui du parent."""
+    ancien, ancienne_file = logs._listener, logs._handler.queue
+
+    logs.apres_fork()
+
+    assert logs._listener is not ancien
+    assert logs._listener._thread.is_alive()
+    assert logs._handler.queue is not ancienne_file
+    ancien.stop()   # dans un vrai fork, ce thread n'existe pas
+
+
+@pytest.mark.sqlite_only
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork() indisponible")
+def test_forked_worker_serves_requests(client):
+    """Un processus forké après le préchauffage répond avec ses propres connexions."""
+    client.post("/books", json={"titre": "A", "auteur": "X", "prix_cents": 100})
+    prechauffer_cache()
+    db.close()
+
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            database.apres_fork(db)
+            logs.apres_fork()
+            with app.test_client() as c:
+                if len(c.get("/books").get_json()) == 1 and c.get("/books/1").status_code == 200:
+                    code = 0
+        finally:
+            os._exit(code)
+
+    _, statut = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(statut) == 0